@@ -1,20 +1,37 @@
 """Mini trading bot package."""
 
 __all__ = [
+    "artifact",
+    "calibration",
     "config",
+    "daemon",
+    "deadline",
     "data_ingest",
+    "drift",
     "exp_registry",
+    "exec_algos",
     "execution",
     "feature_engine",
     "funding",
+    "latency",
     "logger",
     "market_guard",
     "model_infer",
+    "model_registry",
     "notifier",
+    "online_learner",
+    "portfolio",
+    "prefetch",
+    "profiler",
+    "rate_limiter",
     "regime",
+    "reprice",
     "risk_guard",
     "run_cycle",
+    "shadow",
     "signal_policy",
     "state_store",
+    "training",
+    "tree_model",
     "venue_adapter",
 ]
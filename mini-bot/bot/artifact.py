@@ -0,0 +1,199 @@
+"""Versioned model artifacts: JSON manifest plus memory-mapped numeric arrays.
+
+An artifact is a directory holding ``manifest.json`` and ``arrays.bin``.
+The manifest carries the model kind, feature names, version, calibration
+and the offset/length/typecode of every array; ``arrays.bin`` is the raw
+native-endian array data, 8-byte aligned, so loading maps the file and
+hands out ``memoryview`` slices without copying or unpickling anything.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+from bot.model_infer import LoadedModel
+from bot.tree_model import CompiledTrees
+
+LOGGER = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+ARRAYS_NAME = "arrays.bin"
+_ALIGN = 8
+_TREE_ARRAYS = ("feature", "threshold", "left", "right", "value", "missing", "default_left", "roots")
+
+
+class ArtifactError(ValueError):
+    """Raised for malformed, mismatched or corrupted artifacts."""
+
+
+@dataclass
+class Artifact:
+    model: Union[CompiledTrees, LoadedModel]
+    manifest: Dict[str, Any]
+    calibration: Optional[Dict[str, Any]] = None
+    path: Optional[Path] = None
+    _mmap: Any = field(default=None, repr=False)
+
+    @property
+    def version(self) -> str:
+        return str(self.manifest.get("version", ""))
+
+    @property
+    def sha256(self) -> str:
+        return str(self.manifest.get("sha256", ""))
+
+
+def _model_arrays(model: Union[CompiledTrees, LoadedModel]) -> tuple[str, Dict[str, array], Dict[str, Any]]:
+    if isinstance(model, CompiledTrees):
+        arrays = {name: array(getattr(model, name).typecode, getattr(model, name)) for name in _TREE_ARRAYS}
+        return "trees", arrays, {"objective": model.objective}
+    if isinstance(model, LoadedModel):
+        weights = array("d", [model.weights.get(name, 0.0) for name in model.feature_names])
+        return "logistic", {"weights": weights}, {"bias": model.bias}
+    raise ArtifactError(f"Cannot export model of type {type(model)!r}")
+
+
+def save_artifact(
+    model: Union[CompiledTrees, LoadedModel],
+    path: Path | str,
+    calibration: Optional[Mapping[str, Any]] = None,
+) -> Path:
+    """Write *model* (and an optional calibration spec) as an artifact directory."""
+
+    kind, arrays, extra = _model_arrays(model)
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    layout: Dict[str, Dict[str, Any]] = {}
+    digest = hashlib.sha256()
+    offset = 0
+    tmp_bin = path / (ARRAYS_NAME + ".tmp")
+    with tmp_bin.open("wb") as fh:
+        for name, values in arrays.items():
+            pad = (-offset) % _ALIGN
+            if pad:
+                fh.write(b"\0" * pad)
+                digest.update(b"\0" * pad)
+                offset += pad
+            data = values.tobytes()
+            fh.write(data)
+            digest.update(data)
+            layout[name] = {"typecode": values.typecode, "offset": offset, "length": len(values)}
+            offset += len(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "kind": kind,
+        "version": model.version,
+        "feature_names": list(model.feature_names),
+        "byteorder": sys.byteorder,
+        "sha256": digest.hexdigest(),
+        "size": offset,
+        "arrays": layout,
+        "calibration": dict(calibration) if calibration else None,
+        **extra,
+    }
+    tmp_manifest = path / (MANIFEST_NAME + ".tmp")
+    tmp_manifest.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp_bin, path / ARRAYS_NAME)
+    os.replace(tmp_manifest, path / MANIFEST_NAME)
+    return path
+
+
+def file_sha256(path: Path | str) -> str:
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(path: Path | str) -> Dict[str, Any]:
+    path = Path(path)
+    manifest_path = path / MANIFEST_NAME if path.is_dir() else path
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError) as exc:
+        raise ArtifactError(f"Unreadable manifest at {manifest_path}: {exc}") from exc
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported artifact format {manifest.get('format_version')!r}")
+    return manifest
+
+
+def load_artifact(path: Path | str, verify: bool = False) -> Artifact:
+    """Map an artifact; array pages are only read when the model touches them.
+
+    ``verify`` hashes ``arrays.bin`` against the manifest first, which reads
+    the whole file and so is meant for promotion rather than every start.
+    """
+
+    path = Path(path)
+    root = path if path.is_dir() else path.parent
+    manifest = read_manifest(path)
+    if manifest.get("byteorder") != sys.byteorder:
+        raise ArtifactError("Artifact was written on a machine with different byte order")
+    bin_path = root / ARRAYS_NAME
+    if verify and file_sha256(bin_path) != manifest.get("sha256"):
+        raise ArtifactError(f"Checksum mismatch for {bin_path}")
+    size = int(manifest.get("size", 0))
+    buf: Any = b""
+    if size:
+        with bin_path.open("rb") as fh:
+            buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(buf) < size:
+            raise ArtifactError(f"{bin_path} is truncated")
+    view = memoryview(buf)
+    arrays: Dict[str, memoryview] = {}
+    for name, spec in manifest.get("arrays", {}).items():
+        itemsize = array(spec["typecode"]).itemsize
+        start = int(spec["offset"])
+        arrays[name] = view[start : start + itemsize * int(spec["length"])].cast(spec["typecode"])
+
+    kind = manifest.get("kind")
+    names = list(manifest.get("feature_names", []))
+    model: Union[CompiledTrees, LoadedModel]
+    if kind == "trees":
+        model = CompiledTrees(
+            feature_names=names,
+            version=str(manifest.get("version", "")),
+            objective=str(manifest.get("objective", "binary")),
+            **{name: arrays[name] for name in _TREE_ARRAYS},
+        )
+    elif kind == "logistic":
+        model = LoadedModel(
+            feature_names=names,
+            version=str(manifest.get("version", "")),
+            weights=dict(zip(names, arrays["weights"].tolist())),
+            bias=float(manifest.get("bias", 0.0)),
+        )
+    else:
+        raise ArtifactError(f"Unknown artifact kind {kind!r}")
+    return Artifact(model, manifest, manifest.get("calibration"), root, buf if size else None)
+
+
+def is_artifact(path: Path | str) -> bool:
+    path = Path(path)
+    return (path / MANIFEST_NAME).exists() if path.is_dir() else path.name == MANIFEST_NAME
+
+
+__all__ = [
+    "ARRAYS_NAME",
+    "Artifact",
+    "ArtifactError",
+    "FORMAT_VERSION",
+    "MANIFEST_NAME",
+    "file_sha256",
+    "is_artifact",
+    "load_artifact",
+    "read_manifest",
+    "save_artifact",
+]
@@ -0,0 +1,168 @@
+"""Breakpoint-table probability calibration and an in-house PAV isotonic fitter."""
+from __future__ import annotations
+
+import bisect
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Platt tables are sampled uniformly in margin space over this range.
+PLATT_MARGIN_RANGE = 16.0
+PLATT_POINTS = 513
+
+
+def _sigmoid(value: float) -> float:
+    if value > 50:
+        return 1.0
+    if value < -50:
+        return 0.0
+    return 1.0 / (1.0 + math.exp(-value))
+
+
+@dataclass(frozen=True)
+class CalibrationTable:
+    """Monotone piecewise-linear map from raw to calibrated probability.
+
+    Inputs outside ``[x[0], x[-1]]`` clamp to the end values. Repeated
+    ``x`` values are allowed and produce a step.
+    """
+
+    x: Tuple[float, ...]
+    y: Tuple[float, ...]
+    source: str = "isotonic"
+
+    def __post_init__(self) -> None:
+        if not self.x or len(self.x) != len(self.y):
+            raise ValueError("Calibration breakpoints must be non-empty and equal length")
+        if any(b < a for a, b in zip(self.x, self.x[1:])):
+            raise ValueError("Calibration breakpoints must be sorted")
+
+    def __call__(self, prob: float) -> float:
+        x, y = self.x, self.y
+        i = bisect.bisect_right(x, prob)
+        if i == 0:
+            return y[0]
+        if i == len(x):
+            return y[-1]
+        x0, x1 = x[i - 1], x[i]
+        return y[i - 1] + (y[i] - y[i - 1]) * (prob - x0) / (x1 - x0)
+
+    def apply_batch(self, probs: Iterable[float]) -> List[float]:
+        x, y = self.x, self.y
+        last = len(x)
+        find = bisect.bisect_right
+        out = []
+        for prob in probs:
+            i = find(x, prob)
+            if i == 0:
+                out.append(y[0])
+            elif i == last:
+                out.append(y[-1])
+            else:
+                x0 = x[i - 1]
+                y0 = y[i - 1]
+                out.append(y0 + (y[i] - y0) * (prob - x0) / (x[i] - x0))
+        return out
+
+    def to_spec(self) -> Dict[str, Any]:
+        return {"type": "table", "source": self.source, "x": list(self.x), "y": list(self.y)}
+
+
+def table(x: Sequence[float], y: Sequence[float], source: str = "isotonic") -> CalibrationTable:
+    return CalibrationTable(tuple(float(v) for v in x), tuple(float(v) for v in y), source)
+
+
+def platt_table(a: float, b: float, points: int = PLATT_POINTS) -> CalibrationTable:
+    """Tabulate ``sigmoid(a * margin + b)`` against the raw probability ``sigmoid(margin)``."""
+
+    step = 2 * PLATT_MARGIN_RANGE / (points - 1)
+    margins = [-PLATT_MARGIN_RANGE + i * step for i in range(points)]
+    return table([_sigmoid(m) for m in margins], [_sigmoid(a * m + b) for m in margins], "platt")
+
+
+def fit_isotonic(
+    probs: Sequence[float],
+    labels: Sequence[float],
+    weights: Optional[Sequence[float]] = None,
+) -> CalibrationTable:
+    """Fit a non-decreasing calibration map with pool-adjacent-violators.
+
+    Each pooled block contributes its lowest and highest input as
+    breakpoints at the block mean, matching sklearn's interpolating
+    ``IsotonicRegression(out_of_bounds="clip")``.
+    """
+
+    if len(probs) != len(labels) or not probs:
+        raise ValueError("probs and labels must be non-empty and equal length")
+    weights = weights if weights is not None else [1.0] * len(probs)
+    order = sorted(range(len(probs)), key=probs.__getitem__)
+    # Blocks are [sum_wy, sum_w, x_min, x_max]; ties in x start pooled.
+    blocks: List[List[float]] = []
+    for i in order:
+        p = float(probs[i])
+        w = float(weights[i])
+        if w <= 0:
+            continue
+        if blocks and blocks[-1][3] == p:
+            blocks[-1][0] += w * float(labels[i])
+            blocks[-1][1] += w
+        else:
+            blocks.append([w * float(labels[i]), w, p, p])
+        while len(blocks) > 1 and blocks[-2][0] * blocks[-1][1] >= blocks[-1][0] * blocks[-2][1]:
+            wy, sw, _, x_max = blocks.pop()
+            blocks[-1][0] += wy
+            blocks[-1][1] += sw
+            blocks[-1][3] = x_max
+    if not blocks:
+        raise ValueError("No positive-weight samples to fit")
+    xs: List[float] = []
+    ys: List[float] = []
+    for wy, sw, x_min, x_max in blocks:
+        mean = wy / sw
+        xs.append(x_min)
+        ys.append(mean)
+        if x_max != x_min:
+            xs.append(x_max)
+            ys.append(mean)
+    return table(xs, ys, "isotonic")
+
+
+def from_spec(spec: Optional[Mapping[str, Any]]) -> Optional[CalibrationTable]:
+    """Build a table from an artifact manifest calibration entry."""
+
+    if not spec:
+        return None
+    kind = spec.get("type")
+    if kind == "platt":
+        return platt_table(float(spec["a"]), float(spec["b"]))
+    if kind in {"table", "isotonic"}:
+        return table(spec["x"], spec["y"], str(spec.get("source", "isotonic")))
+    raise ValueError(f"Unsupported calibration spec: {kind!r}")
+
+
+def export_calibrator(obj: Any, grid: int = 1001) -> Optional[CalibrationTable]:
+    """Convert a legacy pickled calibrator into a table.
+
+    Platt dicts are tabulated, fitted isotonic regressors contribute their
+    thresholds, and any other object with ``predict`` is sampled once on an
+    even probability grid so inference never calls back into it.
+    """
+
+    if isinstance(obj, Mapping) and {"a", "b"} <= set(obj):
+        return platt_table(float(obj["a"]), float(obj["b"]))
+    if hasattr(obj, "X_thresholds_") and hasattr(obj, "y_thresholds_"):
+        return table(list(obj.X_thresholds_), list(obj.y_thresholds_), "isotonic")
+    if hasattr(obj, "predict"):
+        xs = [i / (grid - 1) for i in range(grid)]
+        return table(xs, [float(v) for v in obj.predict(xs)], "sampled")
+    return None
+
+
+__all__ = [
+    "CalibrationTable",
+    "export_calibrator",
+    "fit_isotonic",
+    "from_spec",
+    "platt_table",
+    "table",
+]
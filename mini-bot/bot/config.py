@@ -90,6 +90,23 @@ class OrderConfig:
     ladder_levels: int = 3
     timeout_bars: int = 2
     post_only: bool = True
+    submit_retries: int = 1
+    native_brackets: bool = False
+    reprice_interval_s: int = 0
+    reprice_drift_bp: float = 10.0
+    reprice_max_requests: int = 6
+    book_aware: bool = True
+    book_ttl_ms: int = 1000
+    book_step_bp: float = 5.0
+    algo: str = ""
+    algo_min_notional: float = 0.0
+    algo_limit_bp: float = 50.0
+    algo_interval_s: int = 60
+    algo_max_duration_s: int = 7200
+    twap_slices: int = 6
+    twap_duration_s: int = 3600
+    iceberg_display_pct: float = 0.2
+    iceberg_jitter: float = 0.3
 
 
 @dataclass
@@ -115,12 +132,101 @@ class FundingConfig:
 class VenueConfig:
     name: str = "binance"
     testnet: bool = True
+    margin_mode: str = "isolated"
+    account_settings_ttl_s: int = 86400
+
+
+@dataclass
+class RateLimitConfig:
+    enabled: bool = True
+    path: str = "data/ratelimit.db"
+    capacity: float = 2400.0
+    refill_per_s: float = 40.0
+    reserve_pct: float = 0.2
+
+
+@dataclass
+class ModelConfig:
+    registry: str = "models/registry"
+    # Comma-separated registry versions scored in shadow alongside the live model.
+    shadow_versions: str = ""
+    shadow_workers: int = 2
+    shadow_timeout_s: float = 5.0
+    # Memoized predictions per inferer; a TTL of 0 keeps entries until evicted.
+    cache_size: int = 4096
+    cache_ttl_s: float = 0.0
+
+
+@dataclass
+class OnlineConfig:
+    enabled: bool = False
+    state_path: str = "models/online.state"
+    alpha: float = 0.05
+    l2: float = 1.0
+    horizon_bars: int = 2
+    window: int = 200
+    min_samples: int = 30
+    max_prob_shift: float = 0.1
+    max_logloss_excess: float = 0.02
+
+
+@dataclass
+class PrefetchConfig:
+    ingest_timeout_s: float = 20.0
+    funding_timeout_s: float = 5.0
+    balance_timeout_s: float = 5.0
+    market_timeout_s: float = 10.0
+
+
+@dataclass
+class DeadlineConfig:
+    enabled: bool = True
+    # Offsets from cycle start, in ms.
+    budget_ms: int = 10000
+    prefetch_ms: int = 6000
+    decision_ms: int = 8000
+    # Notifications wait until after the cycle when less budget than this is left.
+    notify_min_ms: int = 2000
+    # Cached funding/balance/market reads older than this are not used.
+    max_stale_s: float = 3600.0
+
+
+@dataclass
+class ProfilerConfig:
+    enabled: bool = True
+    # Per-stage wall-clock budgets, "stage=ms" comma-separated.
+    budgets_ms: str = "ingest=3000,compute_features=200,inference=200,regime=50,risk=500,submission=1500"
+    # Dump cProfile stats for stages that exceed their budget.
+    capture: bool = False
+    capture_dir: str = "experiments/live/profiles"
+
+
+@dataclass
+class DaemonConfig:
+    # Delay after each bar boundary so the exchange has published the closed candle.
+    settle_s: float = 0.2
+    # Close-to-order latency (settle delay included) above this is logged as a warning.
+    latency_budget_ms: int = 1000
+
+
+@dataclass
+class DriftConfig:
+    enabled: bool = True
+    state_path: str = "models/drift.state"
+    window: int = 180
+    min_samples: int = 30
+    psi_alert: float = 0.25
+    ks_alert: float = 0.3
+    missing_alert: float = 0.05
 
 
 @dataclass
 class TradingConfig:
     timeframe: str = "4h"
     symbol: str = "BTC/USDT:USDT"
+    # Comma-separated portfolio; empty trades ``symbol`` alone.
+    symbols: str = ""
+    portfolio_workers: int = 4
     leverage: float = 3
     risk_pct: float = 0.01
     daily_loss_limit_pct: float = 0.03
@@ -133,6 +239,14 @@ class TradingConfig:
     slip_bp: float = 2.0
     regime: RegimeConfig = field(default_factory=RegimeConfig)
     funding: FundingConfig = field(default_factory=FundingConfig)
+    rate_limit: RateLimitConfig = field(default_factory=RateLimitConfig)
+    model: ModelConfig = field(default_factory=ModelConfig)
+    online: OnlineConfig = field(default_factory=OnlineConfig)
+    drift: DriftConfig = field(default_factory=DriftConfig)
+    daemon: DaemonConfig = field(default_factory=DaemonConfig)
+    prefetch: PrefetchConfig = field(default_factory=PrefetchConfig)
+    profiler: ProfilerConfig = field(default_factory=ProfilerConfig)
+    deadline: DeadlineConfig = field(default_factory=DeadlineConfig)
 
 
 @dataclass
@@ -187,6 +301,14 @@ def load_config(
     default_regime = RegimeConfig()
     default_funding = FundingConfig()
     default_venue = VenueConfig()
+    default_rate_limit = RateLimitConfig()
+    default_model = ModelConfig()
+    default_online = OnlineConfig()
+    default_drift = DriftConfig()
+    default_daemon = DaemonConfig()
+    default_prefetch = PrefetchConfig()
+    default_profiler = ProfilerConfig()
+    default_deadline = DeadlineConfig()
 
     trading = TradingConfig(
         timeframe=overrides.get(
@@ -197,6 +319,19 @@ def load_config(
             "trading.symbol",
             env_data.get("SYMBOL", _deep_get(yaml_data, "trading.symbol", default_trading.symbol)),
         ),
+        symbols=str(
+            overrides.get(
+                "trading.symbols",
+                env_data.get("SYMBOLS", _deep_get(yaml_data, "trading.symbols", default_trading.symbols)),
+            )
+            or ""
+        ),
+        portfolio_workers=int(
+            overrides.get(
+                "trading.portfolio_workers",
+                _deep_get(yaml_data, "trading.portfolio_workers", default_trading.portfolio_workers),
+            )
+        ),
         leverage=float(
             overrides.get(
                 "trading.leverage",
@@ -281,6 +416,116 @@ def load_config(
                 ),
                 OrderConfig().post_only,
             ),
+            submit_retries=int(
+                overrides.get(
+                    "trading.order.submit_retries",
+                    _deep_get(yaml_data, "trading.order.submit_retries", default_order.submit_retries),
+                )
+            ),
+            native_brackets=_parse_bool(
+                overrides.get(
+                    "trading.order.native_brackets",
+                    _deep_get(yaml_data, "trading.order.native_brackets", default_order.native_brackets),
+                ),
+                default_order.native_brackets,
+            ),
+            reprice_interval_s=int(
+                overrides.get(
+                    "trading.order.reprice_interval_s",
+                    _deep_get(
+                        yaml_data, "trading.order.reprice_interval_s", default_order.reprice_interval_s
+                    ),
+                )
+            ),
+            reprice_drift_bp=float(
+                overrides.get(
+                    "trading.order.reprice_drift_bp",
+                    _deep_get(yaml_data, "trading.order.reprice_drift_bp", default_order.reprice_drift_bp),
+                )
+            ),
+            reprice_max_requests=int(
+                overrides.get(
+                    "trading.order.reprice_max_requests",
+                    _deep_get(
+                        yaml_data,
+                        "trading.order.reprice_max_requests",
+                        default_order.reprice_max_requests,
+                    ),
+                )
+            ),
+            book_aware=_parse_bool(
+                overrides.get(
+                    "trading.order.book_aware",
+                    _deep_get(yaml_data, "trading.order.book_aware", default_order.book_aware),
+                ),
+                default_order.book_aware,
+            ),
+            book_ttl_ms=int(
+                overrides.get(
+                    "trading.order.book_ttl_ms",
+                    _deep_get(yaml_data, "trading.order.book_ttl_ms", default_order.book_ttl_ms),
+                )
+            ),
+            book_step_bp=float(
+                overrides.get(
+                    "trading.order.book_step_bp",
+                    _deep_get(yaml_data, "trading.order.book_step_bp", default_order.book_step_bp),
+                )
+            ),
+            algo=str(
+                overrides.get(
+                    "trading.order.algo",
+                    _deep_get(yaml_data, "trading.order.algo", default_order.algo),
+                )
+            ),
+            algo_min_notional=float(
+                overrides.get(
+                    "trading.order.algo_min_notional",
+                    _deep_get(yaml_data, "trading.order.algo_min_notional", default_order.algo_min_notional),
+                )
+            ),
+            algo_limit_bp=float(
+                overrides.get(
+                    "trading.order.algo_limit_bp",
+                    _deep_get(yaml_data, "trading.order.algo_limit_bp", default_order.algo_limit_bp),
+                )
+            ),
+            algo_interval_s=int(
+                overrides.get(
+                    "trading.order.algo_interval_s",
+                    _deep_get(yaml_data, "trading.order.algo_interval_s", default_order.algo_interval_s),
+                )
+            ),
+            algo_max_duration_s=int(
+                overrides.get(
+                    "trading.order.algo_max_duration_s",
+                    _deep_get(yaml_data, "trading.order.algo_max_duration_s", default_order.algo_max_duration_s),
+                )
+            ),
+            twap_slices=int(
+                overrides.get(
+                    "trading.order.twap_slices",
+                    _deep_get(yaml_data, "trading.order.twap_slices", default_order.twap_slices),
+                )
+            ),
+            twap_duration_s=int(
+                overrides.get(
+                    "trading.order.twap_duration_s",
+                    _deep_get(yaml_data, "trading.order.twap_duration_s", default_order.twap_duration_s),
+                )
+            ),
+            iceberg_display_pct=float(
+                overrides.get(
+                    "trading.order.iceberg_display_pct",
+                    _deep_get(yaml_data, "trading.order.iceberg_display_pct", default_order.iceberg_display_pct),
+                )
+            ),
+            iceberg_jitter=float(
+                overrides.get(
+                    "trading.order.iceberg_jitter",
+                    _deep_get(yaml_data, "trading.order.iceberg_jitter", default_order.iceberg_jitter),
+                )
+            ),
         ),
         venue=VenueConfig(
             name=overrides.get(
@@ -297,6 +542,25 @@ def load_config(
                 ),
                 VenueConfig().testnet,
             ),
+            margin_mode=str(
+                overrides.get(
+                    "trading.venue.margin_mode",
+                    env_data.get(
+                        "ACCOUNT_MODE",
+                        _deep_get(yaml_data, "trading.venue.margin_mode", default_venue.margin_mode),
+                    ),
+                )
+            ).lower(),
+            account_settings_ttl_s=int(
+                overrides.get(
+                    "trading.venue.account_settings_ttl_s",
+                    _deep_get(
+                        yaml_data,
+                        "trading.venue.account_settings_ttl_s",
+                        default_venue.account_settings_ttl_s,
+                    ),
+                )
+            ),
         ),
         tau=float(
             overrides.get(
@@ -356,6 +620,295 @@ def load_config(
                 )
             )
         ),
+        rate_limit=RateLimitConfig(
+            enabled=_parse_bool(
+                overrides.get(
+                    "trading.rate_limit.enabled",
+                    _deep_get(yaml_data, "trading.rate_limit.enabled", default_rate_limit.enabled),
+                ),
+                default_rate_limit.enabled,
+            ),
+            path=str(
+                overrides.get(
+                    "trading.rate_limit.path",
+                    _deep_get(yaml_data, "trading.rate_limit.path", default_rate_limit.path),
+                )
+            ),
+            capacity=float(
+                overrides.get(
+                    "trading.rate_limit.capacity",
+                    _deep_get(yaml_data, "trading.rate_limit.capacity", default_rate_limit.capacity),
+                )
+            ),
+            refill_per_s=float(
+                overrides.get(
+                    "trading.rate_limit.refill_per_s",
+                    _deep_get(
+                        yaml_data,
+                        "trading.rate_limit.refill_per_s",
+                        default_rate_limit.refill_per_s,
+                    ),
+                )
+            ),
+            reserve_pct=float(
+                overrides.get(
+                    "trading.rate_limit.reserve_pct",
+                    _deep_get(
+                        yaml_data,
+                        "trading.rate_limit.reserve_pct",
+                        default_rate_limit.reserve_pct,
+                    ),
+                )
+            ),
+        ),
+        model=ModelConfig(
+            registry=str(
+                overrides.get(
+                    "trading.model.registry",
+                    _deep_get(yaml_data, "trading.model.registry", default_model.registry),
+                )
+            ),
+            shadow_versions=str(
+                overrides.get(
+                    "trading.model.shadow_versions",
+                    _deep_get(yaml_data, "trading.model.shadow_versions", default_model.shadow_versions),
+                )
+                or ""
+            ),
+            shadow_workers=int(
+                overrides.get(
+                    "trading.model.shadow_workers",
+                    _deep_get(yaml_data, "trading.model.shadow_workers", default_model.shadow_workers),
+                )
+            ),
+            shadow_timeout_s=float(
+                overrides.get(
+                    "trading.model.shadow_timeout_s",
+                    _deep_get(yaml_data, "trading.model.shadow_timeout_s", default_model.shadow_timeout_s),
+                )
+            ),
+            cache_size=int(
+                overrides.get(
+                    "trading.model.cache_size",
+                    _deep_get(yaml_data, "trading.model.cache_size", default_model.cache_size),
+                )
+            ),
+            cache_ttl_s=float(
+                overrides.get(
+                    "trading.model.cache_ttl_s",
+                    _deep_get(yaml_data, "trading.model.cache_ttl_s", default_model.cache_ttl_s),
+                )
+            ),
+        ),
+        online=OnlineConfig(
+            enabled=_parse_bool(
+                overrides.get(
+                    "trading.online.enabled",
+                    _deep_get(yaml_data, "trading.online.enabled", default_online.enabled),
+                ),
+                default_online.enabled,
+            ),
+            state_path=str(
+                overrides.get(
+                    "trading.online.state_path",
+                    _deep_get(yaml_data, "trading.online.state_path", default_online.state_path),
+                )
+            ),
+            alpha=float(
+                overrides.get(
+                    "trading.online.alpha",
+                    _deep_get(yaml_data, "trading.online.alpha", default_online.alpha),
+                )
+            ),
+            l2=float(
+                overrides.get(
+                    "trading.online.l2",
+                    _deep_get(yaml_data, "trading.online.l2", default_online.l2),
+                )
+            ),
+            horizon_bars=int(
+                overrides.get(
+                    "trading.online.horizon_bars",
+                    _deep_get(yaml_data, "trading.online.horizon_bars", default_online.horizon_bars),
+                )
+            ),
+            window=int(
+                overrides.get(
+                    "trading.online.window",
+                    _deep_get(yaml_data, "trading.online.window", default_online.window),
+                )
+            ),
+            min_samples=int(
+                overrides.get(
+                    "trading.online.min_samples",
+                    _deep_get(yaml_data, "trading.online.min_samples", default_online.min_samples),
+                )
+            ),
+            max_prob_shift=float(
+                overrides.get(
+                    "trading.online.max_prob_shift",
+                    _deep_get(yaml_data, "trading.online.max_prob_shift", default_online.max_prob_shift),
+                )
+            ),
+            max_logloss_excess=float(
+                overrides.get(
+                    "trading.online.max_logloss_excess",
+                    _deep_get(yaml_data, "trading.online.max_logloss_excess", default_online.max_logloss_excess),
+                )
+            ),
+        ),
+        drift=DriftConfig(
+            enabled=_parse_bool(
+                overrides.get(
+                    "trading.drift.enabled",
+                    _deep_get(yaml_data, "trading.drift.enabled", default_drift.enabled),
+                ),
+                default_drift.enabled,
+            ),
+            state_path=str(
+                overrides.get(
+                    "trading.drift.state_path",
+                    _deep_get(yaml_data, "trading.drift.state_path", default_drift.state_path),
+                )
+            ),
+            window=int(
+                overrides.get(
+                    "trading.drift.window",
+                    _deep_get(yaml_data, "trading.drift.window", default_drift.window),
+                )
+            ),
+            min_samples=int(
+                overrides.get(
+                    "trading.drift.min_samples",
+                    _deep_get(yaml_data, "trading.drift.min_samples", default_drift.min_samples),
+                )
+            ),
+            psi_alert=float(
+                overrides.get(
+                    "trading.drift.psi_alert",
+                    _deep_get(yaml_data, "trading.drift.psi_alert", default_drift.psi_alert),
+                )
+            ),
+            ks_alert=float(
+                overrides.get(
+                    "trading.drift.ks_alert",
+                    _deep_get(yaml_data, "trading.drift.ks_alert", default_drift.ks_alert),
+                )
+            ),
+            missing_alert=float(
+                overrides.get(
+                    "trading.drift.missing_alert",
+                    _deep_get(yaml_data, "trading.drift.missing_alert", default_drift.missing_alert),
+                )
+            ),
+        ),
+        daemon=DaemonConfig(
+            settle_s=float(
+                overrides.get(
+                    "trading.daemon.settle_s",
+                    _deep_get(yaml_data, "trading.daemon.settle_s", default_daemon.settle_s),
+                )
+            ),
+            latency_budget_ms=int(
+                overrides.get(
+                    "trading.daemon.latency_budget_ms",
+                    _deep_get(yaml_data, "trading.daemon.latency_budget_ms", default_daemon.latency_budget_ms),
+                )
+            ),
+        ),
+        prefetch=PrefetchConfig(
+            ingest_timeout_s=float(
+                overrides.get(
+                    "trading.prefetch.ingest_timeout_s",
+                    _deep_get(yaml_data, "trading.prefetch.ingest_timeout_s", default_prefetch.ingest_timeout_s),
+                )
+            ),
+            funding_timeout_s=float(
+                overrides.get(
+                    "trading.prefetch.funding_timeout_s",
+                    _deep_get(yaml_data, "trading.prefetch.funding_timeout_s", default_prefetch.funding_timeout_s),
+                )
+            ),
+            balance_timeout_s=float(
+                overrides.get(
+                    "trading.prefetch.balance_timeout_s",
+                    _deep_get(yaml_data, "trading.prefetch.balance_timeout_s", default_prefetch.balance_timeout_s),
+                )
+            ),
+            market_timeout_s=float(
+                overrides.get(
+                    "trading.prefetch.market_timeout_s",
+                    _deep_get(yaml_data, "trading.prefetch.market_timeout_s", default_prefetch.market_timeout_s),
+                )
+            ),
+        ),
+        profiler=ProfilerConfig(
+            enabled=_parse_bool(
+                overrides.get(
+                    "trading.profiler.enabled",
+                    _deep_get(yaml_data, "trading.profiler.enabled", default_profiler.enabled),
+                ),
+                default_profiler.enabled,
+            ),
+            budgets_ms=str(
+                overrides.get(
+                    "trading.profiler.budgets_ms",
+                    _deep_get(yaml_data, "trading.profiler.budgets_ms", default_profiler.budgets_ms),
+                )
+            ),
+            capture=_parse_bool(
+                overrides.get(
+                    "trading.profiler.capture",
+                    _deep_get(yaml_data, "trading.profiler.capture", default_profiler.capture),
+                ),
+                default_profiler.capture,
+            ),
+            capture_dir=str(
+                overrides.get(
+                    "trading.profiler.capture_dir",
+                    _deep_get(yaml_data, "trading.profiler.capture_dir", default_profiler.capture_dir),
+                )
+            ),
+        ),
+        deadline=DeadlineConfig(
+            enabled=_parse_bool(
+                overrides.get(
+                    "trading.deadline.enabled",
+                    _deep_get(yaml_data, "trading.deadline.enabled", default_deadline.enabled),
+                ),
+                default_deadline.enabled,
+            ),
+            budget_ms=int(
+                overrides.get(
+                    "trading.deadline.budget_ms",
+                    _deep_get(yaml_data, "trading.deadline.budget_ms", default_deadline.budget_ms),
+                )
+            ),
+            prefetch_ms=int(
+                overrides.get(
+                    "trading.deadline.prefetch_ms",
+                    _deep_get(yaml_data, "trading.deadline.prefetch_ms", default_deadline.prefetch_ms),
+                )
+            ),
+            decision_ms=int(
+                overrides.get(
+                    "trading.deadline.decision_ms",
+                    _deep_get(yaml_data, "trading.deadline.decision_ms", default_deadline.decision_ms),
+                )
+            ),
+            notify_min_ms=int(
+                overrides.get(
+                    "trading.deadline.notify_min_ms",
+                    _deep_get(yaml_data, "trading.deadline.notify_min_ms", default_deadline.notify_min_ms),
+                )
+            ),
+            max_stale_s=float(
+                overrides.get(
+                    "trading.deadline.max_stale_s",
+                    _deep_get(yaml_data, "trading.deadline.max_stale_s", default_deadline.max_stale_s),
+                )
+            ),
+        ),
     )
 
     telegram_chat_id = overrides.get(
@@ -406,9 +959,17 @@ __all__ = [
     "ATRConfig",
     "Config",
     "DEFAULT_TAU",
+    "DaemonConfig",
+    "DeadlineConfig",
+    "DriftConfig",
     "FundingConfig",
+    "ModelConfig",
     "MonitoringConfig",
+    "OnlineConfig",
     "OrderConfig",
+    "PrefetchConfig",
+    "ProfilerConfig",
+    "RateLimitConfig",
     "RegimeConfig",
     "TelegramConfig",
     "TradingConfig",
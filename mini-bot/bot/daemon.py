@@ -0,0 +1,145 @@
+"""Long-running cycle daemon that wakes at each bar close.
+
+Unlike the oneshot ``bot.run_cycle`` unit, the daemon builds the exchange
+client (with markets loaded), model, online/drift state, SQLite connection
+and ``ExecutionEngine`` once and reuses them every bar, so the work after a
+bar closes is only ingest, inference and order submission. SIGTERM/SIGINT
+stop the loop after the in-flight cycle; the wait between bars is
+interruptible so shutdown does not sit out the rest of the bar.
+"""
+from __future__ import annotations
+
+import logging
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from bot.config import TradingConfig, load_config
+from bot.data_ingest import timeframe_to_seconds
+from bot.execution import ExecutionEngine
+from bot.logger import jlog
+from bot.run_cycle import CycleRuntime, build_runtime, run_runtime_cycle
+from bot.state_store import StateStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+def next_wake_ms(now_ms: int, timeframe: str, settle_ms: int = 0) -> int:
+    """The first ``bar boundary + settle_ms`` strictly after *now_ms*."""
+
+    step_ms = timeframe_to_seconds(timeframe) * 1000
+    wake = (now_ms // step_ms) * step_ms + settle_ms
+    while wake <= now_ms:
+        wake += step_ms
+    return wake
+
+
+class CycleDaemon:
+    def __init__(
+        self,
+        runtime: CycleRuntime,
+        store: StateStore,
+        cfg: TradingConfig,
+        *,
+        log_path: str = "experiments/live/cycles.jsonl",
+        clock: Callable[[], float] = time.time,
+        stop: Optional[threading.Event] = None,
+        cycle_fn: Callable[[CycleRuntime, StateStore, TradingConfig], dict] = run_runtime_cycle,
+    ) -> None:
+        self.runtime = runtime
+        self.store = store
+        self.cfg = cfg
+        self.log_path = log_path
+        self.clock = clock
+        self.stop = stop or threading.Event()
+        self.cycle_fn = cycle_fn
+        self.cycles = 0
+
+    def warm_up(self) -> None:
+        """Load markets and create the execution engine ahead of the first bar."""
+
+        load_markets = getattr(self.runtime.client, "load_markets", None)
+        if callable(load_markets):
+            try:
+                load_markets()
+            except Exception as exc:  # pragma: no cover - network
+                LOGGER.warning("load_markets failed; will retry lazily: %s", exc)
+        if self.runtime.engine is None:
+            self.runtime.engine = ExecutionEngine(
+                self.runtime.client, self.store, self.cfg, log_path=self.log_path
+            )
+
+    def request_stop(self, *_args: object) -> None:
+        LOGGER.info("Stop requested; finishing current cycle")
+        self.stop.set()
+
+    def install_signal_handlers(self) -> None:
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+    def run_cycle(self, boundary_ms: int, wake_ms: int) -> dict:
+        started_ms = int(self.clock() * 1000)
+        try:
+            result = self.cycle_fn(self.runtime, self.store, self.cfg)
+        except Exception as exc:  # keep the daemon alive across bad cycles
+            LOGGER.exception("Cycle failed: %s", exc)
+            result = {"error": str(exc)}
+        finished_ms = int(self.clock() * 1000)
+        self.cycles += 1
+        payload = {
+            "ts": finished_ms,
+            "symbol": self.cfg.symbol,
+            "bar_close": boundary_ms,
+            "status": result.get("status", "error" if "error" in result else None),
+            "wake_lag_ms": started_ms - wake_ms,
+            "cycle_ms": finished_ms - started_ms,
+        }
+        submitted_ms = result.get("submitted_ms")
+        if submitted_ms is not None:
+            payload["close_to_order_ms"] = submitted_ms - boundary_ms
+            payload["wake_to_order_ms"] = submitted_ms - wake_ms
+            if payload["close_to_order_ms"] > self.cfg.daemon.latency_budget_ms:
+                LOGGER.warning(
+                    "Order placement took %s ms after bar close (%s ms after wake)",
+                    payload["close_to_order_ms"],
+                    payload["wake_to_order_ms"],
+                )
+        jlog(self.log_path, "daemon_cycle", **payload)
+        return result
+
+    def run(self, max_cycles: Optional[int] = None) -> int:
+        """Run cycles at every bar close until stopped; returns cycles run."""
+
+        settle_ms = int(self.cfg.daemon.settle_s * 1000)
+        while not self.stop.is_set():
+            now_ms = int(self.clock() * 1000)
+            wake_ms = next_wake_ms(now_ms, self.cfg.timeframe, settle_ms)
+            if self.stop.wait(max(wake_ms - now_ms, 0) / 1000.0):
+                break
+            self.run_cycle(wake_ms - settle_ms, wake_ms)
+            if max_cycles is not None and self.cycles >= max_cycles:
+                break
+        return self.cycles
+
+
+def main(db_path: Path | str = Path("data/mini.db")) -> int:
+    cfg = load_config()
+    runtime = build_runtime(cfg)
+    try:
+        with StateStore(db_path) as store:
+            daemon = CycleDaemon(runtime, store, cfg.trading)
+            daemon.install_signal_handlers()
+            daemon.warm_up()
+            LOGGER.info("Daemon started for %s %s", cfg.trading.symbol, cfg.trading.timeframe)
+            return daemon.run()
+    finally:
+        runtime.close()
+
+
+__all__ = ["CycleDaemon", "next_wake_ms"]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
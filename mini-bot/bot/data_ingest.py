@@ -100,16 +100,20 @@ def fetch_candles(
     raise RuntimeError("fetch_candles failed") from last_error
 
 
-def ingest_cycle(ccxt_client, store: StateStore, symbol: str, tf: str) -> list[Candle]:
-    """Fetch and persist the most recent closed candles."""
-    tf_seconds = timeframe_to_seconds(tf)
-    step_ms = tf_seconds * 1000
+def ingest_since(store: StateStore, symbol: str, tf: str) -> int | None:
+    """Start of the fetch window: one bar before the last stored close."""
+
+    step_ms = timeframe_to_seconds(tf) * 1000
     last = store.get_last_n_candles(symbol, tf, 1)
-    since: int | None = None
-    if last:
-        last_close = last[0].ts_close
-        since = max(0, last_close - step_ms)
-    candles = fetch_candles(ccxt_client, symbol, tf, since=since)
+    if not last:
+        return None
+    return max(0, last[0].ts_close - step_ms)
+
+
+def store_closed_candles(store: StateStore, symbol: str, tf: str, candles: list[Candle]) -> list[Candle]:
+    """Persist the closed subset of *candles*; returns the latest three."""
+
+    step_ms = timeframe_to_seconds(tf) * 1000
     candles = sorted(candles, key=lambda c: c.ts_close)
     if not candles:
         LOGGER.warning("No candles fetched for symbol=%s tf=%s", symbol, tf)
@@ -133,4 +137,17 @@ def ingest_cycle(ccxt_client, store: StateStore, symbol: str, tf: str) -> list[C
     return latest
 
 
-__all__ = ["TIMEFRAME_TO_SECONDS", "fetch_candles", "ingest_cycle", "timeframe_to_seconds"]
+def ingest_cycle(ccxt_client, store: StateStore, symbol: str, tf: str) -> list[Candle]:
+    """Fetch and persist the most recent closed candles."""
+    candles = fetch_candles(ccxt_client, symbol, tf, since=ingest_since(store, symbol, tf))
+    return store_closed_candles(store, symbol, tf, candles)
+
+
+__all__ = [
+    "TIMEFRAME_TO_SECONDS",
+    "fetch_candles",
+    "ingest_cycle",
+    "ingest_since",
+    "store_closed_candles",
+    "timeframe_to_seconds",
+]
@@ -0,0 +1,97 @@
+"""Time budget for one trading cycle.
+
+A :class:`CycleDeadline` starts when the cycle starts and gives each stage
+an offset it should be done by: the exchange prefetch, the decision (after
+which optional work such as shadow scoring and online learning is skipped)
+and the overall budget. Slow optional work is skipped or deferred so that
+the order path stays within budget, and every skip is recorded for the
+``cycle_deadline`` event.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from bot.config import DeadlineConfig
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CycleDeadline:
+    def __init__(
+        self,
+        budget_ms: float,
+        stages: Optional[Mapping[str, float]] = None,
+        notify_min_ms: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.budget_ms = float(budget_ms)
+        self.stages = {name: min(float(ms), self.budget_ms) for name, ms in (stages or {}).items()}
+        self.notify_min_ms = float(notify_min_ms)
+        self.clock = clock
+        self.started = clock()
+        self.skipped: List[str] = []
+        self.deferred: List[str] = []
+        self.stale: Dict[str, float] = {}
+
+    @classmethod
+    def from_config(cls, cfg: DeadlineConfig, clock: Callable[[], float] = time.monotonic) -> "CycleDeadline":
+        return cls(
+            cfg.budget_ms,
+            {"prefetch": cfg.prefetch_ms, "decision": cfg.decision_ms},
+            notify_min_ms=cfg.notify_min_ms,
+            clock=clock,
+        )
+
+    def elapsed_ms(self) -> float:
+        return (self.clock() - self.started) * 1000.0
+
+    def remaining_ms(self, stage: Optional[str] = None) -> float:
+        """Time left until *stage*'s deadline (the whole budget by default)."""
+
+        return self.stages.get(stage, self.budget_ms) - self.elapsed_ms()
+
+    def remaining_s(self, stage: Optional[str] = None) -> float:
+        return max(0.0, self.remaining_ms(stage) / 1000.0)
+
+    def allows(self, stage: Optional[str] = None, need_ms: float = 0.0) -> bool:
+        return self.remaining_ms(stage) > need_ms
+
+    def skip(self, name: str) -> None:
+        LOGGER.warning(
+            "Skipping %s: %.0f ms into a %.0f ms cycle budget", name, self.elapsed_ms(), self.budget_ms
+        )
+        self.skipped.append(name)
+
+    def notify(self, notifier: Any, text: str) -> None:
+        """Send *text* now if the budget allows it, otherwise queue it for :meth:`flush`."""
+
+        if self.allows(need_ms=self.notify_min_ms):
+            notifier.send_message(text)
+        else:
+            self.deferred.append(text)
+
+    def flush(self, notifier: Any) -> int:
+        """Send deferred messages; call once orders are out."""
+
+        sent, self.deferred = self.deferred, []
+        for text in sent:
+            notifier.send_message(text)
+        return len(sent)
+
+    @property
+    def eventful(self) -> bool:
+        return bool(self.skipped or self.deferred or self.stale) or self.remaining_ms() < 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "budget_ms": self.budget_ms,
+            "elapsed_ms": round(self.elapsed_ms(), 3),
+            "skipped": list(self.skipped),
+            "deferred": len(self.deferred),
+            "stale_s": dict(self.stale),
+        }
+
+
+__all__ = ["CycleDeadline"]
@@ -0,0 +1,283 @@
+"""Live feature drift against the training distribution.
+
+Training publishes a :class:`FeatureProfile` (quantile bin edges and bin
+proportions per feature) next to the model. Live rows go through
+:class:`DriftMonitor`, which keeps a sliding window of raw values plus
+per-bin counts updated in O(1) per feature, and compares the window with
+the profile by PSI and a binned Kolmogorov-Smirnov statistic. Missing or
+non-finite values fall into a dedicated last bin, so a NaN-heavy input
+shows up as drift rather than being silently zero-filled.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import math
+import os
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence
+
+LOGGER = logging.getLogger(__name__)
+
+PROFILE_NAME = "profile.json"
+STATE_FORMAT = 1
+# Floor for empty bins so PSI stays finite.
+_PSI_EPS = 1e-4
+
+
+@dataclass
+class FeatureProfile:
+    """Per-feature inner bin edges and expected bin proportions.
+
+    ``expected[name]`` has ``len(edges[name]) + 2`` entries: one per value
+    bin followed by the missing-value bin.
+    """
+
+    edges: Dict[str, List[float]]
+    expected: Dict[str, List[float]]
+    n: int = 0
+
+    @property
+    def feature_names(self) -> List[str]:
+        return list(self.edges)
+
+    def bin_index(self, name: str, value: Optional[float]) -> int:
+        edges = self.edges[name]
+        if value is None or not math.isfinite(value):
+            return len(edges) + 1
+        return bisect.bisect_right(edges, value)
+
+    def spread(self, name: str) -> float:
+        """Distance between the outermost bin edges (the inter-decile range at 10 bins)."""
+
+        edges = self.edges.get(name) or []
+        return edges[-1] - edges[0] if len(edges) > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"n": self.n, "edges": self.edges, "expected": self.expected}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "FeatureProfile":
+        return cls(
+            {k: [float(v) for v in vals] for k, vals in data["edges"].items()},
+            {k: [float(v) for v in vals] for k, vals in data["expected"].items()},
+            int(data.get("n", 0)),
+        )
+
+
+def build_profile(
+    feature_names: Sequence[str], rows: Sequence[Sequence[Optional[float]]], bins: int = 10
+) -> FeatureProfile:
+    """Quantile-binned profile of *rows* (ordered like *feature_names*)."""
+
+    edges: Dict[str, List[float]] = {}
+    expected: Dict[str, List[float]] = {}
+    for j, name in enumerate(feature_names):
+        column = [row[j] for row in rows]
+        finite = sorted(v for v in column if v is not None and math.isfinite(v))
+        cuts: List[float] = []
+        for q in range(1, bins):
+            if not finite:
+                break
+            cut = float(finite[min(len(finite) - 1, q * len(finite) // bins)])
+            if not cuts or cut > cuts[-1]:
+                cuts.append(cut)
+        edges[name] = cuts
+        counts = [0] * (len(cuts) + 2)
+        for value in column:
+            missing = value is None or not math.isfinite(value)
+            counts[len(cuts) + 1 if missing else bisect.bisect_right(cuts, value)] += 1
+        total = max(len(column), 1)
+        expected[name] = [c / total for c in counts]
+    return FeatureProfile(edges, expected, len(rows))
+
+
+def profile_path(model_path: Path | str) -> Path:
+    """Where the profile for a model lives: inside artifact dirs, else beside the pickle."""
+
+    model_path = Path(model_path)
+    return model_path / PROFILE_NAME if model_path.is_dir() else model_path.with_name(PROFILE_NAME)
+
+
+def save_profile(profile: FeatureProfile, path: Path | str) -> None:
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(profile.to_dict(), sort_keys=True))
+    os.replace(tmp, path)
+
+
+def load_profile(path: Path | str) -> Optional[FeatureProfile]:
+    try:
+        return FeatureProfile.from_dict(json.loads(Path(path).read_text()))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def psi(expected: Sequence[float], actual: Sequence[float]) -> float:
+    total = 0.0
+    for e, a in zip(expected, actual):
+        e = max(e, _PSI_EPS)
+        a = max(a, _PSI_EPS)
+        total += (a - e) * math.log(a / e)
+    return total
+
+
+def ks(expected: Sequence[float], actual: Sequence[float]) -> float:
+    """Largest gap between the two binned CDFs."""
+
+    gap = cum_e = cum_a = 0.0
+    for e, a in zip(expected, actual):
+        cum_e += e
+        cum_a += a
+        gap = max(gap, abs(cum_a - cum_e))
+    return gap
+
+
+class DriftMonitor:
+    """Sliding-window histograms of live features scored against a profile."""
+
+    def __init__(self, profile: FeatureProfile, window: int = 180) -> None:
+        self.window = window
+        self.values: Dict[str, Deque[Optional[float]]] = {}
+        self.source: Optional[Path] = None
+        # Close time of the last observed row; a bar is only counted once.
+        self.last_ts: Optional[int] = None
+        self.set_profile(profile)
+
+    @classmethod
+    def for_model(
+        cls, model_path: Path | str, state_path: Path | str, window: int = 180
+    ) -> Optional["DriftMonitor"]:
+        """Monitor seeded from saved state, or ``None`` if the model has no profile."""
+
+        source = profile_path(model_path)
+        profile = load_profile(source)
+        if profile is None:
+            LOGGER.info("No feature profile at %s; drift monitoring disabled", source)
+            return None
+        monitor = cls.load(state_path, profile, window)
+        monitor.source = source
+        return monitor
+
+    def sync_profile(self, model_path: Path | str) -> bool:
+        """Follow a model swap to its profile; keeps the current one if it has none."""
+
+        source = profile_path(model_path)
+        if source == self.source:
+            return False
+        self.source = source
+        profile = load_profile(source)
+        if profile is None:
+            LOGGER.warning("No feature profile at %s; keeping previous profile", source)
+            return False
+        self.set_profile(profile)
+        return True
+
+    def set_profile(self, profile: FeatureProfile) -> None:
+        """Switch profiles, re-binning the retained window."""
+
+        self.profile = profile
+        self.counts: Dict[str, List[int]] = {}
+        for name in profile.feature_names:
+            values = self.values.setdefault(name, deque(maxlen=self.window))
+            counts = [0] * len(profile.expected[name])
+            for value in values:
+                counts[profile.bin_index(name, value)] += 1
+            self.counts[name] = counts
+
+    @property
+    def n(self) -> int:
+        return max((len(v) for v in self.values.values()), default=0)
+
+    def observe(self, features: Mapping[str, Optional[float]], ts: Optional[int] = None) -> bool:
+        """Add one row; a *ts* not newer than the last observed one is ignored."""
+
+        if ts is not None:
+            if self.last_ts is not None and ts <= self.last_ts:
+                return False
+            self.last_ts = ts
+        for name, counts in self.counts.items():
+            values = self.values[name]
+            if len(values) == values.maxlen:
+                counts[self.profile.bin_index(name, values[0])] -= 1
+            value = features.get(name)
+            value = float(value) if value is not None and math.isfinite(value) else None
+            values.append(value)
+            counts[self.profile.bin_index(name, value)] += 1
+        return True
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        for name, counts in self.counts.items():
+            total = sum(counts)
+            if not total:
+                continue
+            actual = [c / total for c in counts]
+            expected = self.profile.expected[name]
+            out[name] = {
+                "psi": psi(expected, actual),
+                "ks": ks(expected, actual),
+                "missing": actual[-1],
+                "n": float(total),
+            }
+        return out
+
+    def alerts(
+        self,
+        psi_alert: float = 0.25,
+        ks_alert: float = 0.3,
+        missing_alert: float = 0.05,
+        min_samples: int = 30,
+    ) -> Dict[str, Dict[str, float]]:
+        """Features whose window breaches any threshold (after ``min_samples`` rows)."""
+
+        if self.n < min_samples:
+            return {}
+        return {
+            name: stats
+            for name, stats in self.report().items()
+            if stats["psi"] > psi_alert or stats["ks"] > ks_alert or stats["missing"] > missing_alert
+        }
+
+    def save(self, path: Path | str) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "format": STATE_FORMAT,
+            "values": {name: list(values) for name, values in self.values.items()},
+            "last_ts": self.last_ts,
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path | str, profile: FeatureProfile, window: int = 180) -> "DriftMonitor":
+        monitor = cls(profile, window)
+        try:
+            state = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return monitor
+        if state.get("format") != STATE_FORMAT:
+            return monitor
+        for name, values in state.get("values", {}).items():
+            monitor.values[name] = deque(values, maxlen=window)
+        monitor.last_ts = state.get("last_ts")
+        monitor.set_profile(profile)
+        return monitor
+
+
+__all__ = [
+    "DriftMonitor",
+    "FeatureProfile",
+    "PROFILE_NAME",
+    "build_profile",
+    "ks",
+    "load_profile",
+    "profile_path",
+    "psi",
+    "save_profile",
+]
@@ -0,0 +1,104 @@
+"""Pluggable child-order slicing algorithms (TWAP, iceberg)."""
+from __future__ import annotations
+
+import json
+import random
+from typing import Dict, List, Protocol, Tuple
+
+from bot.state_store import AlgoChild, AlgoOrder
+
+# Child states that may still be resting on the venue. ``unknown`` children
+# were submitted without an ack and are resolved by client order id.
+WORKING_STATUSES = frozenset({"open", "unknown"})
+
+
+class ExecAlgo(Protocol):
+    name: str
+    # Cancel still-open children before the next slice goes out.
+    cancel_open_children: bool
+
+    def next_child(
+        self,
+        parent: AlgoOrder,
+        children: List[AlgoChild],
+        now_ms: int,
+        rng: random.Random,
+    ) -> Tuple[float, int]:
+        """Return ``(qty_to_send_now, next_wake_ms)``; qty 0 means wait."""
+        ...
+
+    def exhausted(self, parent: AlgoOrder) -> bool:
+        """True once the algorithm will not send further children."""
+        ...
+
+
+def _params(parent: AlgoOrder) -> Dict[str, float]:
+    try:
+        data = json.loads(parent.params or "{}")
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _remaining(parent: AlgoOrder, children: List[AlgoChild]) -> float:
+    open_qty = sum(c.qty - c.filled for c in children if c.status in WORKING_STATUSES)
+    return max(0.0, parent.total_qty - parent.filled_qty - open_qty)
+
+
+class TwapAlgo:
+    """Send ``slices`` equal children spaced evenly over ``duration_ms``.
+
+    Unfilled quantity from a slice is cancelled at the next slice boundary
+    and rolled into the remaining slices.
+    """
+
+    name = "twap"
+    cancel_open_children = True
+
+    def next_child(self, parent, children, now_ms, rng):
+        params = _params(parent)
+        slices = max(int(params.get("slices", 6)), 1)
+        interval = max(int(params.get("duration_ms", 0)) // slices, 1)
+        if parent.slices_sent >= slices:
+            return 0.0, now_ms + interval
+        slices_left = slices - parent.slices_sent
+        return _remaining(parent, children) / slices_left, now_ms + interval
+
+    def exhausted(self, parent):
+        return parent.slices_sent >= max(int(_params(parent).get("slices", 6)), 1)
+
+
+class IcebergAlgo:
+    """Keep one child of randomized size resting until the parent is done."""
+
+    name = "iceberg"
+    cancel_open_children = False
+
+    def next_child(self, parent, children, now_ms, rng):
+        params = _params(parent)
+        interval = max(int(params.get("interval_ms", 60_000)), 1)
+        if any(c.status in WORKING_STATUSES for c in children):
+            return 0.0, now_ms + interval
+        display = float(params.get("display_qty", parent.total_qty))
+        jitter = min(max(float(params.get("jitter", 0.0)), 0.0), 0.9)
+        size = display * rng.uniform(1.0 - jitter, 1.0 + jitter)
+        return min(_remaining(parent, children), size), now_ms + interval
+
+    def exhausted(self, parent):
+        return parent.filled_qty >= parent.total_qty
+
+
+ALGORITHMS: Dict[str, ExecAlgo] = {
+    TwapAlgo.name: TwapAlgo(),
+    IcebergAlgo.name: IcebergAlgo(),
+}
+
+
+def get_algo(name: str) -> ExecAlgo:
+    try:
+        return ALGORITHMS[name.lower()]
+    except KeyError as exc:
+        raise ValueError(f"Unsupported execution algorithm: {name}") from exc
+
+
+__all__ = ["ALGORITHMS", "ExecAlgo", "IcebergAlgo", "TwapAlgo", "WORKING_STATUSES", "get_algo"]
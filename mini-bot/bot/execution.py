@@ -2,13 +2,18 @@
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
+import math
+import random
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Dict, List, Optional
 
 from bot.config import TradingConfig
+from bot.exec_algos import WORKING_STATUSES, get_algo
+from bot.latency import LatencyRecorder, TimedClient
 from bot.logger import jlog
 from bot.market_guard import (
     SymbolMeta,
@@ -17,12 +22,78 @@ from bot.market_guard import (
     round_to_step,
     sanitize_order,
 )
-from bot.state_store import Order, Position, StateStore
-from bot.venue_adapter import order_params
+from bot.state_store import (
+    AccountSettings,
+    AlgoChild,
+    AlgoOrder,
+    Fill,
+    Order,
+    Position,
+    StateStore,
+)
+from bot.venue_adapter import order_params, supports_bracket
 
 LOGGER = logging.getLogger(__name__)
 
 
+_AMBIGUOUS_ERRORS = frozenset(
+    {
+        "NetworkError",
+        "RequestTimeout",
+        "ExchangeNotAvailable",
+        "OnMaintenance",
+        "DDoSProtection",
+        "RateLimitExceeded",
+        "TimeoutError",
+        "ConnectionError",
+    }
+)
+_DEFINITIVE_ERRORS = frozenset(
+    {
+        "ExchangeError",
+        "InvalidOrder",
+        "InsufficientFunds",
+        "BadRequest",
+        "BadSymbol",
+        "AuthenticationError",
+        "PermissionDenied",
+        "ValueError",
+        "TypeError",
+    }
+)
+# Depths accepted by the Binance USDM order book endpoint; other values are rejected.
+_BOOK_DEPTHS = (5, 10, 20, 50, 100, 500, 1000)
+# Absorbs float residue before snapping quantities down to the step grid.
+_QTY_EPS = 1e-9
+
+
+def _min_sendable_qty(meta: SymbolMeta, px: float) -> float:
+    """Smallest quantity on the step grid that clears min_qty and min_notional at *px*."""
+
+    step = meta.quantity_increment
+    floor = max(meta.min_qty, step, meta.min_notional / px if px > 0 else 0.0)
+    return round(math.ceil(floor / step - _QTY_EPS) * step, 12) if step > 0 else floor
+
+
+def _algo_ref_px(parent: AlgoOrder) -> float:
+    return float(json.loads(parent.params or "{}").get("ref_px") or parent.limit_px)
+
+
+class SubmitUnconfirmed(RuntimeError):
+    """Raised when an order may or may not be live on the venue."""
+
+
+def _error_names(exc: BaseException) -> set[str]:
+    return {cls.__name__ for cls in type(exc).__mro__}
+
+
+def _is_ambiguous_error(exc: BaseException) -> bool:
+    names = _error_names(exc)
+    if names & _AMBIGUOUS_ERRORS:
+        return True
+    return not names & _DEFINITIVE_ERRORS
+
+
 @dataclass
 class LadderLevel:
     level: int
@@ -39,11 +110,14 @@ class ExecutionEngine:
         cfg: TradingConfig,
         log_path: str | Path | None = None,
     ) -> None:
-        self.client = ccxt_client
+        self.latency = LatencyRecorder(store, getattr(ccxt_client, "id", "") or "")
+        self.client = TimedClient(ccxt_client, self.latency)
         self.store = store
         self.cfg = cfg
         self._leverage_configured: Dict[str, bool] = {}
         self._symbol_meta: Dict[str, SymbolMeta] = {}
+        self._book_cache: Dict[str, tuple[float, dict]] = {}
+        self._rng = random.Random()
         self.log_path = str(log_path) if log_path else None
 
     # ------------------------------------------------------------------
@@ -65,6 +139,104 @@ class ExecutionEngine:
             prices.append(price - offset if side == "buy" else price + offset)
         return prices
 
+    def _order_book(self, symbol: str) -> Optional[dict]:
+        """Return a shallow order book snapshot, cached for ``order.book_ttl_ms``."""
+
+        now = time.monotonic()
+        cached = self._book_cache.get(symbol)
+        if cached and (now - cached[0]) * 1000.0 < self.cfg.order.book_ttl_ms:
+            return cached[1]
+        fetch_book = getattr(self.client, "fetch_order_book", None)
+        if not callable(fetch_book):
+            return None
+        try:
+            book = fetch_book(symbol, limit=_book_depth(self.cfg.order.ladder_levels))
+        except Exception as exc:  # pragma: no cover - network
+            LOGGER.debug("fetch_order_book failed: %s", exc)
+            return None
+        if not isinstance(book, dict):
+            return None
+        self._book_cache[symbol] = (now, book)
+        return book
+
+    def _book_ladder_prices(self, symbol: str, side: str) -> Optional[List[float]]:
+        """Place ladder levels relative to the live best bid/ask.
+
+        Level 0 joins the touch, or improves it by one tick when the spread
+        is wider than two ticks, but never reaches the opposite side so the
+        level stays post-only. Deeper levels are spaced by at least
+        ``order.book_step_bp`` and never sit ahead of the book's own k-th
+        price level.
+        """
+
+        book = self._order_book(symbol)
+        if not book:
+            return None
+        bids = [row for row in book.get("bids") or [] if row]
+        asks = [row for row in book.get("asks") or [] if row]
+        if not bids or not asks:
+            return None
+        best_bid = _coerce_float(bids[0][0])
+        best_ask = _coerce_float(asks[0][0])
+        if not best_bid or not best_ask or best_ask <= best_bid:
+            return None
+        tick = self._load_symbol_meta(symbol).price_increment
+        mid = (best_bid + best_ask) / 2.0
+        step = max(tick, mid * self.cfg.order.book_step_bp / 10000.0)
+        improve = tick if best_ask - best_bid > 2 * tick else 0.0
+        same_side = bids if side == "buy" else asks
+        prices = []
+        for level in range(max(self.cfg.order.ladder_levels, 1)):
+            if side == "buy":
+                candidate = best_bid + improve - step * level
+                if level and level < len(same_side):
+                    candidate = min(candidate, _coerce_float(same_side[level][0]) or candidate)
+                candidate = min(candidate, best_ask - tick)
+            else:
+                candidate = best_ask - improve + step * level
+                if level and level < len(same_side):
+                    candidate = max(candidate, _coerce_float(same_side[level][0]) or candidate)
+                candidate = max(candidate, best_bid + tick)
+            prices.append(candidate)
+        return prices
+
+    def _arrival_px(self, symbol: str, fallback: float) -> float:
+        """Mid of the book snapshot the ladder was priced from, else *fallback*."""
+
+        book = self._order_book(symbol) if self.cfg.order.book_aware else None
+        if book:
+            bids = book.get("bids") or []
+            asks = book.get("asks") or []
+            bid = _coerce_float(bids[0][0]) if bids and bids[0] else None
+            ask = _coerce_float(asks[0][0]) if asks and asks[0] else None
+            if bid and ask and ask > bid:
+                return (bid + ask) / 2.0
+        return fallback
+
+    def _record_fill(
+        self,
+        oid: str,
+        cumulative_qty: float,
+        px: float,
+        maker: bool = True,
+        cumulative_fee: float = 0.0,
+    ) -> None:
+        """Store the part of *cumulative_qty* not yet recorded for *oid* as a fill.
+
+        Fills carried over from repriced predecessors are not part of the
+        venue's cumulative count for *oid* and are left out of the comparison.
+        """
+
+        seen = self.store.list_fills(oid)
+        base_qty, base_fee = self.store.get_fill_offset(oid)
+        delta = cumulative_qty - (sum(f.qty for f in seen) - base_qty)
+        if delta <= 1e-12 or px <= 0:
+            return
+        fee = max(0.0, cumulative_fee - (sum(f.fee for f in seen) - base_fee))
+        self.store.record_fill(
+            Fill(oid=oid, ts=int(time.time() * 1000), qty=delta, px=px, maker=maker, fee=fee)
+        )
+
     def _hash_coid(self, seed: str) -> str:
         return hashlib.md5(seed.encode("utf8")).hexdigest()[:24]
 
@@ -72,21 +244,71 @@ class ExecutionEngine:
         base = f"{symbol}|{side}|{level}|{ts}"
         return self._hash_coid(base)
 
+    def _fetch_account_settings(self, symbol: str) -> tuple[Optional[str], Optional[float]]:
+        """Return the venue's current (margin_mode, leverage) for *symbol* if exposed."""
+
+        fetch_risk = getattr(self.client, "fetch_positions_risk", None)
+        if not callable(fetch_risk):
+            return None, None
+        try:  # pragma: no cover - exchange specific
+            rows = fetch_risk([symbol]) or []
+        except Exception as exc:
+            LOGGER.debug("fetch_positions_risk failed: %s", exc)
+            return None, None
+        for row in rows:
+            if not isinstance(row, dict) or row.get("symbol") not in (None, symbol):
+                continue
+            info = row.get("info") if isinstance(row.get("info"), dict) else {}
+            mode = row.get("marginMode") or info.get("marginType") or info.get("marginMode")
+            margin_mode = str(mode).lower() if mode else None
+            if margin_mode == "crossed":
+                margin_mode = "cross"
+            leverage = _coerce_float(row.get("leverage") or info.get("leverage"))
+            return margin_mode, leverage
+        return None, None
+
     def _ensure_leverage(self, symbol: str) -> None:
         if self._leverage_configured.get(symbol):
             return
+        margin_mode = self.cfg.venue.margin_mode
+        leverage = float(self.cfg.leverage)
+        now_ms = int(time.time() * 1000)
+        ttl_ms = max(0, int(self.cfg.venue.account_settings_ttl_s)) * 1000
+        cached = self.store.get_account_settings(symbol)
+        if (
+            cached is not None
+            and now_ms - cached.ts_checked < ttl_ms
+            and cached.margin_mode == margin_mode
+            and cached.leverage == leverage
+        ):
+            self._leverage_configured[symbol] = True
+            return
+
+        current_mode, current_leverage = self._fetch_account_settings(symbol)
+        synced = True
         set_margin = getattr(self.client, "set_margin_mode", None)
-        if callable(set_margin):
+        if callable(set_margin) and current_mode != margin_mode:
             try:  # pragma: no cover - exchange specific
-                set_margin("isolated", symbol)
+                set_margin(margin_mode, symbol)
             except Exception as exc:
                 LOGGER.warning("set_margin_mode failed: %s", exc)
+                synced = False
         set_leverage = getattr(self.client, "set_leverage", None)
-        if callable(set_leverage):
+        if callable(set_leverage) and current_leverage != leverage:
             try:  # pragma: no cover - exchange specific
                 set_leverage(self.cfg.leverage, symbol)
             except Exception as exc:
                 LOGGER.warning("set_leverage failed: %s", exc)
+                synced = False
+        if synced:
+            self.store.upsert_account_settings(
+                AccountSettings(
+                    symbol=symbol,
+                    margin_mode=margin_mode,
+                    leverage=leverage,
+                    ts_checked=now_ms,
+                )
+            )
         self._leverage_configured[symbol] = True
 
     def _load_symbol_meta(self, symbol: str) -> SymbolMeta:
@@ -142,14 +364,29 @@ class ExecutionEngine:
         for order in self.store.list_orders(symbol):
             if not order.post_only:
                 continue
+            if order.status == "unknown":
+                # Keyed by the client id, which cancel_order does not accept.
+                resolved = self._resolve_unknown(symbol, order, now_ms)
+                if resolved is None:
+                    continue
+                order = resolved
             age = now_ms - order.ts_created
             if age < ttl_ms:
                 continue
             try:
-                self.client.cancel_order(order.oid, symbol=symbol)
-            except Exception as exc:  # pragma: no cover - defensive
-                LOGGER.error("Failed to cancel stale order %s: %s", order.oid, exc)
-                continue
+                result = self.client.cancel_order(order.oid, symbol=symbol)
+            except Exception as exc:
+                # Usually OrderNotFound for a level that filled since the last sync.
+                LOGGER.warning("Failed to cancel stale order %s: %s", order.oid, exc)
+                result = self._fetch_closed(symbol, order)
+                if result is None:
+                    continue
+            if isinstance(result, dict):
+                # Capture partial fills reported by the cancel ack for TCA.
+                filled = _coerce_float(result.get("filled")) or 0.0
+                if filled > 0:
+                    avg = _coerce_float(result.get("average")) or order.px
+                    self._record_fill(order.oid, min(filled, order.qty), avg)
             self.store.delete_order(order.oid)
             self._log_event(
                 "order_expired",
@@ -159,8 +396,61 @@ class ExecutionEngine:
                 client_order_id=order.client_order_id,
             )
             expired += 1
+        self.latency.flush()
         return expired
 
+    def _fetch_closed(self, symbol: str, order: Order) -> Optional[dict]:
+        """Venue view of *order* once it is no longer open; ``None`` while open or unknown."""
+
+        try:
+            fetched = self.client.fetch_order(order.oid, symbol=symbol)
+        except Exception as exc:  # pragma: no cover - network
+            LOGGER.error("fetch_order for stale order %s failed: %s", order.oid, exc)
+            return None
+        if not isinstance(fetched, dict):
+            return None
+        status = _order_status(fetched.get("status"))
+        if status == "open":
+            return None
+        if status == "closed" and fetched.get("filled") is None:
+            fetched = {**fetched, "filled": order.qty}
+        return fetched
+
+    def _resolve_unknown(self, symbol: str, order: Order, now_ms: int) -> Optional[Order]:
+        """Settle an ``unknown`` row by looking its client order id up on the venue.
+
+        Returns the row re-keyed to the venue order id while it is still open;
+        ``None`` once it is resolved and removed, or if the venue cannot tell yet.
+        """
+
+        coid = order.client_order_id or order.oid
+        found, missing = self._find_order_by_coid(symbol, coid)
+        if found is None:
+            if missing:
+                self.store.delete_order(order.oid)
+                self.store.delete_tca_order(order.oid)
+                self._log_event(
+                    "order_resolved", ts=now_ms, symbol=symbol, client_order_id=coid, status="missing"
+                )
+            return None
+        oid = str(found.get("id") or order.oid)
+        if oid != order.oid:
+            # Fills are recorded under the venue id, so its submission must be too.
+            self.store.remap_tca_order(order.oid, oid)
+        status = _order_status(found.get("status"))
+        filled = _coerce_float(found.get("filled")) or 0.0
+        if filled > 0:
+            self._record_fill(oid, min(filled, order.qty), _coerce_float(found.get("average")) or order.px)
+        self.store.delete_order(order.oid)
+        self._log_event(
+            "order_resolved", ts=now_ms, symbol=symbol, client_order_id=coid, order_id=oid, status=status
+        )
+        if status != "open":
+            return None
+        adopted = replace(order, oid=oid, status="open", ts_updated=now_ms, reject_reason=None)
+        self.store.upsert_order(adopted)
+        return adopted
+
     def cancel_all(self, symbol: str) -> None:
         for order in self.store.list_orders(symbol):
             try:
@@ -177,6 +467,205 @@ class ExecutionEngine:
                 client_order_id=order.client_order_id,
                 reason="manual_cancel",
             )
+        self.latency.flush()
+
+    # ------------------------------------------------------------------
+    def _top_of_book(self, symbol: str) -> tuple[Optional[float], Optional[float]]:
+        book = self._order_book(symbol)
+        if book:
+            bids = book.get("bids") or []
+            asks = book.get("asks") or []
+            bid = _coerce_float(bids[0][0]) if bids else None
+            ask = _coerce_float(asks[0][0]) if asks else None
+            if bid or ask:
+                return bid, ask
+        fetch_ticker = getattr(self.client, "fetch_ticker", None)
+        if callable(fetch_ticker):
+            try:
+                ticker = fetch_ticker(symbol) or {}
+                return _coerce_float(ticker.get("bid")), _coerce_float(ticker.get("ask"))
+            except Exception as exc:  # pragma: no cover - network
+                LOGGER.debug("fetch_ticker failed: %s", exc)
+        return None, None
+
+    def reprice_ladder(
+        self,
+        symbol: str,
+        *,
+        max_requests: Optional[int] = None,
+        drift_bp: Optional[float] = None,
+        now_ms: Optional[int] = None,
+    ) -> int:
+        """Move resting post-only entry levels that drifted away from the book.
+
+        Levels are re-anchored to the current best bid/ask using the
+        book-aware ladder's ``order.book_step_bp`` spacing. Only levels further than ``drift_bp``
+        from their target are touched; amends cost one request and
+        cancel/replace two, and work stops once ``max_requests`` is spent.
+        Returns the number of levels repriced.
+        """
+
+        max_requests = self.cfg.order.reprice_max_requests if max_requests is None else max_requests
+        drift_bp = self.cfg.order.reprice_drift_bp if drift_bp is None else drift_bp
+        now_ms = now_ms or int(time.time() * 1000)
+        algo_oids = {
+            child.oid
+            for parent in self.store.list_algo_orders(symbol, status="active")
+            for child in self.store.list_algo_children(parent.algo_id)
+        }
+        resting = [
+            o
+            for o in self.store.list_orders(symbol, status="open")
+            if o.post_only and o.oid not in algo_oids
+        ]
+        if not resting or max_requests <= 0:
+            return 0
+        bid, ask = self._top_of_book(symbol)
+        budget = max_requests - 1
+        meta = self._load_symbol_meta(symbol)
+        can_amend = self._supports("editOrder", "edit_order")
+        repriced = 0
+        for side in ("buy", "sell"):
+            anchor = bid if side == "buy" else ask
+            if not anchor or anchor <= 0:
+                continue
+            orders = sorted(
+                (o for o in resting if o.side == side),
+                key=lambda o: o.px,
+                reverse=side == "buy",
+            )
+            # Same level spacing as the book-aware ladder.
+            step = max(meta.price_increment, anchor * self.cfg.order.book_step_bp / 10000.0)
+            for level, order in enumerate(orders):
+                target = anchor - step * level if side == "buy" else anchor + step * level
+                px = round_price_for_side(target, meta.price_increment, side)
+                if px <= 0 or abs(order.px - px) / px * 10000.0 < drift_bp:
+                    continue
+                cost = 1 if can_amend else 2
+                if budget < cost:
+                    self.latency.flush()
+                    return repriced
+                new_oid = self._reprice_order(symbol, order, px, can_amend)
+                budget -= cost
+                if new_oid is None:
+                    continue
+                repriced += 1
+                self._log_event(
+                    "order_reprice",
+                    ts=now_ms,
+                    symbol=symbol,
+                    side=side,
+                    order_id=new_oid,
+                    previous_order_id=order.oid,
+                    old_price=order.px,
+                    price=px,
+                    anchor=anchor,
+                    method="amend" if can_amend else "replace",
+                )
+        self.latency.flush()
+        return repriced
+
+    def _reprice_order(self, symbol: str, order: Order, px: float, can_amend: bool) -> Optional[str]:
+        # Re-attach native SL/TP legs, or the amended/replaced entry would fill unprotected.
+        bracket = {
+            name: value
+            for name, value in (("stop_loss", order.stop_loss), ("take_profit", order.take_profit))
+            if value
+        }
+        params = order_params(getattr(self.client, "id", ""), post_only=self.cfg.order.post_only, **bracket)
+        now_ms = int(time.time() * 1000)
+        qty = order.qty
+        if can_amend:
+            try:
+                result = self.client.edit_order(
+                    order.oid, symbol, "limit", order.side, order.qty, px, dict(params)
+                )
+            except Exception as exc:
+                LOGGER.warning("Reprice amend failed for %s: %s", order.oid, exc)
+                return None
+            new_oid = str((result or {}).get("id") or order.oid)
+            coid = order.client_order_id
+        else:
+            try:
+                cancelled = self.client.cancel_order(order.oid, symbol=symbol)
+            except Exception as exc:
+                # Most often the level filled or was cancelled since the last sync.
+                LOGGER.warning("Reprice cancel failed for %s: %s", order.oid, exc)
+                return None
+            filled = self._cancelled_fill(symbol, order, cancelled)
+            meta = self._load_symbol_meta(symbol)
+            if filled is not None:
+                qty = round_qty_floor(order.qty - filled, meta.quantity_increment)
+            if filled is None or qty < max(meta.min_qty, meta.quantity_increment):
+                # Fully filled, too small to re-post, or fills unknown: re-posting
+                # could overshoot the sized quantity, so the level is dropped.
+                self.store.delete_order(order.oid)
+                self._log_event(
+                    "order_cancel",
+                    ts=now_ms,
+                    symbol=symbol,
+                    order_id=order.oid,
+                    client_order_id=order.client_order_id,
+                    reason="reprice_filled" if filled is not None else "reprice_fill_unknown",
+                )
+                return None
+            coid = self._hash_coid(f"{order.client_order_id or order.oid}|reprice|{now_ms}")
+            try:
+                result = self.client.create_order(
+                    symbol=symbol,
+                    type="limit",
+                    side=order.side,
+                    amount=qty,
+                    price=px,
+                    params={**params, "clientOrderId": coid},
+                )
+            except Exception as exc:
+                LOGGER.error("Reprice replace failed for %s: %s", order.oid, exc)
+                self.store.delete_order(order.oid)
+                return None
+            new_oid = str((result or {}).get("id") or coid)
+        if new_oid != order.oid:
+            self.store.delete_order(order.oid)
+            self.store.remap_tca_order(order.oid, new_oid)
+        # Keep the original ts_created so timeout_bars expiry is unaffected.
+        self.store.upsert_order(
+            Order(
+                oid=new_oid,
+                symbol=symbol,
+                side=order.side,
+                qty=qty,
+                px=px,
+                status="open",
+                ts_created=order.ts_created,
+                ts_updated=now_ms,
+                post_only=True,
+                client_order_id=coid,
+                maker=True,
+                fee=0.0,
+                reject_reason=None,
+                stop_loss=order.stop_loss,
+                take_profit=order.take_profit,
+            )
+        )
+        return new_oid
+
+    def _cancelled_fill(self, symbol: str, order: Order, cancelled: object) -> Optional[float]:
+        """Filled quantity of a just-cancelled *order*, recorded as a fill; ``None`` if unknown."""
+
+        info = cancelled if isinstance(cancelled, dict) else {}
+        if info.get("filled") is None:
+            try:
+                fetched = self.client.fetch_order(order.oid, symbol=symbol)
+            except Exception as exc:  # pragma: no cover - network
+                LOGGER.warning("fetch_order after reprice cancel failed for %s: %s", order.oid, exc)
+                return None
+            info = fetched if isinstance(fetched, dict) else {}
+            if info.get("filled") is None:
+                return None
+        filled = min(_coerce_float(info.get("filled")) or 0.0, order.qty)
+        if filled > 0:
+            self._record_fill(order.oid, filled, _coerce_float(info.get("average")) or order.px)
+        return filled
 
     # ------------------------------------------------------------------
     def submit_ladder(
@@ -187,10 +676,22 @@ class ExecutionEngine:
         qty: float,
         stop_px: Optional[float] = None,
         tp_px: Optional[float] = None,
+        decided_at: Optional[float] = None,
     ) -> List[str]:
+        """Submit the post-only entry ladder and protect any immediate fills.
+
+        ``decided_at`` is the ``time.monotonic()`` stamp of the trading
+        decision; when given the signal-to-submit span is recorded.
+        """
+
         self._ensure_leverage(symbol)
         meta = self._load_symbol_meta(symbol)
-        prices = self._ladder_prices(side, price)
+        prices = None
+        if self.cfg.order.book_aware:
+            prices = self._book_ladder_prices(symbol, side)
+        if not prices:
+            prices = self._ladder_prices(side, price)
+        arrival_px = self._arrival_px(symbol, price)
         qty_per_order = qty / len(prices)
         ts = int(time.time() * 1000)
         levels: List[LadderLevel] = []
@@ -228,14 +729,25 @@ class ExecutionEngine:
                 continue
             levels.append(LadderLevel(level=idx, price=px, qty=level_qty, coid=coid))
 
+        venue = getattr(self.client, "id", "")
+        bracket: Dict[str, float] = {}
+        if self.cfg.order.native_brackets and supports_bracket(venue):
+            hedge_side = "sell" if side == "buy" else "buy"
+            if stop_px:
+                bracket["stop_loss"] = round_price_for_side(stop_px, meta.price_increment, hedge_side)
+            if tp_px:
+                bracket["take_profit"] = round_price_for_side(tp_px, meta.price_increment, hedge_side)
         order_ids: List[str] = []
         filled_qty = 0.0
         filled_value = 0.0
+        last_fill_at: Optional[float] = None
+        if decided_at is not None:
+            self.latency.record_since("signal_to_submit", decided_at)
         for level in levels:
             if self.store.get_order_by_coid(level.coid):
                 LOGGER.debug("Skipping duplicate ladder level %s", level.coid)
                 continue
-            params = order_params(getattr(self.client, "id", ""), post_only=self.cfg.order.post_only)
+            params = order_params(venue, post_only=self.cfg.order.post_only, **bracket)
             params = {**params, "clientOrderId": level.coid}
             self._log_event(
                 "order_submit",
@@ -246,18 +758,15 @@ class ExecutionEngine:
                 qty=level.qty,
                 client_order_id=level.coid,
                 level=level.level,
+                bracket=bool(bracket),
             )
             try:
-                order = self.client.create_order(
-                    symbol=symbol,
-                    type="limit",
-                    side=side,
-                    amount=level.qty,
-                    price=level.price,
-                    params=params,
-                )
-            except Exception as exc:  # pragma: no cover - best effort
+                order = self._create_order_idempotent(symbol, side, level, params)
+                acked_at = time.monotonic()
+            except Exception as exc:
                 LOGGER.error("Order submission failed: %s", exc)
+                unconfirmed = isinstance(exc, SubmitUnconfirmed)
+                reason = "submit_unconfirmed" if unconfirmed else "submit_error"
                 self._log_event(
                     "order_error",
                     ts=ts,
@@ -266,7 +775,7 @@ class ExecutionEngine:
                     price=level.price,
                     qty=level.qty,
                     client_order_id=level.coid,
-                    reason="submit_error",
+                    reason=reason,
                 )
                 self.store.upsert_order(
                     Order(
@@ -275,16 +784,21 @@ class ExecutionEngine:
                         side=side,
                         qty=level.qty,
                         px=level.price,
-                        status="rejected",
+                        status="unknown" if unconfirmed else "rejected",
                         ts_created=ts,
                         ts_updated=ts,
                         post_only=True,
                         client_order_id=level.coid,
                         maker=True,
                         fee=0.0,
-                        reject_reason="submit_error",
+                        reject_reason=reason,
                     )
                 )
+                if unconfirmed:
+                    # Keyed by the client id until _resolve_unknown adopts the venue id.
+                    self.store.record_tca_order(
+                        level.coid, symbol, venue, side, level.level, level.qty, arrival_px, ts
+                    )
                 continue
             oid = str(order.get("id") or order.get("clientOrderId") or level.coid)
             status_raw = str(order.get("status", "open")).lower()
@@ -312,6 +826,9 @@ class ExecutionEngine:
             elif isinstance(order.get("postOnly"), bool):
                 maker = bool(order.get("postOnly"))
             order_ids.append(oid)
+            self.store.record_tca_order(
+                oid, symbol, venue, side, level.level, level.qty, arrival_px, ts
+            )
             self.store.upsert_order(
                 Order(
                     oid=oid,
@@ -327,6 +844,8 @@ class ExecutionEngine:
                     maker=maker,
                     fee=fee,
                     reject_reason=None,
+                    stop_loss=bracket.get("stop_loss"),
+                    take_profit=bracket.get("take_profit"),
                 )
             )
             filled_amount = 0.0
@@ -337,6 +856,8 @@ class ExecutionEngine:
             if filled_amount > 0:
                 filled_qty += filled_amount
                 filled_value += filled_amount * avg_price
+                last_fill_at = acked_at
+                self._record_fill(oid, filled_amount, avg_price, maker, fee)
                 self._log_event(
                     "order_filled",
                     ts=int(time.time() * 1000),
@@ -357,8 +878,11 @@ class ExecutionEngine:
                     f_avg = float(fetched.get("average") or fetched.get("price") or level.price)
                     if f_status in {"closed", "filled"} or f_filled >= level.qty:
                         fill_amount = min(max(f_filled, level.qty), level.qty)
+                        last_fill_at = time.monotonic()
+                        self.latency.record_since("ack_to_fill", acked_at)
                         filled_qty += fill_amount
                         filled_value += fill_amount * f_avg
+                        self._record_fill(oid, fill_amount, f_avg)
                         self.store.update_order_status(oid, "closed", int(time.time() * 1000))
                         self._log_event(
                             "order_filled",
@@ -375,9 +899,496 @@ class ExecutionEngine:
 
         if filled_qty > 0:
             avg_px = filled_value / max(filled_qty, 1e-9)
-            self._establish_position(symbol, side, filled_qty, avg_px, stop_px, tp_px)
+            self._establish_position(
+                symbol,
+                side,
+                filled_qty,
+                avg_px,
+                stop_px,
+                tp_px,
+                attached=bool(bracket),
+            )
+            if not bracket and last_fill_at is not None:
+                self.latency.record_since("fill_to_protection", last_fill_at)
+        self.latency.flush()
         return order_ids
 
+    # ------------------------------------------------------------------
+    def start_algo(
+        self,
+        symbol: str,
+        side: str,
+        price: float,
+        qty: float,
+        *,
+        algo: Optional[str] = None,
+        stop_px: Optional[float] = None,
+        tp_px: Optional[float] = None,
+        now_ms: Optional[int] = None,
+    ) -> str:
+        """Register a parent order worked by a slicing algorithm and send its first child."""
+
+        name = (algo or self.cfg.order.algo).lower()
+        get_algo(name)
+        now_ms = now_ms or int(time.time() * 1000)
+        self._ensure_leverage(symbol)
+        order_cfg = self.cfg.order
+        if name == "twap":
+            params: Dict[str, object] = {
+                "slices": order_cfg.twap_slices,
+                "duration_ms": int(order_cfg.twap_duration_s * 1000),
+            }
+        else:
+            params = {
+                "display_qty": qty * order_cfg.iceberg_display_pct,
+                "jitter": order_cfg.iceberg_jitter,
+                "interval_ms": int(order_cfg.algo_interval_s * 1000),
+            }
+        params["ref_px"] = price
+        slack = order_cfg.algo_limit_bp / 10000.0
+        limit_px = price * (1 + slack) if side == "buy" else price * (1 - slack)
+        algo_id = self._hash_coid(f"{symbol}|{side}|{name}|{now_ms}")
+        self.store.upsert_algo_order(
+            AlgoOrder(
+                algo_id=algo_id,
+                symbol=symbol,
+                side=side,
+                algo=name,
+                total_qty=qty,
+                limit_px=limit_px,
+                status="active",
+                ts_created=now_ms,
+                ts_next=now_ms,
+                stop_px=stop_px,
+                tp_px=tp_px,
+                params=json.dumps(params, sort_keys=True),
+            )
+        )
+        self._log_event(
+            "algo_start",
+            ts=now_ms,
+            symbol=symbol,
+            side=side,
+            algo=name,
+            algo_id=algo_id,
+            qty=qty,
+            limit_px=limit_px,
+        )
+        self.step_algos(symbol=symbol, now_ms=now_ms)
+        return algo_id
+
+    def step_algos(
+        self,
+        symbol: Optional[str] = None,
+        now_ms: Optional[int] = None,
+        rng: Optional[random.Random] = None,
+    ) -> int:
+        """Advance every due parent: sync child fills, protect them, send the next slice."""
+
+        now_ms = now_ms or int(time.time() * 1000)
+        rng = rng or self._rng
+        max_age_ms = self.cfg.order.algo_max_duration_s * 1000
+        sent = 0
+        for parent in self.store.list_algo_orders(symbol, status="active"):
+            expired = max_age_ms > 0 and now_ms - parent.ts_created >= max_age_ms
+            if parent.ts_next > now_ms and not expired:
+                continue
+            impl = get_algo(parent.algo)
+            children = self.store.list_algo_children(parent.algo_id)
+            fill_qty, fill_value = self._sync_algo_children(
+                parent, children, cancel_open=impl.cancel_open_children or expired
+            )
+            meta = self._load_symbol_meta(parent.symbol)
+            px = self._algo_child_price(parent, meta)
+            min_qty = _min_sendable_qty(meta, px)
+            # Snap to the step grid so float residue does not strand a last slice.
+            step = meta.quantity_increment
+            remaining = round_qty_floor(parent.total_qty - parent.filled_qty - fill_qty + _QTY_EPS, step)
+            still_open = any(c.status in WORKING_STATUSES for c in children)
+            reason = None
+            if expired:
+                reason = "expired"
+            elif remaining < min_qty:
+                # Covers min_notional too: the rest can never go out as a child.
+                reason = "filled" if remaining <= 0 else "remainder_below_min"
+            elif impl.exhausted(parent) and not still_open:
+                reason = "exhausted"
+            if reason is not None and still_open:
+                more_qty, more_value = self._sync_algo_children(parent, children, cancel_open=True)
+                fill_qty += more_qty
+                fill_value += more_value
+            if fill_qty > 0:
+                parent.filled_qty += fill_qty
+                self._establish_position(
+                    parent.symbol,
+                    parent.side,
+                    fill_qty,
+                    fill_value / fill_qty,
+                    parent.stop_px,
+                    parent.tp_px,
+                )
+            if reason is not None:
+                self._finish_algo(parent, now_ms, reason)
+                continue
+            qty, next_ms = impl.next_child(parent, children, now_ms, rng)
+            if qty > 0:
+                unsent = remaining - sum(
+                    c.qty - c.filled for c in children if c.status in WORKING_STATUSES
+                )
+                qty = round_qty_floor(min(max(qty, min_qty), unsent) + _QTY_EPS, step)
+            if qty > 0 and qty >= min_qty:
+                parent.slices_sent += 1
+                if self._send_algo_child(parent, len(children), qty, px, now_ms):
+                    sent += 1
+                elif not still_open:
+                    self._finish_algo(parent, now_ms, "unsendable")
+                    continue
+            parent.ts_next = next_ms
+            self.store.upsert_algo_order(parent)
+        self.latency.flush()
+        return sent
+
+    def _finish_algo(self, parent: AlgoOrder, now_ms: int, reason: str) -> None:
+        parent.status = "done"
+        self.store.upsert_algo_order(parent)
+        self._log_event(
+            "algo_done",
+            ts=now_ms,
+            symbol=parent.symbol,
+            algo=parent.algo,
+            algo_id=parent.algo_id,
+            filled_qty=parent.filled_qty,
+            total_qty=parent.total_qty,
+            reason=reason,
+        )
+
+    def _algo_child_price(self, parent: AlgoOrder, meta: SymbolMeta) -> float:
+        """Join the book (or step off the reference price), never past the parent's limit."""
+
+        side = parent.side
+        prices = self._book_ladder_prices(parent.symbol, side) if self.cfg.order.book_aware else None
+        if prices:
+            px = prices[0]
+        else:
+            px = self._ladder_prices(side, _algo_ref_px(parent))[0]
+        px = min(px, parent.limit_px) if side == "buy" else max(px, parent.limit_px)
+        return round_price_for_side(px, meta.price_increment, side)
+
+    def _sync_algo_children(
+        self,
+        parent: AlgoOrder,
+        children: List[AlgoChild],
+        cancel_open: bool,
+    ) -> tuple[float, float]:
+        fill_qty = 0.0
+        fill_value = 0.0
+        for child in children:
+            if child.status == "unknown" and not self._adopt_algo_child(parent, child):
+                continue
+            if child.status != "open":
+                continue
+            filled = child.filled
+            status = "open"
+            average = child.px
+            try:
+                fetched = self.client.fetch_order(child.oid, symbol=parent.symbol) or {}
+                filled = float(fetched.get("filled") or 0.0)
+                average = float(fetched.get("average") or fetched.get("price") or child.px)
+                raw = str(fetched.get("status", "open")).lower()
+                if raw in {"closed", "filled"}:
+                    status = "closed"
+                    filled = filled or child.qty
+                elif raw in {"canceled", "cancelled", "expired", "rejected"}:
+                    status = "canceled"
+            except Exception as exc:  # pragma: no cover - network
+                LOGGER.warning("fetch_order failed for algo child %s: %s", child.oid, exc)
+                continue
+            if status == "open" and cancel_open:
+                try:
+                    self.client.cancel_order(child.oid, symbol=parent.symbol)
+                    status = "canceled"
+                except Exception as exc:  # pragma: no cover - best effort
+                    LOGGER.warning("Failed to cancel algo child %s: %s", child.oid, exc)
+            delta = max(0.0, min(filled, child.qty) - child.filled)
+            if delta > 0:
+                fill_qty += delta
+                fill_value += delta * average
+                self._record_fill(child.oid, min(filled, child.qty), average)
+                self._log_event(
+                    "order_filled",
+                    ts=int(time.time() * 1000),
+                    symbol=parent.symbol,
+                    side=parent.side,
+                    qty=delta,
+                    price=average,
+                    order_id=child.oid,
+                    algo_id=parent.algo_id,
+                )
+            child.filled = min(filled, child.qty)
+            child.status = status
+            self.store.upsert_algo_child(child)
+            if status != "open":
+                self.store.update_order_status(child.oid, status, int(time.time() * 1000))
+        return fill_qty, fill_value
+
+    def _adopt_algo_child(self, parent: AlgoOrder, child: AlgoChild) -> bool:
+        """Resolve an ``unknown`` child (keyed by its client order id) on the venue.
+
+        Returns True once the child is re-keyed to the venue order id so the
+        caller can sync it like any other child; a child the venue positively
+        does not know is marked cancelled.
+        """
+
+        coid = child.oid
+        now_ms = int(time.time() * 1000)
+        found, missing = self._find_order_by_coid(parent.symbol, coid)
+        order = self.store.get_order_by_coid(coid)
+        if found is None:
+            if missing:
+                child.status = "canceled"
+                self.store.upsert_algo_child(child)
+                if order is not None:
+                    self.store.delete_order(order.oid)
+                self._log_event(
+                    "order_resolved",
+                    ts=now_ms,
+                    symbol=parent.symbol,
+                    client_order_id=coid,
+                    algo_id=parent.algo_id,
+                    status="missing",
+                )
+            return False
+        oid = str(found.get("id") or coid)
+        if order is not None:
+            if order.oid != oid:
+                self.store.delete_order(order.oid)
+            self.store.upsert_order(
+                replace(order, oid=oid, status="open", ts_updated=now_ms, reject_reason=None)
+            )
+        self.store.record_tca_order(
+            oid,
+            parent.symbol,
+            getattr(self.client, "id", ""),
+            parent.side,
+            child.seq,
+            child.qty,
+            _algo_ref_px(parent),
+            child.ts_created,
+        )
+        child.oid = oid
+        child.status = "open"
+        self.store.upsert_algo_child(child)
+        self._log_event(
+            "order_resolved",
+            ts=now_ms,
+            symbol=parent.symbol,
+            client_order_id=coid,
+            order_id=oid,
+            algo_id=parent.algo_id,
+            status=_order_status(found.get("status")),
+        )
+        return True
+
+    def _send_algo_child(
+        self, parent: AlgoOrder, seq: int, qty: float, px: float, now_ms: int
+    ) -> bool:
+        """Submit one child; True when it is (or may be) resting on the venue."""
+
+        symbol = parent.symbol
+        side = parent.side
+        meta = self._load_symbol_meta(symbol)
+        # No min-notional bump: the caller already sized the slice within the remainder.
+        px, child_qty, error = sanitize_order(meta, side, px, qty, auto_bump_min_notional=False)
+        coid = self._hash_coid(f"{parent.algo_id}|{seq}")
+        if error:
+            self._log_event(
+                "order_reject",
+                ts=now_ms,
+                symbol=symbol,
+                side=side,
+                price=px,
+                qty=child_qty,
+                client_order_id=coid,
+                algo_id=parent.algo_id,
+                reason=error,
+            )
+            return False
+        params = order_params(getattr(self.client, "id", ""), post_only=self.cfg.order.post_only)
+        level = LadderLevel(level=seq, price=px, qty=child_qty, coid=coid)
+        try:
+            order = self._create_order_idempotent(
+                symbol, side, level, {**params, "clientOrderId": coid}
+            )
+        except Exception as exc:
+            LOGGER.error("Algo child submission failed: %s", exc)
+            unconfirmed = isinstance(exc, SubmitUnconfirmed)
+            reason = "submit_unconfirmed" if unconfirmed else "submit_error"
+            self._log_event(
+                "order_error",
+                ts=now_ms,
+                symbol=symbol,
+                side=side,
+                price=px,
+                qty=child_qty,
+                client_order_id=coid,
+                algo_id=parent.algo_id,
+                reason=reason,
+            )
+            if not unconfirmed:
+                return False
+            # May be live: keep it keyed by the client id until _adopt_algo_child resolves it.
+            self.store.upsert_order(
+                Order(
+                    oid=coid,
+                    symbol=symbol,
+                    side=side,
+                    qty=child_qty,
+                    px=px,
+                    status="unknown",
+                    ts_created=now_ms,
+                    ts_updated=now_ms,
+                    post_only=True,
+                    client_order_id=coid,
+                    reject_reason=reason,
+                )
+            )
+            self.store.upsert_algo_child(
+                AlgoChild(
+                    algo_id=parent.algo_id,
+                    seq=seq,
+                    oid=coid,
+                    qty=child_qty,
+                    px=px,
+                    status="unknown",
+                    ts_created=now_ms,
+                )
+            )
+            return True
+        oid = str(order.get("id") or order.get("clientOrderId") or coid)
+        # Algo children are measured against the parent's reference price and
+        # bucketed by slice number in place of the ladder level.
+        self.store.record_tca_order(
+            oid, symbol, getattr(self.client, "id", ""), side, seq, child_qty, _algo_ref_px(parent), now_ms
+        )
+        self.store.upsert_order(
+            Order(
+                oid=oid,
+                symbol=symbol,
+                side=side,
+                qty=child_qty,
+                px=px,
+                status="open",
+                ts_created=now_ms,
+                ts_updated=now_ms,
+                post_only=True,
+                client_order_id=coid,
+            )
+        )
+        self.store.upsert_algo_child(
+            AlgoChild(
+                algo_id=parent.algo_id,
+                seq=seq,
+                oid=oid,
+                qty=child_qty,
+                px=px,
+                status="open",
+                ts_created=now_ms,
+            )
+        )
+        self._log_event(
+            "order_submit",
+            ts=now_ms,
+            symbol=symbol,
+            side=side,
+            price=px,
+            qty=child_qty,
+            client_order_id=coid,
+            level=seq,
+            algo_id=parent.algo_id,
+        )
+        return True
+
+    def _find_order_by_coid(self, symbol: str, coid: str) -> tuple[Optional[dict], bool]:
+        """Look up *coid* on the venue.
+
+        Returns ``(order, confirmed_missing)``; ``confirmed_missing`` is only
+        true when the venue positively answered that no such order exists.
+        """
+
+        fetch_order = getattr(self.client, "fetch_order", None)
+        if callable(fetch_order):
+            try:
+                order = fetch_order(
+                    coid,
+                    symbol=symbol,
+                    params={"clientOrderId": coid, "origClientOrderId": coid},
+                )
+                if isinstance(order, dict) and order:
+                    return order, False
+            except Exception as exc:
+                if "OrderNotFound" in _error_names(exc):
+                    return None, True
+                LOGGER.warning("fetch_order by client id %s failed: %s", coid, exc)
+        fetch_open = getattr(self.client, "fetch_open_orders", None)
+        if callable(fetch_open):
+            try:
+                for order in fetch_open(symbol) or []:
+                    if isinstance(order, dict) and order.get("clientOrderId") == coid:
+                        return order, False
+            except Exception as exc:  # pragma: no cover - network
+                LOGGER.warning("fetch_open_orders failed: %s", exc)
+        return None, False
+
+    def _create_order_idempotent(
+        self,
+        symbol: str,
+        side: str,
+        level: LadderLevel,
+        params: Dict[str, object],
+    ) -> dict:
+        """Submit a ladder level, resolving ambiguous failures by client order id."""
+
+        attempts = max(0, int(self.cfg.order.submit_retries)) + 1
+        for attempt in range(attempts):
+            try:
+                return self.client.create_order(
+                    symbol=symbol,
+                    type="limit",
+                    side=side,
+                    amount=level.qty,
+                    price=level.price,
+                    params=params,
+                )
+            except Exception as exc:
+                if not _is_ambiguous_error(exc):
+                    raise
+                LOGGER.warning("Ambiguous submit for %s: %s", level.coid, exc)
+                found, missing = self._find_order_by_coid(symbol, level.coid)
+                if found is not None:
+                    self._log_event(
+                        "order_recovered",
+                        ts=int(time.time() * 1000),
+                        symbol=symbol,
+                        side=side,
+                        client_order_id=level.coid,
+                        order_id=found.get("id"),
+                        status=found.get("status"),
+                    )
+                    return found
+                if not missing:
+                    raise SubmitUnconfirmed(level.coid) from exc
+                if attempt == attempts - 1:
+                    raise
+                self._log_event(
+                    "order_retry",
+                    ts=int(time.time() * 1000),
+                    symbol=symbol,
+                    side=side,
+                    client_order_id=level.coid,
+                    attempt=attempt + 1,
+                )
+        raise SubmitUnconfirmed(level.coid)  # pragma: no cover - loop always returns/raises
+
     # ------------------------------------------------------------------
     def _establish_position(
         self,
@@ -387,7 +1398,14 @@ class ExecutionEngine:
         entry_px: float,
         stop_px: Optional[float],
         tp_px: Optional[float],
+        attached: bool = False,
     ) -> None:
+        """Record the filled position and make sure it carries SL/TP protection.
+
+        ``attached`` signals that the entry orders already carried venue-native
+        SL/TP legs, so no separate protective orders are sent.
+        """
+
         ts = int(time.time() * 1000)
         meta = self._load_symbol_meta(symbol)
         qty = round_qty_floor(qty, meta.quantity_increment)
@@ -415,6 +1433,9 @@ class ExecutionEngine:
                 existing.sl_px = stop_px
             if tp_px:
                 existing.tp_px = tp_px
+            if attached:
+                self.store.set_position(existing)
+                return
             sl_id, tp_id = self._submit_protective_orders(
                 symbol,
                 side,
@@ -423,10 +1444,9 @@ class ExecutionEngine:
                 existing.tp_px or tp_px,
                 existing=existing,
             )
-            if sl_id:
-                existing.sl_order_id = sl_id
-            if tp_id:
-                existing.tp_order_id = tp_id
+            # A leg without a target comes back as None once its old order is cancelled.
+            existing.sl_order_id = sl_id
+            existing.tp_order_id = tp_id
             self.store.set_position(existing)
             return
 
@@ -444,6 +1464,9 @@ class ExecutionEngine:
             reduce_only=True,
             funding_pnl=0.0,
         )
+        if attached:
+            self.store.set_position(position)
+            return
         sl_id, tp_id = self._submit_protective_orders(
             symbol,
             side,
@@ -456,6 +1479,140 @@ class ExecutionEngine:
         position.tp_order_id = tp_id
         self.store.set_position(position)
 
+    def _supports(self, capability: str, method: str) -> bool:
+        has = getattr(self.client, "has", None)
+        if isinstance(has, dict) and capability in has:
+            return bool(has.get(capability)) and callable(getattr(self.client, method, None))
+        return callable(getattr(self.client, method, None))
+
+    def _record_protective(
+        self,
+        order: dict,
+        symbol: str,
+        hedge_side: str,
+        qty: float,
+        px: float,
+        coid: str,
+    ) -> str:
+        order_id = str(order.get("id") or order.get("clientOrderId") or coid)
+        created_ts = int(time.time() * 1000)
+        self.store.upsert_order(
+            Order(
+                oid=order_id,
+                symbol=symbol,
+                side=hedge_side,
+                qty=qty,
+                px=px,
+                status=str(order.get("status", "open")),
+                ts_created=created_ts,
+                ts_updated=created_ts,
+                post_only=False,
+                client_order_id=order.get("clientOrderId") or coid,
+                maker=False,
+                fee=0.0,
+                reject_reason=None,
+            )
+        )
+        return order_id
+
+    def _place_protective(
+        self,
+        symbol: str,
+        hedge_side: str,
+        kind: str,
+        qty: float,
+        px: float,
+        params_reduce: Dict[str, object],
+        ts: int,
+    ) -> Optional[str]:
+        tag = "sl" if kind == "stop" else "tp"
+        coid = self._hash_coid(f"{symbol}|{tag}|{ts}")
+        params = {**params_reduce, "clientOrderId": coid}
+        try:
+            if kind == "stop":
+                order = self.client.create_order(
+                    symbol=symbol,
+                    type="stop_market",
+                    side=hedge_side,
+                    amount=qty,
+                    params={**params, "stopPrice": px},
+                )
+            else:
+                order = self.client.create_order(
+                    symbol=symbol,
+                    type="limit",
+                    side=hedge_side,
+                    amount=qty,
+                    price=px,
+                    params=params,
+                )
+        except Exception as exc:  # pragma: no cover - protective best effort
+            label = "stop" if kind == "stop" else "take-profit"
+            LOGGER.error("Failed to place %s order: %s", label, exc)
+            return None
+        order_id = self._record_protective(order, symbol, hedge_side, qty, px, coid)
+        self._log_event(
+            "protective_submit",
+            ts=int(time.time() * 1000),
+            symbol=symbol,
+            side=hedge_side,
+            price=px,
+            qty=qty,
+            order_id=order_id,
+            kind=kind,
+        )
+        return order_id
+
+    def _amend_protective(
+        self,
+        symbol: str,
+        hedge_side: str,
+        kind: str,
+        order_id: str,
+        qty: float,
+        px: float,
+        params_reduce: Dict[str, object],
+    ) -> Optional[str]:
+        """Change quantity and trigger/limit price of a live protective order in place."""
+
+        try:
+            if kind == "stop":
+                order = self.client.edit_order(
+                    order_id,
+                    symbol,
+                    "stop_market",
+                    hedge_side,
+                    qty,
+                    None,
+                    {**params_reduce, "stopPrice": px},
+                )
+            else:
+                order = self.client.edit_order(
+                    order_id, symbol, "limit", hedge_side, qty, px, dict(params_reduce)
+                )
+        except Exception as exc:
+            LOGGER.warning("edit_order failed for %s, falling back to replace: %s", order_id, exc)
+            return None
+        if not isinstance(order, dict):
+            order = {}
+        previous = self.store.get_order(order_id)
+        coid = previous.client_order_id if previous and previous.client_order_id else order_id
+        new_id = self._record_protective({"id": order_id, **order}, symbol, hedge_side, qty, px, coid)
+        if new_id != order_id:
+            self.store.delete_order(order_id)
+        self._log_event(
+            "protective_amend",
+            ts=int(time.time() * 1000),
+            symbol=symbol,
+            side=hedge_side,
+            price=px,
+            qty=qty,
+            order_id=new_id,
+            previous_order_id=order_id,
+            kind=kind,
+        )
+        return new_id
+
     def _submit_protective_orders(
         self,
         symbol: str,
@@ -466,8 +1623,6 @@ class ExecutionEngine:
         existing: Optional[Position] = None,
     ) -> tuple[Optional[str], Optional[str]]:
         hedge_side = "sell" if side == "buy" else "buy"
-        sl_id: Optional[str] = None
-        tp_id: Optional[str] = None
         params_reduce = order_params(
             getattr(self.client, "id", ""),
             post_only=False,
@@ -493,97 +1648,74 @@ class ExecutionEngine:
                 LOGGER.debug("Failed to cancel protective order %s: %s", order_id, exc)
             self.store.delete_order(order_id)
 
-        if existing:
-            cancel_existing(existing.sl_order_id)
-            cancel_existing(existing.tp_order_id)
-
         ts = int(time.time() * 1000)
-        if stop_px and stop_px > 0:
-            stop_px = round_price_for_side(stop_px, meta.price_increment, hedge_side)
-            stop_params = {**params_reduce, "clientOrderId": self._hash_coid(f"{symbol}|sl|{ts}")}
-            try:
-                order = self.client.create_order(
-                    symbol=symbol,
-                    type="stop_market",
-                    side=hedge_side,
-                    amount=qty,
-                    params={**stop_params, "stopPrice": stop_px},
-                )
-                sl_id = str(order.get("id") or order.get("clientOrderId") or self._hash_coid(f"sl|{ts}"))
-                created_ts = int(time.time() * 1000)
-                self.store.upsert_order(
-                    Order(
-                        oid=sl_id,
-                        symbol=symbol,
-                        side=hedge_side,
-                        qty=qty,
-                        px=stop_px,
-                        status=str(order.get("status", "open")),
-                        ts_created=created_ts,
-                        ts_updated=created_ts,
-                        post_only=False,
-                        client_order_id=order.get("clientOrderId") or stop_params["clientOrderId"],
-                        maker=False,
-                        fee=0.0,
-                        reject_reason=None,
-                    )
-                )
-                self._log_event(
-                    "protective_submit",
-                    ts=created_ts,
-                    symbol=symbol,
-                    side=hedge_side,
-                    price=stop_px,
-                    qty=qty,
-                    order_id=sl_id,
-                    kind="stop",
-                )
-            except Exception as exc:  # pragma: no cover - protective best effort
-                LOGGER.error("Failed to place stop order: %s", exc)
-        if tp_px and tp_px > 0:
-            tp_px = round_price_for_side(tp_px, meta.price_increment, hedge_side)
-            tp_params = {**params_reduce, "clientOrderId": self._hash_coid(f"{symbol}|tp|{ts}")}
-            try:
-                order = self.client.create_order(
-                    symbol=symbol,
-                    type="limit",
-                    side=hedge_side,
-                    amount=qty,
-                    price=tp_px,
-                    params=tp_params,
+        can_amend = existing is not None and self._supports("editOrder", "edit_order")
+        results: Dict[str, Optional[str]] = {"stop": None, "take_profit": None}
+        for kind, target_px in (("stop", stop_px), ("take_profit", tp_px)):
+            old_id = None
+            if existing is not None:
+                old_id = existing.sl_order_id if kind == "stop" else existing.tp_order_id
+            if not target_px or target_px <= 0:
+                # No new level for this leg: the old order must not outlive it.
+                cancel_existing(old_id)
+                continue
+            px = round_price_for_side(target_px, meta.price_increment, hedge_side)
+            started = time.monotonic()
+            new_id: Optional[str] = None
+            acked_at: Optional[float] = None
+            method = "place"
+            if old_id and can_amend:
+                new_id = self._amend_protective(
+                    symbol, hedge_side, kind, old_id, qty, px, params_reduce
                 )
-                tp_id = str(order.get("id") or order.get("clientOrderId") or self._hash_coid(f"tp|{ts}"))
-                created_ts = int(time.time() * 1000)
-                self.store.upsert_order(
-                    Order(
-                        oid=tp_id,
-                        symbol=symbol,
-                        side=hedge_side,
-                        qty=qty,
-                        px=tp_px,
-                        status=str(order.get("status", "open")),
-                        ts_created=created_ts,
-                        ts_updated=created_ts,
-                        post_only=False,
-                        client_order_id=order.get("clientOrderId") or tp_params["clientOrderId"],
-                        maker=False,
-                        fee=0.0,
-                        reject_reason=None,
-                    )
+                acked_at = time.monotonic()
+                method = "amend"
+            if new_id is None:
+                # Place the new order before cancelling the old one so the
+                # position is never left without a resting protective order.
+                new_id = self._place_protective(
+                    symbol, hedge_side, kind, qty, px, params_reduce, ts
                 )
+                acked_at = time.monotonic()
+                if old_id:
+                    method = "replace"
+                    if new_id is not None:
+                        cancel_existing(old_id)
+                    else:
+                        LOGGER.error("Keeping stale %s order %s after failed replace", kind, old_id)
+                        new_id = old_id
+            results[kind] = new_id
+            if old_id:
+                # The old order is only cancelled after the new one is acked, so
+                # there is no fully unprotected window to report.
                 self._log_event(
-                    "protective_submit",
-                    ts=created_ts,
+                    "protective_update",
+                    ts=int(time.time() * 1000),
                     symbol=symbol,
-                    side=hedge_side,
-                    price=tp_px,
-                    qty=qty,
-                    order_id=tp_id,
-                    kind="take_profit",
+                    kind=kind,
+                    method=method,
+                    order_id=new_id,
+                    previous_order_id=old_id,
+                    underprotected_ms=round(((acked_at or started) - started) * 1000.0, 3),
                 )
-            except Exception as exc:  # pragma: no cover - protective best effort
-                LOGGER.error("Failed to place take-profit order: %s", exc)
-        return sl_id, tp_id
+        return results["stop"], results["take_profit"]
+
+
+def _book_depth(levels: int) -> int:
+    """Smallest supported book depth covering *levels*."""
+
+    return next((depth for depth in _BOOK_DEPTHS if depth >= levels), _BOOK_DEPTHS[-1])
+
+
+def _order_status(raw: object) -> str:
+    """Map a ccxt order status onto the store's open/closed/canceled."""
+
+    text = str(raw or "open").lower()
+    if text in {"closed", "filled"}:
+        return "closed"
+    if text in {"canceled", "cancelled", "expired", "rejected"}:
+        return "canceled"
+    return "open"
 
 
 def _coerce_float(value: object) -> Optional[float]:
@@ -595,4 +1727,4 @@ def _coerce_float(value: object) -> Optional[float]:
         return None
 
 
-__all__ = ["ExecutionEngine"]
+__all__ = ["ExecutionEngine", "SubmitUnconfirmed"]
@@ -0,0 +1,119 @@
+"""Monotonic latency spans aggregated into persisted log-scale histograms."""
+from __future__ import annotations
+
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from bot.state_store import StateStore
+
+# Bucket i covers (BASE_MS * GROWTH**(i-1), BASE_MS * GROWTH**i]; 64 buckets
+# span 0.1ms to roughly one minute with ~12% resolution.
+BASE_MS = 0.1
+GROWTH = 1.25
+N_BUCKETS = 64
+
+TIMED_ENDPOINTS = frozenset(
+    {
+        "create_order",
+        "edit_order",
+        "cancel_order",
+        "fetch_order",
+        "fetch_open_orders",
+        "fetch_order_book",
+        "fetch_positions_risk",
+        "set_leverage",
+        "set_margin_mode",
+    }
+)
+
+
+def bucket_for(ms: float) -> int:
+    if ms <= BASE_MS:
+        return 0
+    idx = int(math.ceil(math.log(ms / BASE_MS, GROWTH) - 1e-12))
+    return min(max(idx, 0), N_BUCKETS - 1)
+
+
+def bucket_upper_ms(bucket: int) -> float:
+    return BASE_MS * GROWTH**bucket
+
+
+def percentile(hist: Mapping[int, int], q: float) -> Optional[float]:
+    """Approximate the *q* quantile (0..1) using bucket upper edges."""
+
+    total = sum(hist.values())
+    if total <= 0:
+        return None
+    rank = q * total
+    seen = 0
+    for bucket in sorted(hist):
+        seen += hist[bucket]
+        if seen >= rank:
+            return bucket_upper_ms(bucket)
+    return bucket_upper_ms(max(hist))
+
+
+class LatencyRecorder:
+    """Buffer latency samples per endpoint and flush them into the store."""
+
+    def __init__(self, store: Optional[StateStore], venue: str) -> None:
+        self.store = store
+        self.venue = venue or "unknown"
+        self._pending: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, ms: float) -> None:
+        self._pending[endpoint][bucket_for(ms)] += 1
+
+    def record_since(self, endpoint: str, started: float) -> None:
+        self.record(endpoint, (time.monotonic() - started) * 1000.0)
+
+    @contextmanager
+    def span(self, endpoint: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_since(endpoint, started)
+
+    def flush(self) -> None:
+        if not self._pending or self.store is None:
+            return
+        pending, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+        for endpoint, counts in pending.items():
+            self.store.add_latency_counts(self.venue, endpoint, dict(counts))
+
+
+class TimedClient:
+    """Proxy a ccxt client and record the round trip of order-path endpoints."""
+
+    def __init__(self, client: Any, recorder: LatencyRecorder) -> None:
+        self._client = client
+        self._recorder = recorder
+
+    @property
+    def wrapped(self) -> Any:
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name not in TIMED_ENDPOINTS or not callable(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self._recorder.span(name):
+                return attr(*args, **kwargs)
+
+        return call
+
+
+__all__ = [
+    "LatencyRecorder",
+    "TIMED_ENDPOINTS",
+    "TimedClient",
+    "bucket_for",
+    "bucket_upper_ms",
+    "percentile",
+]
@@ -1,12 +1,21 @@
 """Model inference helpers for the trading bot."""
 from __future__ import annotations
 
+import hashlib
 import logging
 import math
+import operator
 import pickle
-from dataclasses import dataclass
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Mapping, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from bot.calibration import CalibrationTable, export_calibrator, from_spec
+from bot.tree_model import CompiledTrees
 
 LOGGER = logging.getLogger(__name__)
 
@@ -37,17 +46,148 @@ class LoadedModel:
     def predict_proba_raw(self, features: Mapping[str, float]) -> float:
         return _sigmoid(self.margin(features))
 
+    def margin_batch(self, rows: Sequence[Sequence[float]]) -> List[float]:
+        """Margins for rows already ordered like ``feature_names``."""
+
+        coefs = [self.weights.get(name, 0.0) for name in self.feature_names]
+        mul = operator.mul
+        return [sum(map(mul, coefs, row), self.bias) for row in rows]
+
+
+@dataclass
+class BatchPrediction:
+    """Column arrays returned by :meth:`ModelInferer.predict_proba_batch`.
+
+    Rows that failed validation hold NaN and are listed in ``errors``.
+    """
+
+    buy: array
+    sell: array
+    raw_prob: array
+    raw_margin: array
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.buy)
+
+
+def feature_key(values: Sequence[float]) -> bytes:
+    """Canonical 16-byte digest of a feature vector in model column order.
+
+    ``-0.0`` is folded into ``0.0`` so equal rows always share a key.
+    """
+
+    return hashlib.blake2b(array("d", [v + 0.0 for v in values]).tobytes(), digest_size=16).digest()
+
+
+class InferenceCache:
+    """Thread-safe LRU of prediction results with an optional TTL.
+
+    Entries are keyed by ``(model version, feature_key)``; ``maxsize``
+    bounds memory and ``ttl_s`` (``None`` for no expiry) bounds staleness.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl_s: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._data: "OrderedDict[Tuple[str, bytes], Tuple[float, Dict[str, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[Dict[str, float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self.ttl_s is not None and self._clock() - stored_at > self.ttl_s:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def put(self, key: Tuple[str, bytes], value: Mapping[str, float]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock(), dict(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": float(len(self._data)),
+            "hits": float(self.hits),
+            "misses": float(self.misses),
+            "evictions": float(self.evictions),
+            "expirations": float(self.expirations),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Attributes replaced together when a new registry version goes live.
+_SWAP_ATTRS = ("model_path", "_model", "_feature_names", "_is_lightgbm", "_calibration", "_artifact")
+
 
 class ModelInferer:
-    """Wrap a pickled model (LightGBM or LoadedModel) and perform inference."""
+    """Wrap a pickled model (LightGBM, CompiledTrees or LoadedModel) and perform inference.
+
+    ``model_path`` may also be an artifact directory or a model registry
+    root, in which case :meth:`reload_if_changed` follows its active pointer.
+    :meth:`predict_proba` results are memoized per model version and
+    feature vector (``cache_size=0`` disables the cache); call
+    :meth:`clear_cache` after mutating the loaded model in place.
+    """
+
+    def __init__(
+        self,
+        model_path: Path | str = Path("models/model.pkl"),
+        cache_size: int = 4096,
+        cache_ttl_s: Optional[float] = None,
+    ) -> None:
+        from bot.model_registry import ModelRegistry, is_registry
 
-    def __init__(self, model_path: Path | str = Path("models/model.pkl")) -> None:
         self.model_path = Path(model_path)
+        self.registry: Optional[ModelRegistry] = None
+        self._registry_stamp = None
+        if is_registry(self.model_path):
+            self.registry = ModelRegistry(self.model_path)
+            self._registry_stamp = self.registry.pointer_stamp()
+            active = self.registry.active_path()
+            if active is None:
+                raise FileNotFoundError(f"No active model in registry {self.model_path}")
+            self.registry.verify(active.name)
+            self.model_path = active
         self._model: Any = None
         self._feature_names: list[str] = []
         self._is_lightgbm = False
-        self._platt_params: Optional[tuple[float, float]] = None
-        self._isotonic = None
+        self._calibration: Optional[CalibrationTable] = None
+        self._artifact = None
+        self._last_row: Optional[Mapping[str, float]] = None
+        self.cache = InferenceCache(cache_size, cache_ttl_s)
         self._load_model()
         self._load_calibration()
 
@@ -62,6 +202,20 @@ class ModelInferer:
         if not self.model_path.exists():
             raise FileNotFoundError(f"Model not found at {self.model_path}")
 
+        from bot.artifact import is_artifact, load_artifact
+
+        if is_artifact(self.model_path):
+            self._artifact = load_artifact(self.model_path)
+            self._model = self._artifact.model
+            self._feature_names = list(self._model.feature_names)
+            LOGGER.info(
+                "Mapped %s artifact version=%s features=%s",
+                self._artifact.manifest.get("kind"),
+                self._artifact.version,
+                len(self._feature_names),
+            )
+            return
+
         obj = self._load_pickle(self.model_path)
 
         if isinstance(obj, LoadedModel):
@@ -74,6 +228,16 @@ class ModelInferer:
             )
             return
 
+        if isinstance(obj, CompiledTrees):
+            self._model = obj
+            self._feature_names = list(obj.feature_names)
+            LOGGER.info(
+                "Loaded compiled tree model version=%s trees=%s",
+                obj.version,
+                obj.n_trees,
+            )
+            return
+
         try:  # pragma: no cover - exercised when lightgbm available
             import lightgbm as lgb  # type: ignore
 
@@ -97,6 +261,9 @@ class ModelInferer:
         raise TypeError(f"Unsupported model format: {type(obj)!r}")
 
     def _load_calibration(self) -> None:
+        if self._artifact is not None:
+            self._load_calibration_spec(self._artifact.calibration)
+            return
         calib_path = self.model_path.with_name("isotonic.pkl")
         if not calib_path.exists():
             return
@@ -107,19 +274,72 @@ class ModelInferer:
             LOGGER.warning("Failed to load calibration: %s", exc)
             return
 
-        if isinstance(calib_obj, dict) and {"a", "b"} <= set(calib_obj):
-            a = float(calib_obj["a"])
-            b = float(calib_obj["b"])
-            self._platt_params = (a, b)
-            LOGGER.info("Loaded Platt calibrator")
+        try:
+            self._calibration = export_calibrator(calib_obj)
+        except Exception as exc:  # pragma: no cover - optional asset
+            LOGGER.warning("Failed to tabulate calibration: %s", exc)
             return
-
-        if hasattr(calib_obj, "predict"):
-            self._isotonic = calib_obj
-            LOGGER.info("Loaded Isotonic calibrator")
+        if self._calibration is None:
+            LOGGER.warning("Unsupported calibration format: %r", type(calib_obj))
             return
+        LOGGER.info(
+            "Loaded %s calibrator (%s breakpoints)",
+            self._calibration.source,
+            len(self._calibration.x),
+        )
 
-        LOGGER.warning("Unsupported calibration format: %r", type(calib_obj))
+    def _load_calibration_spec(self, spec: Optional[Mapping[str, Any]]) -> None:
+        try:
+            self._calibration = from_spec(spec)
+        except (KeyError, TypeError, ValueError) as exc:
+            LOGGER.warning("Unsupported calibration spec: %s", exc)
+
+    # ------------------------------------------------------------------
+    # Hot reload
+    # ------------------------------------------------------------------
+    def _warm_up(self, candidate: "ModelInferer", rows: Sequence[Mapping[str, float]]) -> None:
+        """Score *rows* with *candidate*; raise if any result is unusable."""
+
+        for row in rows:
+            proba = candidate.predict_proba(row)
+            if proba is None or not 0.0 <= proba["buy"] <= 1.0:
+                raise ValueError(f"warm-up scoring failed for version {candidate.version}")
+
+    def reload_if_changed(self, warmup_rows: Optional[Sequence[Mapping[str, float]]] = None) -> bool:
+        """Swap to the registry's active version if the pointer moved.
+
+        The check is a single ``stat`` of the pointer file; only when it
+        changes is the target verified against its checksum, loaded and
+        warmed up on ``warmup_rows`` (default: the last scored row, else a
+        zero row). The live model is replaced in one step and only after the
+        candidate scored successfully, so call this between cycles.
+        """
+
+        if self.registry is None:
+            return False
+        stamp = self.registry.pointer_stamp()
+        if stamp == self._registry_stamp:
+            return False
+        self._registry_stamp = stamp
+        target = self.registry.active_path()
+        if target is None:
+            return False
+        try:
+            digest = self.registry.verify(target.name)
+            if target == self.model_path and self._artifact is not None and digest == self._artifact.sha256:
+                return False
+            candidate = ModelInferer(target, cache_size=0)
+            if warmup_rows is None:
+                warmup_rows = [self._last_row or dict.fromkeys(candidate.feature_names, 0.0)]
+            self._warm_up(candidate, warmup_rows)
+        except Exception as exc:
+            LOGGER.error("Keeping model %s; reload of %s failed: %s", self.version, target, exc)
+            return False
+        previous = self.version
+        self.__dict__.update({name: candidate.__dict__[name] for name in _SWAP_ATTRS})
+        self.cache.clear()
+        LOGGER.info("Swapped model %s -> %s", previous, self.version)
+        return True
 
     # ------------------------------------------------------------------
     # Public helpers
@@ -128,6 +348,19 @@ class ModelInferer:
     def feature_names(self) -> list[str]:
         return list(self._feature_names)
 
+    @property
+    def model(self) -> Any:
+        return self._model
+
+    def clear_cache(self) -> None:
+        self.cache.clear()
+
+    @property
+    def version(self) -> str:
+        if self._artifact is not None:
+            return self._artifact.version
+        return str(getattr(self._model, "version", "lightgbm" if self._is_lightgbm else ""))
+
     def _validate_features(self, feature_row: Mapping[str, float]) -> Optional[str]:
         missing = [name for name in self._feature_names if name not in feature_row]
         if missing:
@@ -152,33 +385,112 @@ class ModelInferer:
         return raw_margin, raw_prob
 
     def _apply_calibration(self, margin: float, prob: float) -> float:
-        if self._platt_params is not None:
-            a, b = self._platt_params
-            return _sigmoid(a * margin + b)
-        if self._isotonic is not None:
-            try:
-                calibrated = float(self._isotonic.predict([prob])[0])
-            except Exception as exc:  # pragma: no cover - optional asset
-                LOGGER.warning("Isotonic calibration failed: %s", exc)
-                return prob
-            return max(0.0, min(1.0, calibrated))
+        if self._calibration is not None:
+            return max(0.0, min(1.0, self._calibration(prob)))
         return prob
 
+    def _predict_raw_batch(self, rows: List[List[float]]) -> List[float]:
+        if not rows:
+            return []
+        if self._is_lightgbm:
+            return [float(m) for m in self._model.predict(rows, raw_score=True)]
+        return self._model.margin_batch(rows)
+
+    def _apply_calibration_batch(self, margins: List[float], probs: List[float]) -> List[float]:
+        if self._calibration is not None:
+            return self._calibration.apply_batch(probs)
+        return list(probs)
+
+    def predict_proba_batch(
+        self,
+        matrix: Sequence[Sequence[float]],
+        columns: Optional[Sequence[str]] = None,
+    ) -> BatchPrediction:
+        """Score many rows with one model call and one calibration call.
+
+        ``matrix`` rows follow ``feature_names`` unless ``columns`` names the
+        matrix layout, in which case the needed columns are selected once.
+        A column set missing model features raises ``ValueError``; bad rows
+        are reported per index instead of aborting the batch.
+        """
+
+        width = len(self._feature_names)
+        index: Optional[List[int]] = None
+        if columns is not None:
+            position = {name: i for i, name in enumerate(columns)}
+            missing = [name for name in self._feature_names if name not in position]
+            if missing:
+                raise ValueError(f"Missing features: {missing}")
+            index = [position[name] for name in self._feature_names]
+            if index == list(range(len(columns))):
+                index = None
+            else:
+                width = len(columns)
+
+        isfinite = math.isfinite
+        errors: Dict[int, str] = {}
+        valid_idx: List[int] = []
+        rows: List[List[float]] = []
+        for i, row in enumerate(matrix):
+            if len(row) != width:
+                errors[i] = f"Expected {width} values, got {len(row)}"
+                continue
+            try:
+                vector = [float(row[j]) for j in index] if index is not None else [float(v) for v in row]
+            except (TypeError, ValueError):
+                errors[i] = "Non-numeric feature value"
+                continue
+            if not all(map(isfinite, vector)):
+                errors[i] = "Non-finite feature value"
+                continue
+            valid_idx.append(i)
+            rows.append(vector)
+
+        margins = self._predict_raw_batch(rows)
+        probs = [_sigmoid(m) for m in margins]
+        calibrated = self._apply_calibration_batch(margins, probs)
+
+        n = len(matrix)
+        nan = math.nan
+        out_buy = array("d", [nan]) * n
+        out_sell = array("d", [nan]) * n
+        out_prob = array("d", [nan]) * n
+        out_margin = array("d", [nan]) * n
+        for i, margin, prob, cal in zip(valid_idx, margins, probs, calibrated):
+            cal = max(0.0, min(1.0, cal))
+            out_buy[i] = cal
+            out_sell[i] = 1.0 - cal
+            out_prob[i] = prob
+            out_margin[i] = margin
+        if errors:
+            LOGGER.warning("predict_proba_batch skipped %s of %s rows", len(errors), n)
+        return BatchPrediction(out_buy, out_sell, out_prob, out_margin, errors)
+
     def predict_proba(self, feature_row: Mapping[str, float]) -> Optional[dict[str, float]]:
         error = self._validate_features(feature_row)
         if error:
             LOGGER.error(error)
             return None
 
+        self._last_row = feature_row
+        key = None
+        if self.cache.maxsize > 0:
+            key = (self.version, feature_key([float(feature_row[name]) for name in self._feature_names]))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
         raw_margin, raw_prob = self._predict_raw(feature_row)
         calibrated_prob = self._apply_calibration(raw_margin, raw_prob)
         calibrated_prob = max(0.0, min(1.0, calibrated_prob))
-        return {
+        result = {
             "buy": calibrated_prob,
             "sell": 1.0 - calibrated_prob,
             "debug_raw_prob": raw_prob,
             "debug_raw_margin": raw_margin,
         }
+        if key is not None:
+            self.cache.put(key, result)
+        return result
 
 
-__all__ = ["LoadedModel", "ModelInferer"]
+__all__ = ["BatchPrediction", "InferenceCache", "LoadedModel", "ModelInferer", "feature_key"]
@@ -0,0 +1,155 @@
+"""Directory registry of versioned model artifacts with an atomic active pointer.
+
+Layout::
+
+    models/registry/
+        ACTIVE              # name of the live version
+        <version>/manifest.json
+        <version>/arrays.bin
+
+Publishing writes the artifact under a temporary name and renames it into
+place; activation verifies the artifact checksum and replaces ``ACTIVE``
+with ``os.replace`` so readers never observe a half-written pointer.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Any, List, Mapping, Optional, Tuple
+
+from bot.artifact import ArtifactError, file_sha256, read_manifest, save_artifact
+from bot.drift import PROFILE_NAME, FeatureProfile, save_profile
+
+LOGGER = logging.getLogger(__name__)
+
+REGISTRY_ROOT = Path("models/registry")
+ACTIVE_NAME = "ACTIVE"
+_VERSION_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+class ModelRegistry:
+    def __init__(self, root: Path | str = REGISTRY_ROOT) -> None:
+        self.root = Path(root)
+
+    @property
+    def active_file(self) -> Path:
+        return self.root / ACTIVE_NAME
+
+    def path_for(self, version: str) -> Path:
+        if not _VERSION_RE.match(version):
+            raise ValueError(f"Invalid model version {version!r}")
+        return self.root / version
+
+    def versions(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            p.name for p in self.root.iterdir() if p.is_dir() and (p / "manifest.json").exists()
+        )
+
+    def publish(
+        self,
+        model: Any,
+        calibration: Optional[Mapping[str, Any]] = None,
+        version: Optional[str] = None,
+        activate: bool = False,
+        profile: Optional[FeatureProfile] = None,
+    ) -> str:
+        """Store *model* as a new immutable version and optionally activate it.
+
+        A training *profile* is stored as ``profile.json`` for drift monitoring.
+        """
+
+        version = version or getattr(model, "version", None) or time.strftime("%Y%m%dT%H%M%S")
+        final = self.path_for(version)
+        if final.exists():
+            raise FileExistsError(f"Model version {version} already published")
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = self.root / f".{version}.staging"
+        shutil.rmtree(staging, ignore_errors=True)
+        model.version = version
+        save_artifact(model, staging, calibration)
+        if profile is not None:
+            save_profile(profile, staging / PROFILE_NAME)
+        os.replace(staging, final)
+        LOGGER.info("Published model version %s", version)
+        if activate:
+            self.activate(version)
+        return version
+
+    def verify(self, version: str) -> str:
+        """Return the artifact checksum, raising ``ArtifactError`` if it does not match."""
+
+        path = self.path_for(version)
+        manifest = read_manifest(path)
+        digest = file_sha256(path / "arrays.bin")
+        if digest != manifest.get("sha256"):
+            raise ArtifactError(f"Checksum mismatch for model version {version}")
+        return digest
+
+    def activate(self, version: str) -> None:
+        self.verify(version)
+        tmp = self.root / f".{ACTIVE_NAME}.tmp"
+        tmp.write_text(version + "\n")
+        os.replace(tmp, self.active_file)
+        LOGGER.info("Activated model version %s", version)
+
+    def active_version(self) -> Optional[str]:
+        try:
+            text = self.active_file.read_text().strip()
+        except OSError:
+            return None
+        return text or None
+
+    def active_path(self) -> Optional[Path]:
+        version = self.active_version()
+        return self.path_for(version) if version else None
+
+    def pointer_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Cheap change detector for the active pointer (one ``stat`` call)."""
+
+        try:
+            st = self.active_file.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def is_registry(path: Path | str) -> bool:
+    return (Path(path) / ACTIVE_NAME).exists()
+
+
+def default_model_path(root: Path | str = REGISTRY_ROOT) -> Path:
+    """The registry when one has been activated, else the legacy pickle."""
+
+    return Path(root) if is_registry(root) else Path("models/model.pkl")
+
+
+__all__ = [
+    "ACTIVE_NAME",
+    "ModelRegistry",
+    "REGISTRY_ROOT",
+    "default_model_path",
+    "is_registry",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", type=Path, default=REGISTRY_ROOT)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    activate_cmd = sub.add_parser("activate")
+    activate_cmd.add_argument("version")
+    args = parser.parse_args()
+    registry = ModelRegistry(args.root)
+    if args.cmd == "activate":
+        registry.activate(args.version)
+    active = registry.active_version()
+    for name in registry.versions():
+        print(("* " if name == active else "  ") + name)
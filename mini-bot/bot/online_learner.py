@@ -0,0 +1,353 @@
+"""Online FTRL-Proximal updates of the logistic model as live labels resolve.
+
+Every cycle the live feature row is queued; once ``horizon_bars`` further
+bars have closed it is labelled with the same triple-barrier rule used for
+offline training and the weights take one FTRL step. Features are
+standardized by the spread of the training :class:`FeatureProfile` saved
+with the model. Memory is bounded by
+the queue and the guard window; state is one small JSON file replaced
+atomically after each cycle.
+
+The calibration table shipped with a registry version was fitted to the
+*offline* model's raw probabilities, so a guard compares online and base
+predictions on the resolved window and falls back to the base weights when
+they diverge (stale calibration) or when the online model scores worse.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from bot.drift import FeatureProfile, load_profile, profile_path
+from bot.feature_engine import FeatureRow
+from bot.model_infer import LoadedModel
+from bot.training import LabelConfig, triple_barrier_labels
+
+LOGGER = logging.getLogger(__name__)
+
+STATE_FORMAT = 2
+_EPS = 1e-12
+
+
+@dataclass(frozen=True)
+class OnlineParams:
+    alpha: float = 0.05
+    beta: float = 1.0
+    l1: float = 0.0
+    l2: float = 1.0
+    max_pending: int = 64
+    window: int = 200
+    min_samples: int = 30
+    # Mean |p_online - p_base| above which the base calibration is stale.
+    max_prob_shift: float = 0.1
+    # Allowed excess log loss of the online weights over the base weights.
+    max_logloss_excess: float = 0.02
+
+
+def _sigmoid(value: float) -> float:
+    if value > 50:
+        return 1.0
+    if value < -50:
+        return 0.0
+    return 1.0 / (1.0 + math.exp(-value))
+
+
+def _log_loss(p: float, y: int) -> float:
+    p = min(max(p, 1e-15), 1 - 1e-15)
+    return -math.log(p) if y else -math.log(1 - p)
+
+
+class OnlineLearner:
+    """FTRL-Proximal learner warm-started from a :class:`LoadedModel`.
+
+    Updates run in a standardized space (``x / scale`` with each scale the
+    training profile's spread for that feature, or 1.0 without a profile or
+    for a constant feature) so the per-coordinate step size does not depend
+    on raw feature magnitudes; weights are mapped back to raw units before
+    being written into the model. The bias is unregularized.
+    """
+
+    def __init__(
+        self,
+        base: LoadedModel,
+        params: OnlineParams = OnlineParams(),
+        label_cfg: LabelConfig = LabelConfig(),
+        profile: Optional[FeatureProfile] = None,
+    ) -> None:
+        self.params = params
+        self.label_cfg = label_cfg
+        self.pending: Deque[Tuple[int, List[float]]] = deque(maxlen=params.max_pending)
+        self.window: Deque[Tuple[float, float, int]] = deque(maxlen=params.window)
+        self.frozen: Optional[str] = None
+        self.path: Optional[Path] = None
+        self.rebase(base, profile)
+
+    # ------------------------------------------------------------------
+    # FTRL core
+    # ------------------------------------------------------------------
+    def rebase(self, base: LoadedModel, profile: Optional[FeatureProfile] = None) -> None:
+        """Start from *base*'s weights, dropping online state for any older version."""
+
+        self.base_version = base.version
+        self.feature_names = list(base.feature_names)
+        self.base_weights = [float(base.weights.get(name, 0.0)) for name in self.feature_names]
+        self.base_bias = float(base.bias)
+        if profile is None:
+            LOGGER.info("No feature profile for %s; online updates use raw feature units", base.version)
+        spreads = [profile.spread(name) if profile else 0.0 for name in self.feature_names]
+        self.scale: List[float] = [s if s > _EPS else 1.0 for s in spreads]
+        self.updates = 0
+        self.frozen = None
+        self.window.clear()
+        self._reset_accumulators()
+
+    def _reset_accumulators(self) -> None:
+        self.n = [0.0] * (len(self.feature_names) + 1)
+        self.z = [0.0] * (len(self.feature_names) + 1)
+        p = self.params
+        denom = p.beta / p.alpha + p.l2
+        for i, (w, s) in enumerate(zip(self.base_weights, self.scale)):
+            v = w * s
+            self.z[i] = -v * denom - math.copysign(p.l1, v) if v else 0.0
+        self.z[-1] = -self.base_bias * p.beta / p.alpha
+
+    def _std_weights(self) -> List[float]:
+        p = self.params
+        out = []
+        last = len(self.z) - 1
+        for i, (z, n) in enumerate(zip(self.z, self.n)):
+            l1, l2 = (0.0, 0.0) if i == last else (p.l1, p.l2)
+            if abs(z) <= l1:
+                out.append(0.0)
+            else:
+                out.append(-(z - math.copysign(l1, z)) / ((p.beta + math.sqrt(n)) / p.alpha + l2))
+        return out
+
+    def weights(self) -> Tuple[Dict[str, float], float]:
+        """Current weights in raw feature units, plus bias."""
+
+        std = self._std_weights()
+        weights = {name: v / s for name, v, s in zip(self.feature_names, std, self.scale)}
+        return weights, std[-1]
+
+    def _margin(self, row: Sequence[float], weights: Sequence[float], bias: float) -> float:
+        return sum(w * x for w, x in zip(weights, row)) + bias
+
+    def update(self, row: Sequence[float], label: int) -> None:
+        """One FTRL step on *row* (ordered like ``feature_names``)."""
+
+        std = self._std_weights()
+        u = [x / s for x, s in zip(row, self.scale)] + [1.0]
+        p_online = _sigmoid(self._margin(u, std, 0.0))
+        p_base = _sigmoid(self._margin(row, self.base_weights, self.base_bias))
+        self.window.append((p_online, p_base, label))
+        g = p_online - label
+        alpha = self.params.alpha
+        for i, ui in enumerate(u):
+            if not ui:
+                continue
+            gi = g * ui
+            n_new = self.n[i] + gi * gi
+            sigma = (math.sqrt(n_new) - math.sqrt(self.n[i])) / alpha
+            self.z[i] += gi - sigma * std[i]
+            self.n[i] = n_new
+        self.updates += 1
+
+    # ------------------------------------------------------------------
+    # Guard
+    # ------------------------------------------------------------------
+    def guard(self) -> Optional[str]:
+        """Return a reason when the online weights must not be used.
+
+        Checked on the prequential window: each entry holds the online and
+        base probability computed *before* that row's update.
+        """
+
+        p = self.params
+        if len(self.window) < p.min_samples:
+            return None
+        count = len(self.window)
+        shift = sum(abs(a - b) for a, b, _ in self.window) / count
+        if shift > p.max_prob_shift:
+            return "calibration_drift"
+        online_ll = sum(_log_loss(a, y) for a, _, y in self.window) / count
+        base_ll = sum(_log_loss(b, y) for _, b, y in self.window) / count
+        if online_ll > base_ll + p.max_logloss_excess:
+            return "underperforming"
+        return None
+
+    def metrics(self) -> Dict[str, float]:
+        count = len(self.window)
+        if not count:
+            return {"updates": float(self.updates)}
+        return {
+            "updates": float(self.updates),
+            "window": float(count),
+            "prob_shift": sum(abs(a - b) for a, b, _ in self.window) / count,
+            "logloss_online": sum(_log_loss(a, y) for a, _, y in self.window) / count,
+            "logloss_base": sum(_log_loss(b, y) for _, b, y in self.window) / count,
+        }
+
+    # ------------------------------------------------------------------
+    # Live cycle
+    # ------------------------------------------------------------------
+    def observe(self, ts: int, features: Mapping[str, float]) -> None:
+        if self.pending and self.pending[-1][0] >= ts:
+            return
+        self.pending.append((ts, [float(features.get(name, 0.0)) for name in self.feature_names]))
+
+    def resolve(self, history: Sequence[FeatureRow]) -> int:
+        """Label and learn from queued rows whose horizon has closed in *history*."""
+
+        index = {row.ts_close: i for i, row in enumerate(history)}
+        horizon = self.label_cfg.horizon_bars
+        resolved = 0
+        while self.pending:
+            ts, row = self.pending[0]
+            i = index.get(ts)
+            if i is None:
+                if history and ts < history[0].ts_close:
+                    self.pending.popleft()  # scrolled out of the window; cannot be labelled
+                    continue
+                break
+            if i + horizon >= len(history):
+                break
+            self.pending.popleft()
+            label = triple_barrier_labels(history[i : i + horizon + 1], self.label_cfg)[0]
+            if label is None or self.frozen:
+                continue
+            self.update(row, label)
+            resolved += 1
+        return resolved
+
+    def step(
+        self, model: Any, history: Sequence[FeatureRow], model_path: Optional[Path | str] = None
+    ) -> Dict[str, Any]:
+        """Resolve labels, run the guard and write the weights into *model*.
+
+        A new model version resets the learner on the profile beside
+        *model_path*; a tripped guard restores the base weights and freezes
+        updates until the next version is published.
+        """
+
+        if not isinstance(model, LoadedModel):
+            return {"status": "unsupported"}
+        if model.version != self.base_version:
+            LOGGER.info("Online learner rebased on model %s", model.version)
+            self.rebase(model, _load_model_profile(model_path))
+        resolved = self.resolve(history)
+        reason = None
+        if not self.frozen:
+            reason = self.guard()
+            if reason:
+                LOGGER.warning("Online updates for %s disabled: %s", self.base_version, reason)
+                self.frozen = reason
+        if self.frozen:
+            weights, bias = dict(zip(self.feature_names, self.base_weights)), self.base_bias
+        else:
+            weights, bias = self.weights()
+        model.weights = weights
+        model.bias = bias
+        return {"resolved": resolved, "tripped": reason, "frozen": self.frozen, **self.metrics()}
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "format": STATE_FORMAT,
+            "base_version": self.base_version,
+            "feature_names": self.feature_names,
+            "base_weights": self.base_weights,
+            "base_bias": self.base_bias,
+            "scale": self.scale,
+            "z": self.z,
+            "n": self.n,
+            "updates": self.updates,
+            "frozen": self.frozen,
+            "pending": [[ts, row] for ts, row in self.pending],
+            "window": [list(entry) for entry in self.window],
+        }
+
+    def save(self, path: Optional[Path | str] = None) -> None:
+        """Write state to *path* (default: where it was loaded from) via ``os.replace``."""
+
+        path = Path(path or self.path or "models/online.state")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("w", encoding="utf8") as fh:
+            json.dump(self.to_state(), fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(
+        cls,
+        path: Path | str,
+        base: LoadedModel,
+        params: OnlineParams = OnlineParams(),
+        label_cfg: LabelConfig = LabelConfig(),
+        profile: Optional[FeatureProfile] = None,
+    ) -> "OnlineLearner":
+        """Restore saved state for *base*'s version, else start fresh from *base*."""
+
+        learner = cls(base, params, label_cfg, profile)
+        learner.path = Path(path)
+        try:
+            state = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return learner
+        if (
+            state.get("format") != STATE_FORMAT
+            or state.get("base_version") != base.version
+            or state.get("feature_names") != learner.feature_names
+        ):
+            LOGGER.info("Discarding online state for %s", state.get("base_version"))
+            return learner
+        learner.base_weights = [float(v) for v in state["base_weights"]]
+        learner.base_bias = float(state["base_bias"])
+        learner.scale = [float(v) for v in state["scale"]]
+        learner.z = [float(v) for v in state["z"]]
+        learner.n = [float(v) for v in state["n"]]
+        learner.updates = int(state.get("updates", 0))
+        learner.frozen = state.get("frozen")
+        learner.pending.extend((int(ts), list(row)) for ts, row in state.get("pending", []))
+        learner.window.extend((a, b, int(y)) for a, b, y in state.get("window", []))
+        return learner
+
+
+def _load_model_profile(model_path: Optional[Path | str]) -> Optional[FeatureProfile]:
+    return load_profile(profile_path(model_path)) if model_path is not None else None
+
+
+def learner_from_config(
+    cfg: Any, model: Any, model_path: Optional[Path | str] = None
+) -> Optional[OnlineLearner]:
+    """Build the learner configured under ``trading.online`` for a logistic *model*."""
+
+    online = cfg.online
+    if not online.enabled:
+        return None
+    if not isinstance(model, LoadedModel):
+        LOGGER.warning("Online updates need a logistic model; got %s", type(model).__name__)
+        return None
+    params = OnlineParams(
+        alpha=online.alpha,
+        l2=online.l2,
+        window=online.window,
+        min_samples=online.min_samples,
+        max_prob_shift=online.max_prob_shift,
+        max_logloss_excess=online.max_logloss_excess,
+    )
+    label_cfg = LabelConfig(horizon_bars=online.horizon_bars, k_tp=cfg.atr.k_tp, k_sl=cfg.atr.k_sl)
+    return OnlineLearner.load(online.state_path, model, params, label_cfg, _load_model_profile(model_path))
+
+
+__all__ = ["OnlineLearner", "OnlineParams", "learner_from_config"]
@@ -0,0 +1,324 @@
+"""Multi-symbol portfolio cycle.
+
+Exchange reads are issued once per cycle where the venue allows it (one
+balance call, one batched funding fetch) and the per-symbol candle fetches
+run concurrently in a thread pool. Inference is a single
+``predict_proba_batch`` call over all symbols. SQLite reads and writes,
+risk checks and order submission stay on the calling thread, which owns
+the store connection. ``max_positions`` is enforced across the whole
+portfolio, and the strongest signals claim free slots first.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from bot.config import TradingConfig
+from bot.data_ingest import fetch_candles, ingest_since, store_closed_candles, timeframe_to_seconds
+from bot.execution import ExecutionEngine
+from bot.feature_engine import FeatureRow, compute_features
+from bot.funding import estimate_annualized_funding
+from bot.logger import jlog
+from bot.notifier import TelegramNotifier
+from bot.regime import allow_trade
+from bot.risk_guard import RiskGuard
+from bot.run_cycle import (
+    _available_quote,
+    _balance_nav,
+    _can_notify,
+    _compute_daily_pnl_pct,
+    _ensure_daily_nav_snapshot,
+    _load_prev_regime_allowed,
+    _market_constraints,
+    _store_regime_allowed,
+    _utc_now_ms,
+)
+from bot.signal_policy import make_signal
+from bot.state_store import StateStore
+from bot.training import DEFAULT_FEATURES
+
+LOGGER = logging.getLogger(__name__)
+
+
+def parse_symbols(cfg: TradingConfig) -> List[str]:
+    """``trading.symbols`` (comma-separated), falling back to ``trading.symbol``."""
+
+    symbols = [s.strip() for s in (cfg.symbols or "").split(",") if s.strip()]
+    return list(dict.fromkeys(symbols)) or [cfg.symbol]
+
+
+@dataclass
+class SymbolState:
+    symbol: str
+    last: Optional[FeatureRow] = None
+    proba: Optional[Dict[str, float]] = None
+    signal: Dict[str, Any] = field(default_factory=dict)
+    result: Dict[str, Any] = field(default_factory=dict)
+    # time.monotonic() stamp of the signal, for the signal_to_submit span.
+    decided_at: Optional[float] = None
+
+    @property
+    def feature_map(self) -> Dict[str, float]:
+        return {name: getattr(self.last, name) or 0.0 for name in DEFAULT_FEATURES}
+
+
+def fetch_funding_map(client: Any, symbols: Sequence[str], pool: ThreadPoolExecutor) -> Dict[str, float]:
+    """Annualized funding per symbol: one batched call, else per-symbol calls in *pool*."""
+
+    rates: Dict[str, float] = {}
+    batch = getattr(client, "fetch_funding_rates", None)
+    if callable(batch):
+        try:
+            data = batch(list(symbols)) or {}
+            for symbol in symbols:
+                entry = data.get(symbol)
+                if entry and entry.get("fundingRate") is not None:
+                    rates[symbol] = estimate_annualized_funding(float(entry["fundingRate"]))
+            return rates
+        except Exception as exc:  # pragma: no cover - fall back to per-symbol calls
+            LOGGER.debug("fetch_funding_rates failed: %s", exc)
+    single = getattr(client, "fetch_funding_rate", None)
+    if not callable(single):
+        return rates
+    futures = {symbol: pool.submit(single, symbol) for symbol in symbols}
+    for symbol, future in futures.items():
+        try:
+            rates[symbol] = estimate_annualized_funding(float(future.result().get("fundingRate", 0.0)))
+        except Exception as exc:  # pragma: no cover - network
+            LOGGER.debug("fetch_funding_rate(%s) failed: %s", symbol, exc)
+    return rates
+
+
+def _score(inferer: Any, states: Sequence[SymbolState]) -> None:
+    if not states:
+        return
+    batch_fn = getattr(inferer, "predict_proba_batch", None)
+    if callable(batch_fn):
+        try:
+            matrix = [[s.feature_map[name] for name in DEFAULT_FEATURES] for s in states]
+            batch = batch_fn(matrix, columns=DEFAULT_FEATURES)
+            for i, state in enumerate(states):
+                buy = batch.buy[i]
+                if not math.isnan(buy):
+                    state.proba = {"buy": buy, "sell": batch.sell[i]}
+            return
+        except Exception as exc:  # pragma: no cover - defensive
+            LOGGER.warning("Batch inference failed, scoring per symbol: %s", exc)
+    predict_fn = getattr(inferer, "predict_proba", None)
+    if not callable(predict_fn):
+        LOGGER.warning("Inferer missing predict_proba; skipping model step")
+        return
+    for state in states:
+        try:
+            state.proba = predict_fn(state.feature_map)
+        except Exception as exc:  # pragma: no cover - defensive
+            LOGGER.warning("Model inference failed for %s: %s", state.symbol, exc)
+
+
+def run_portfolio(
+    ccxt_client,
+    store: StateStore,
+    cfg: TradingConfig,
+    inferer: Any,
+    notifier: TelegramNotifier,
+    nav: Optional[float] = None,
+    daily_pnl_pct: Optional[float] = None,
+    symbols: Optional[Sequence[str]] = None,
+    engine: Optional[ExecutionEngine] = None,
+) -> dict:
+    """Run one cycle over *symbols*; with ``nav=None`` NAV comes from the cycle's balance read."""
+
+    symbols = list(symbols or parse_symbols(cfg))
+    timeframe = cfg.timeframe
+    log_path = "experiments/live/cycles.jsonl"
+    now_ms = _utc_now_ms()
+    states = {symbol: SymbolState(symbol) for symbol in symbols}
+
+    # The balance read gets its own pool so a hung call is abandoned after its timeout.
+    balance_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="portfolio-balance")
+    balance_fetch = getattr(ccxt_client, "fetch_balance", None)
+    balance_future = balance_pool.submit(balance_fetch) if callable(balance_fetch) else None
+    workers = max(1, min(cfg.portfolio_workers, len(symbols)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="portfolio") as pool:
+        candle_futures: Dict[str, Future] = {}
+        for symbol in symbols:
+            since = ingest_since(store, symbol, timeframe)
+            candle_futures[symbol] = pool.submit(fetch_candles, ccxt_client, symbol, timeframe, since=since)
+        funding = fetch_funding_map(ccxt_client, symbols, pool)
+        for symbol, future in candle_futures.items():
+            state = states[symbol]
+            try:
+                store_closed_candles(store, symbol, timeframe, future.result())
+            except Exception as exc:
+                LOGGER.warning("Ingest failed for %s: %s", symbol, exc)
+                state.result = {"error": str(exc)}
+                continue
+            history = store.get_last_n_candles(symbol, timeframe, cfg.atr.window * 5)
+            features = compute_features(history, atr_window=cfg.atr.window) if history else []
+            if not features:
+                state.result = {"status": "no_features"}
+                continue
+            state.last = features[-1]
+    balance = None
+    try:
+        if balance_future is not None:
+            balance = balance_future.result(timeout=cfg.prefetch.balance_timeout_s)
+    except FutureTimeout:
+        LOGGER.warning("fetch_balance timed out after %.2fs", cfg.prefetch.balance_timeout_s)
+    except Exception as exc:
+        LOGGER.warning("fetch_balance failed: %s", exc)
+    finally:
+        balance_pool.shutdown(wait=False, cancel_futures=True)
+    if nav is None:
+        nav = _balance_nav(balance, symbols[0])
+        if nav is None:
+            error = "no balance for NAV"
+            LOGGER.error("Portfolio cycle aborted: %s", error)
+            return {"error": error, "symbols": {}, "orders": [], "submitted_ms": None}
+    open_nav = _ensure_daily_nav_snapshot(store, nav, now_ms)
+    if daily_pnl_pct is None:
+        daily_pnl_pct = _compute_daily_pnl_pct(open_nav, nav)
+    available_quote = _available_quote(balance, symbols[0], nav) if balance is not None else nav
+
+    ready = [s for s in states.values() if s.last is not None]
+    _score(inferer, ready)
+    candidates: List[SymbolState] = []
+    for state in ready:
+        last = state.last
+        proba_map = state.proba or {"buy": 0.0, "sell": 0.0}
+        state.signal = make_signal(proba_map, price=last.close, atr=last.atr or 0.0, cfg=cfg)
+        state.decided_at = time.monotonic()
+        if state.signal["side"] is None:
+            state.result = {"status": "no_signal"}
+            continue
+        atr_pct = (last.atr or 0.0) / last.close if last.close else 0.0
+        allowed, reason = allow_trade(
+            adx=last.adx,
+            atr_pct=atr_pct,
+            adx_min=cfg.regime.adx_min,
+            atr_pct_min=cfg.regime.atr_pct_min,
+            atr_pct_max=cfg.regime.atr_pct_max,
+            prev_allowed=_load_prev_regime_allowed(store, state.symbol),
+        )
+        _store_regime_allowed(store, allowed, state.symbol)
+        if not allowed:
+            jlog(log_path, "regime_block", ts=now_ms, symbol=state.symbol, reason=reason)
+            state.result = {"status": "regime_blocked", "reason": reason}
+            continue
+        candidates.append(state)
+    # Strongest conviction first, so scarce position slots go to the best signals.
+    candidates.sort(key=lambda s: -max((s.proba or {}).get("buy", 0.0), (s.proba or {}).get("sell", 0.0)))
+
+    if engine is None:
+        engine = ExecutionEngine(ccxt_client, store, cfg, log_path=log_path)
+    ttl_ms = cfg.order.timeout_bars * timeframe_to_seconds(timeframe) * 1000
+    for symbol in symbols:
+        engine.expire_orders(symbol, ttl_ms, now_ms=now_ms)
+
+    guard = RiskGuard(cfg)
+    held = {p.symbol for p in store.list_positions()}
+    # A parent still being worked by an algo holds the slot like a position.
+    held.update(a.symbol for a in store.list_algo_orders(status="active"))
+    open_positions = len(held)
+    markets: Mapping[str, Any] = getattr(ccxt_client, "markets", {}) or {}
+    notify_threshold = getattr(notifier, "max_failures_allowed", 3)
+    leverage = float(cfg.leverage) if cfg.leverage else 1.0
+    submitted: Dict[str, List[str]] = {}
+    for state in candidates:
+        symbol = state.symbol
+        signal = state.signal
+        last = state.last
+        if symbol in held:
+            state.result = {"status": "max_position"}
+            continue
+        funding_annualized = funding.get(symbol)
+        if funding_annualized is not None and abs(funding_annualized) > cfg.funding.extreme_annualized:
+            # One symbol's funding spike skips that symbol instead of freezing the portfolio.
+            jlog(log_path, "risk_block", ts=now_ms, symbol=symbol, reason="funding_extreme")
+            state.result = {"status": "risk_blocked", "reason": "funding_extreme"}
+            continue
+        qty, freeze_reason = guard.guard_signal(
+            nav,
+            last.close,
+            signal["stop_px"],
+            _market_constraints(markets.get(symbol, {})),
+            daily_pnl_pct,
+            notify_fail_streak=notifier.failure_streak,
+            notify_threshold=notify_threshold,
+            symbol_meta=engine.get_symbol_meta(symbol),
+            side=signal["side"],
+            available_quote=available_quote,
+            leverage=cfg.leverage,
+            open_positions=open_positions,
+        )
+        if qty is None:
+            jlog(log_path, "risk_block", ts=now_ms, symbol=symbol, reason=freeze_reason)
+            status = "max_position" if freeze_reason == "max_positions" else "risk_blocked"
+            state.result = {"status": status, "reason": freeze_reason}
+            continue
+        if cfg.order.algo and qty * last.close >= cfg.order.algo_min_notional:
+            algo_id = engine.start_algo(
+                symbol,
+                signal["side"],
+                last.close,
+                qty,
+                stop_px=signal.get("stop_px"),
+                tp_px=signal.get("tp_px"),
+            )
+            order_ids = [child.oid for child in store.list_algo_children(algo_id)]
+        else:
+            order_ids = engine.submit_ladder(
+                symbol,
+                signal["side"],
+                last.close,
+                qty,
+                stop_px=signal.get("stop_px"),
+                tp_px=signal.get("tp_px"),
+                decided_at=state.decided_at,
+            )
+        open_positions += 1
+        available_quote = max(0.0, available_quote - qty * last.close / leverage)
+        submitted[symbol] = order_ids
+        state.result = {"status": "ok", "orders": order_ids, "signal": signal}
+        jlog(
+            log_path,
+            "cycle",
+            ts=now_ms,
+            symbol=symbol,
+            p_buy=state.proba["buy"] if state.proba else 0.0,
+            p_sell=state.proba["sell"] if state.proba else 0.0,
+            tau=cfg.tau,
+            k_tp=cfg.atr.k_tp,
+            k_sl=cfg.atr.k_sl,
+            policy_verdict=signal["side"],
+            risk_reason=None,
+            order_ids=order_ids,
+            freeze=guard.is_frozen(),
+            regime_reason=None,
+        )
+
+    if submitted and _can_notify(notifier):
+        lines = [f"{s} {states[s].signal['side']} orders={len(o)}" for s, o in submitted.items()]
+        notifier.send_message("Signals: " + ", ".join(lines))
+    results = {symbol: state.result for symbol, state in states.items()}
+    jlog(
+        log_path,
+        "portfolio_cycle",
+        ts=now_ms,
+        symbols=len(symbols),
+        open_positions=open_positions,
+        statuses={symbol: r.get("status", "error") for symbol, r in results.items()},
+    )
+    return {
+        "status": "ok" if submitted else "no_orders",
+        "symbols": results,
+        "orders": [oid for ids in submitted.values() for oid in ids],
+        "submitted_ms": _utc_now_ms() if submitted else None,
+    }
+
+
+__all__ = ["SymbolState", "fetch_funding_map", "parse_symbols", "run_portfolio"]
@@ -0,0 +1,186 @@
+"""Concurrent prefetch of the exchange reads a cycle needs.
+
+Candles, funding, balance and market metadata do not depend on each other,
+so :func:`prefetch_cycle` issues them together and waits for each against
+its own timeout, clamped to the cycle's prefetch deadline when one is
+given. The returned :class:`CycleContext` carries whatever arrived in time;
+a missing or failed read is recorded in ``errors``. With an
+:class:`InputCache`, a missed funding, balance or market read falls back
+to the last value seen and its age is recorded in ``stale``; otherwise the
+decision logic falls back exactly as it did for a failed sequential call.
+SQLite is only touched on the calling thread (the ``since`` lookup), so
+persisting the candles stays with the caller.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from bot.config import PrefetchConfig, TradingConfig
+from bot.data_ingest import fetch_candles, ingest_since
+from bot.deadline import CycleDeadline
+from bot.funding import estimate_annualized_funding
+from bot.state_store import Candle, StateStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class CycleContext:
+    symbol: str
+    candles: Optional[List[Candle]] = None
+    funding_rate: Optional[float] = None
+    balance: Optional[Dict[str, Any]] = None
+    market: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    elapsed_ms: Dict[str, float] = field(default_factory=dict)
+    stale: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def funding_annualized(self) -> Optional[float]:
+        if self.funding_rate is None:
+            return None
+        return estimate_annualized_funding(self.funding_rate)
+
+
+class InputCache:
+    """Last good funding, balance and market reads per symbol, persisted as JSON."""
+
+    FIELDS = ("funding_rate", "balance", "market")
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        try:
+            self.data: Dict[str, Dict[str, List[Any]]] = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.data = {}
+
+    @classmethod
+    def for_store(cls, store: StateStore) -> "InputCache":
+        base = Path(getattr(store, "db_path", Path("data/mini.db")))
+        return cls(base.with_suffix(".inputs.json"))
+
+    def apply(self, context: CycleContext, now_ms: int, max_stale_s: float) -> None:
+        """Remember fresh values and fill missing ones from cache when young enough."""
+
+        entry = self.data.setdefault(context.symbol, {})
+        for name in self.FIELDS:
+            value = getattr(context, name)
+            if value is not None and value != {}:
+                entry[name] = [value, now_ms]
+                continue
+            if name not in context.errors or name not in entry:
+                continue
+            cached, ts = entry[name]
+            age_s = (now_ms - ts) / 1000.0
+            if age_s > max_stale_s:
+                LOGGER.warning("Cached %s is %.0fs old; not using it", name, age_s)
+                continue
+            setattr(context, name, cached)
+            context.stale[name] = age_s
+            LOGGER.warning("Using cached %s from %.0fs ago (%s)", name, age_s, context.errors[name])
+
+    def save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(self.data, sort_keys=True))
+            os.replace(tmp, self.path)
+        except OSError as exc:  # pragma: no cover - disk issues
+            LOGGER.warning("Failed to persist input cache at %s: %s", self.path, exc)
+
+
+def _fetch_funding_rate(client: Any, symbol: str) -> Optional[float]:
+    fetch = getattr(client, "fetch_funding_rate", None)
+    if not callable(fetch):
+        return None
+    return float(fetch(symbol).get("fundingRate", 0.0))
+
+
+def _fetch_balance(client: Any) -> Optional[Dict[str, Any]]:
+    fetch = getattr(client, "fetch_balance", None)
+    return fetch() if callable(fetch) else None
+
+
+def _fetch_market(client: Any, symbol: str) -> Dict[str, Any]:
+    markets = getattr(client, "markets", None)
+    if not markets:
+        load = getattr(client, "load_markets", None)
+        if callable(load):
+            load()
+            markets = getattr(client, "markets", None)
+    return dict((markets or {}).get(symbol) or {})
+
+
+def prefetch_cycle(
+    client: Any,
+    store: StateStore,
+    cfg: TradingConfig,
+    symbol: Optional[str] = None,
+    timeouts: Optional[PrefetchConfig] = None,
+    deadline: Optional[CycleDeadline] = None,
+    cache: Optional[InputCache] = None,
+    max_stale_s: float = 3600.0,
+) -> CycleContext:
+    """Fetch candles, funding, balance and market metadata concurrently."""
+
+    symbol = symbol or cfg.symbol
+    timeouts = timeouts or cfg.prefetch
+    context = CycleContext(symbol)
+    since = ingest_since(store, symbol, cfg.timeframe)
+    calls: Dict[str, tuple[Callable[[], Any], float]] = {
+        "ingest": (
+            lambda: fetch_candles(client, symbol, cfg.timeframe, since=since),
+            timeouts.ingest_timeout_s,
+        ),
+        "funding_rate": (lambda: _fetch_funding_rate(client, symbol), timeouts.funding_timeout_s),
+        "balance": (lambda: _fetch_balance(client), timeouts.balance_timeout_s),
+        "market": (lambda: _fetch_market(client, symbol), timeouts.market_timeout_s),
+    }
+    if deadline is not None:
+        cap_s = deadline.remaining_s("prefetch")
+        calls = {name: (fn, min(timeout, cap_s)) for name, (fn, timeout) in calls.items()}
+
+    def timed(name: str, fn: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            context.elapsed_ms[name] = (time.perf_counter() - start) * 1000.0
+
+    pool = ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="prefetch")
+    started = time.monotonic()
+    futures = {name: pool.submit(timed, name, fn) for name, (fn, _) in calls.items()}
+    results: Dict[str, Any] = {}
+    try:
+        for name, future in futures.items():
+            remaining = max(0.0, started + calls[name][1] - time.monotonic())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except FutureTimeout:
+                context.errors[name] = "timeout"
+                LOGGER.warning("Prefetch %s timed out after %.2fs", name, calls[name][1])
+            except Exception as exc:
+                context.errors[name] = str(exc)
+                LOGGER.warning("Prefetch %s failed: %s", name, exc)
+    finally:
+        # Timed-out calls finish in the background; nobody waits for them.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    context.candles = results.get("ingest")
+    context.funding_rate = results.get("funding_rate")
+    context.balance = results.get("balance")
+    context.market = results.get("market") or {}
+    if cache is not None:
+        cache.apply(context, int(time.time() * 1000), max_stale_s)
+        cache.save()
+    return context
+
+
+__all__ = ["CycleContext", "InputCache", "prefetch_cycle"]
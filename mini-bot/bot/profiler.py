@@ -0,0 +1,232 @@
+"""Per-stage timing of a trading cycle.
+
+:class:`CycleProfiler` times the named stages of ``run_once`` (wall clock,
+process CPU and the number of exchange calls made while the stage was open)
+and writes them as one ``cycle_profile`` event next to the ``cycle`` entries.
+Exchange calls are counted by :class:`CountingClient`, a proxy that sits
+outermost around the ccxt client so that prefetch threads and the execution
+engine go through it as well. When capture is enabled each stage runs under
+``cProfile`` and the stats are dumped only for stages that exceeded their
+budget. :func:`summarize` turns logged events into p50/p95 per stage for
+``scripts/cycle_profile_report.py``.
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from bot.logger import jlog
+
+LOGGER = logging.getLogger(__name__)
+
+STAGES = ("ingest", "compute_features", "inference", "regime", "risk", "submission")
+# Client methods that hit the venue; helpers such as ``market()`` or
+# ``amount_to_precision()`` are local and not counted.
+EXCHANGE_CALL_PREFIXES = ("fetch_", "create_", "cancel_", "edit_", "load_", "set_")
+
+
+class CountingClient:
+    """Proxy a ccxt client and count calls to venue endpoints."""
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @property
+    def wrapped(self) -> Any:
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr) or not name.startswith(EXCHANGE_CALL_PREFIXES):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self._lock:
+                self.calls += 1
+            return attr(*args, **kwargs)
+
+        return call
+
+
+def counting(client: Any) -> CountingClient:
+    return client if isinstance(client, CountingClient) else CountingClient(client)
+
+
+def parse_budgets(spec: str) -> Dict[str, float]:
+    """``"ingest=3000,risk=200"`` -> ``{"ingest": 3000.0, "risk": 200.0}`` (ms)."""
+
+    budgets: Dict[str, float] = {}
+    for item in (spec or "").split(","):
+        name, sep, value = item.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            budgets[name.strip()] = float(value)
+        except ValueError:
+            LOGGER.warning("Ignoring stage budget %r", item)
+    return budgets
+
+
+@dataclass
+class StageStats:
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    calls: int = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"wall_ms": round(self.wall_ms, 3), "cpu_ms": round(self.cpu_ms, 3), "calls": self.calls}
+
+
+class CycleProfiler:
+    """Accumulate wall/CPU time and exchange calls per named stage."""
+
+    def __init__(
+        self,
+        client: Optional[CountingClient] = None,
+        budgets: Optional[Mapping[str, float]] = None,
+        capture_dir: Optional[Path | str] = None,
+    ) -> None:
+        self.client = client
+        self.budgets = dict(budgets or {})
+        self.capture_dir = Path(capture_dir) if capture_dir else None
+        self.stages: Dict[str, StageStats] = {}
+        self.over_budget: List[str] = []
+        self.captures: List[str] = []
+        self._started = time.perf_counter()
+
+    def _calls(self) -> int:
+        return self.client.calls if self.client is not None else 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        profile = cProfile.Profile() if self.capture_dir is not None else None
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:  # another profiler is active
+                profile = None
+        calls = self._calls()
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_ms = (time.perf_counter() - wall) * 1000.0
+            cpu_ms = (time.process_time() - cpu) * 1000.0
+            if profile is not None:
+                profile.disable()
+            stats = self.stages.setdefault(name, StageStats())
+            stats.wall_ms += wall_ms
+            stats.cpu_ms += cpu_ms
+            stats.calls += self._calls() - calls
+            budget = self.budgets.get(name)
+            if budget is not None and wall_ms > budget:
+                self.over_budget.append(name)
+                LOGGER.warning("Stage %s took %.0f ms (budget %.0f ms)", name, wall_ms, budget)
+                if profile is not None:
+                    self._dump(name, profile)
+
+    def _dump(self, name: str, profile: cProfile.Profile) -> None:
+        path = self.capture_dir / f"{int(time.time() * 1000)}-{name}.prof"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(str(path))
+        except OSError as exc:  # pragma: no cover - disk issues
+            LOGGER.warning("Failed to write profile %s: %s", path, exc)
+            return
+        self.captures.append(str(path))
+
+    def payload(self) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "total_ms": round((time.perf_counter() - self._started) * 1000.0, 3),
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+        }
+        if self.over_budget:
+            payload["over_budget"] = list(dict.fromkeys(self.over_budget))
+        if self.captures:
+            payload["captures"] = self.captures
+        return payload
+
+    def log(self, log_path: Path | str, **fields: Any) -> None:
+        jlog(log_path, "cycle_profile", **fields, **self.payload())
+
+
+def load_profiles(
+    path: Path | str, since_ms: Optional[int] = None, until_ms: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """``cycle_profile`` events in *path* with ``since_ms <= ts < until_ms``."""
+
+    records: List[Dict[str, Any]] = []
+    try:
+        handle = Path(path).open(encoding="utf8")
+    except OSError:
+        return records
+    with handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("evt") != "cycle_profile":
+                continue
+            ts = int(record.get("ts") or 0)
+            if since_ms is not None and ts < since_ms:
+                continue
+            if until_ms is not None and ts >= until_ms:
+                continue
+            records.append(record)
+    return records
+
+
+def _quantile(values: List[float], q: float) -> float:
+    """Nearest-rank quantile of sorted *values*."""
+
+    rank = max(1, min(len(values), int(q * len(values) + 0.999999)))
+    return values[rank - 1]
+
+
+def summarize(records: Iterable[Mapping[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """p50/p95 wall and CPU time and mean exchange calls per stage."""
+
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for record in records:
+        stages = dict(record.get("stages") or {})
+        stages["total"] = {"wall_ms": record.get("total_ms", 0.0)}
+        for name, stats in stages.items():
+            bucket = samples.setdefault(name, {"wall_ms": [], "cpu_ms": [], "calls": []})
+            for key in bucket:
+                if key in stats:
+                    bucket[key].append(float(stats[key]))
+    out: Dict[str, Dict[str, float]] = {}
+    for name, bucket in samples.items():
+        wall = sorted(bucket["wall_ms"])
+        cpu = sorted(bucket["cpu_ms"])
+        row = {"n": float(len(wall)), "wall_p50": _quantile(wall, 0.5), "wall_p95": _quantile(wall, 0.95)}
+        if cpu:
+            row.update(cpu_p50=_quantile(cpu, 0.5), cpu_p95=_quantile(cpu, 0.95))
+        if bucket["calls"]:
+            row["calls_mean"] = sum(bucket["calls"]) / len(bucket["calls"])
+        out[name] = row
+    return out
+
+
+__all__ = [
+    "CountingClient",
+    "CycleProfiler",
+    "EXCHANGE_CALL_PREFIXES",
+    "STAGES",
+    "StageStats",
+    "counting",
+    "load_profiles",
+    "parse_budgets",
+    "summarize",
+]
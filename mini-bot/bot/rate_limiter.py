@@ -0,0 +1,213 @@
+"""Process-wide weight based rate limiting for exchange calls."""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+PRIORITY_CRITICAL = 0
+PRIORITY_DATA = 1
+
+# Request weights approximating the Binance USD-M REST limits (2400 / minute).
+BINANCE_USDM_WEIGHTS: Dict[str, float] = {
+    "fetch_ohlcv": 5,
+    "fetch_balance": 5,
+    "fetch_funding_rate": 1,
+    "fetch_funding_rates": 10,
+    "fetch_positions_risk": 5,
+    "fetch_positions": 5,
+    "fetch_order_book": 5,
+    "fetch_ticker": 1,
+    "fetch_order": 1,
+    "fetch_open_orders": 1,
+    "load_markets": 1,
+    "create_order": 1,
+    "edit_order": 1,
+    "cancel_order": 1,
+    "set_leverage": 1,
+    "set_margin_mode": 1,
+}
+
+# Calls that protect or manage live exposure; data fetches may not dip into
+# the reserved share of the bucket so these always find headroom.
+CRITICAL_ENDPOINTS = frozenset(
+    {
+        "create_order",
+        "edit_order",
+        "cancel_order",
+        "fetch_order",
+        "fetch_open_orders",
+        "set_leverage",
+        "set_margin_mode",
+    }
+)
+
+_RATE_LIMIT_ERRORS = ("RateLimitExceeded", "DDoSProtection")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets(
+  name TEXT PRIMARY KEY,
+  tokens REAL,
+  ts REAL
+);
+"""
+
+
+class RateLimiter:
+    """Token bucket persisted in SQLite so every process shares one budget."""
+
+    def __init__(
+        self,
+        path: Path | str = Path("data/ratelimit.db"),
+        *,
+        name: str = "default",
+        capacity: float = 2400.0,
+        refill_per_s: float = 40.0,
+        reserve_pct: float = 0.2,
+        weights: Optional[Mapping[str, float]] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.path = Path(path)
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_per_s = float(refill_per_s)
+        self.reserve = self.capacity * min(max(reserve_pct, 0.0), 1.0)
+        self.weights = dict(BINANCE_USDM_WEIGHTS if weights is None else weights)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA busy_timeout=5000;")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def weight_for(self, endpoint: str) -> float:
+        return float(self.weights.get(endpoint, 1))
+
+    def priority_for(self, endpoint: str) -> int:
+        return PRIORITY_CRITICAL if endpoint in CRITICAL_ENDPOINTS else PRIORITY_DATA
+
+    def _try_take(self, weight: float, floor: float) -> float:
+        """Take *weight* tokens if possible; return 0 or the seconds to wait."""
+
+        now = self._clock()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, ts FROM buckets WHERE name=?", (self.name,)
+                ).fetchone()
+                if row is None:
+                    tokens = self.capacity
+                else:
+                    elapsed = max(0.0, now - float(row[1]))
+                    tokens = min(self.capacity, float(row[0]) + elapsed * self.refill_per_s)
+                wait = 0.0
+                if tokens - weight >= floor:
+                    tokens -= weight
+                elif self.refill_per_s > 0:
+                    wait = (floor + weight - tokens) / self.refill_per_s
+                else:
+                    wait = float("inf")
+                self._conn.execute(
+                    "INSERT INTO buckets(name, tokens, ts) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET tokens=excluded.tokens, ts=excluded.ts",
+                    (self.name, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def acquire(
+        self,
+        endpoint: str,
+        *,
+        weight: Optional[float] = None,
+        priority: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """Block until *endpoint* fits in the shared budget; return seconds waited."""
+
+        weight = self.weight_for(endpoint) if weight is None else float(weight)
+        weight = min(weight, self.capacity)
+        priority = self.priority_for(endpoint) if priority is None else priority
+        floor = 0.0 if priority == PRIORITY_CRITICAL else min(self.reserve, self.capacity - weight)
+        waited = 0.0
+        while True:
+            wait = self._try_take(weight, floor)
+            if wait <= 0:
+                return waited
+            if timeout is not None and waited + wait > timeout:
+                raise TimeoutError(f"rate limit budget exhausted for {endpoint}")
+            self._sleep(wait)
+            waited += wait
+
+    def penalize(self) -> None:
+        """Drain the shared bucket after a venue-side 429 so all callers back off."""
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO buckets(name, tokens, ts) VALUES (?, 0, ?) "
+                "ON CONFLICT(name) DO UPDATE SET tokens=0, ts=excluded.ts",
+                (self.name, self._clock()),
+            )
+
+    def tokens(self) -> float:
+        row = self._conn.execute(
+            "SELECT tokens, ts FROM buckets WHERE name=?", (self.name,)
+        ).fetchone()
+        if row is None:
+            return self.capacity
+        elapsed = max(0.0, self._clock() - float(row[1]))
+        return min(self.capacity, float(row[0]) + elapsed * self.refill_per_s)
+
+
+class ScheduledClient:
+    """Proxy a ccxt client so every weighted endpoint passes through the limiter."""
+
+    def __init__(self, client: Any, limiter: RateLimiter) -> None:
+        self._client = client
+        self._limiter = limiter
+
+    @property
+    def wrapped(self) -> Any:
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr) or name not in self._limiter.weights:
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            self._limiter.acquire(name)
+            try:
+                return attr(*args, **kwargs)
+            except Exception as exc:
+                if type(exc).__name__ in _RATE_LIMIT_ERRORS:
+                    LOGGER.warning("Venue rate limit hit on %s; draining shared bucket", name)
+                    self._limiter.penalize()
+                raise
+
+        return call
+
+
+__all__ = [
+    "BINANCE_USDM_WEIGHTS",
+    "CRITICAL_ENDPOINTS",
+    "PRIORITY_CRITICAL",
+    "PRIORITY_DATA",
+    "RateLimiter",
+    "ScheduledClient",
+]
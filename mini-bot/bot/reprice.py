@@ -0,0 +1,95 @@
+"""Sub-bar scheduler for ladder repricing and execution-algorithm slices."""
+from __future__ import annotations
+
+import logging
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from bot.config import load_config
+from bot.data_ingest import timeframe_to_seconds
+from bot.execution import ExecutionEngine
+from bot.state_store import StateStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+def next_bar_close_ms(now_ms: int, timeframe: str) -> int:
+    step_ms = timeframe_to_seconds(timeframe) * 1000
+    return (now_ms // step_ms + 1) * step_ms
+
+
+def reprice_until(
+    engine: ExecutionEngine,
+    symbol: str,
+    *,
+    interval_s: float,
+    deadline_ms: int,
+    reprice_interval_s: Optional[float] = None,
+    clock: Callable[[], float] = time.time,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """Run algo slicing every *interval_s* until *deadline_ms*.
+
+    Repricing passes run every *reprice_interval_s* (defaults to
+    *interval_s*; ``0`` disables them). Returns the total number of
+    repriced levels.
+    """
+
+    total = 0
+    if interval_s <= 0:
+        return total
+    reprice_ms = int((interval_s if reprice_interval_s is None else reprice_interval_s) * 1000)
+    next_reprice_ms = 0
+    while True:
+        now_ms = int(clock() * 1000)
+        if now_ms >= deadline_ms:
+            return total
+        if reprice_ms > 0 and now_ms >= next_reprice_ms:
+            next_reprice_ms = now_ms + reprice_ms
+            try:
+                total += engine.reprice_ladder(symbol, now_ms=now_ms)
+            except Exception as exc:  # pragma: no cover - keep scheduler alive
+                LOGGER.warning("Reprice pass failed: %s", exc)
+        try:
+            engine.step_algos(symbol=symbol, now_ms=now_ms)
+        except Exception as exc:  # pragma: no cover - keep scheduler alive
+            LOGGER.warning("Algo step failed: %s", exc)
+        wake_ms = now_ms + int(interval_s * 1000)
+        if wake_ms >= deadline_ms:
+            return total
+        sleep((wake_ms - int(clock() * 1000)) / 1000.0)
+
+
+def main(db_path: Path | str = Path("data/mini.db"), settle_ms: int = 60_000) -> Optional[int]:
+    """Reprice and slice the configured symbol until shortly before the next bar close."""
+
+    from bot.run_cycle import build_client
+
+    cfg = load_config().trading
+    intervals = [cfg.order.reprice_interval_s]
+    if cfg.order.algo:
+        intervals.append(cfg.order.algo_interval_s)
+    intervals = [i for i in intervals if i > 0]
+    if not intervals:
+        LOGGER.info("Repricing and execution algorithms disabled")
+        return None
+    client = build_client(cfg)
+    deadline_ms = next_bar_close_ms(int(time.time() * 1000), cfg.timeframe) - settle_ms
+    log_path = "experiments/live/cycles.jsonl"
+    with StateStore(db_path) as store:
+        engine = ExecutionEngine(client, store, cfg, log_path=log_path)
+        return reprice_until(
+            engine,
+            cfg.symbol,
+            interval_s=min(intervals),
+            deadline_ms=deadline_ms,
+            reprice_interval_s=max(cfg.order.reprice_interval_s, 0),
+        )
+
+
+__all__ = ["next_bar_close_ms", "reprice_until"]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
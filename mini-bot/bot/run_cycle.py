@@ -3,20 +3,28 @@ from __future__ import annotations
 
 import logging
 import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Mapping, Optional, Protocol
+from typing import Any, Dict, Mapping, Optional, Protocol
 
-from bot.config import TradingConfig, load_config
-from bot.data_ingest import ingest_cycle, timeframe_to_seconds
+from bot.config import Config, TradingConfig, load_config
+from bot.data_ingest import store_closed_candles, timeframe_to_seconds
+from bot.deadline import CycleDeadline
+from bot.drift import DriftMonitor
 from bot.execution import ExecutionEngine
-from bot.feature_engine import compute_features
-from bot.funding import estimate_annualized_funding
+from bot.feature_engine import FeatureRow, compute_features
 from bot.logger import jlog
 from bot.model_infer import ModelInferer
+from bot.model_registry import default_model_path
 from bot.notifier import TelegramNotifier
+from bot.online_learner import OnlineLearner, learner_from_config
+from bot.prefetch import CycleContext, InputCache, prefetch_cycle
+from bot.profiler import CycleProfiler, counting, parse_budgets
+from bot.rate_limiter import RateLimiter, ScheduledClient
 from bot.regime import allow_trade
 from bot.risk_guard import MarketConstraints, RiskGuard
+from bot.shadow import ShadowScorer, parse_versions
 from bot.signal_policy import make_signal
 from bot.state_store import DailyNav, StateStore
 
@@ -28,13 +36,16 @@ class ProbabilisticModel(Protocol):
         ...
 
 
-def _regime_state_path(store: StateStore) -> Path:
+def _regime_state_path(store: StateStore, symbol: Optional[str] = None) -> Path:
     base = Path(getattr(store, "db_path", Path("data/mini.db")))
-    return base.with_suffix(".regime.state")
+    if symbol is None:
+        return base.with_suffix(".regime.state")
+    slug = "".join(ch if ch.isalnum() else "_" for ch in symbol)
+    return base.with_suffix(f".{slug}.regime.state")
 
 
-def _load_prev_regime_allowed(store: StateStore) -> Optional[bool]:
-    path = _regime_state_path(store)
+def _load_prev_regime_allowed(store: StateStore, symbol: Optional[str] = None) -> Optional[bool]:
+    path = _regime_state_path(store, symbol)
     if not path.exists():
         return None
     try:
@@ -48,8 +59,8 @@ def _load_prev_regime_allowed(store: StateStore) -> Optional[bool]:
     return None
 
 
-def _store_regime_allowed(store: StateStore, allowed: bool) -> None:
-    path = _regime_state_path(store)
+def _store_regime_allowed(store: StateStore, allowed: bool, symbol: Optional[str] = None) -> None:
+    path = _regime_state_path(store, symbol)
     try:
         path.parent.mkdir(parents=True, exist_ok=True)
         path.write_text("1" if allowed else "0")
@@ -68,6 +79,24 @@ def _quote_currency(symbol: str) -> str:
     return candidate
 
 
+def _available_quote(balance: Any, symbol: str, default: float) -> float:
+    quote_ccy = _quote_currency(symbol)
+    free_balances = balance.get("free", {}) if isinstance(balance, dict) else {}
+    total_balances = balance.get("total", {}) if isinstance(balance, dict) else {}
+    return free_balances.get(quote_ccy) or total_balances.get(quote_ccy) or default
+
+
+def _balance_nav(balance: Any, symbol: str) -> Optional[float]:
+    """NAV in the quote currency, or ``None`` when *balance* does not carry it."""
+
+    total = balance.get("total", {}) if isinstance(balance, dict) else {}
+    try:
+        nav = float(total.get(_quote_currency(symbol)) or 0.0)
+    except (TypeError, ValueError):
+        return None
+    return nav if nav > 0 else None
+
+
 def _can_notify(notifier: TelegramNotifier) -> bool:
     return bool(getattr(notifier, "token", None) and getattr(notifier, "chat_id", None))
 
@@ -97,6 +126,10 @@ def _ensure_daily_nav_snapshot(store: StateStore, nav: float, now_ms: int) -> fl
     existing = store.get_daily_nav(day_ts)
     if existing:
         return existing.nav
+    if nav <= 0:
+        # A failed balance read must not become the day's opening NAV.
+        LOGGER.warning("Not snapshotting non-positive NAV %s", nav)
+        return nav
     store.upsert_daily_nav(
         DailyNav(ts=day_ts, nav=nav, trading_pnl=0.0, fees_pnl=0.0, funding_pnl=0.0)
     )
@@ -109,68 +142,255 @@ def _compute_daily_pnl_pct(open_nav: float, current_nav: float) -> float:
     return (current_nav - open_nav) / open_nav
 
 
+def _notify(notifier: TelegramNotifier, deadline: Optional[CycleDeadline], text: str) -> None:
+    if not _can_notify(notifier):
+        return
+    if deadline is None:
+        notifier.send_message(text)
+    else:
+        deadline.notify(notifier, text)
+
+
+def _within(deadline: Optional[CycleDeadline], stage: str, name: str) -> bool:
+    """Whether optional work *name* still fits before *stage*'s deadline; records a skip if not."""
+
+    if deadline is None or deadline.allows(stage):
+        return True
+    deadline.skip(name)
+    return False
+
+
+def _check_drift(
+    drift: DriftMonitor,
+    inferer: ProbabilisticModel,
+    cfg: TradingConfig,
+    last: FeatureRow,
+    log_path: str,
+    now_ms: int,
+) -> None:
+    """Add the raw (not zero-filled) feature row to the drift window and log breaches.
+
+    A bar already observed (a re-run cycle on the same close) is skipped.
+    """
+
+    model_path = getattr(inferer, "model_path", None)
+    if model_path is not None:
+        drift.sync_profile(model_path)
+    row = {name: getattr(last, name, None) for name in drift.profile.feature_names}
+    if not drift.observe(row, ts=last.ts_close):
+        return
+    alerts = drift.alerts(
+        psi_alert=cfg.drift.psi_alert,
+        ks_alert=cfg.drift.ks_alert,
+        missing_alert=cfg.drift.missing_alert,
+        min_samples=cfg.drift.min_samples,
+    )
+    if alerts:
+        LOGGER.warning("Feature drift on %s", ", ".join(sorted(alerts)))
+        jlog(
+            log_path,
+            "feature_drift",
+            ts=now_ms,
+            symbol=cfg.symbol,
+            version=getattr(inferer, "version", None),
+            features=alerts,
+        )
+    try:
+        drift.save(cfg.drift.state_path)
+    except OSError as exc:  # pragma: no cover - disk issues
+        LOGGER.warning("Failed to persist drift state: %s", exc)
+
+
 def run_once(
     ccxt_client,
     store: StateStore,
     cfg: TradingConfig,
     inferer: ProbabilisticModel,
     notifier: TelegramNotifier,
-    nav: float,
+    nav: Optional[float],
     daily_pnl_pct: Optional[float] = None,
+    shadow: Optional[ShadowScorer] = None,
+    online: Optional[OnlineLearner] = None,
+    drift: Optional[DriftMonitor] = None,
+    engine: Optional[ExecutionEngine] = None,
+    context: Optional[CycleContext] = None,
+    deadline: Optional[CycleDeadline] = None,
+) -> dict:
+    """Run one single-symbol cycle.
+
+    With ``nav=None`` NAV is taken from the balance prefetched in the ingest
+    stage, so a slow ``fetch_balance`` is bounded by the cycle deadline and
+    timed with the rest of the prefetch.
+    """
+
+    log_path = "experiments/live/cycles.jsonl"
+    ccxt_client = counting(ccxt_client)
+    # A deadline passed in belongs to the caller, who flushes its deferred notifications.
+    owns_deadline = deadline is None
+    if deadline is None and cfg.deadline.enabled:
+        deadline = CycleDeadline.from_config(cfg.deadline)
+    profile_cfg = cfg.profiler
+    profiler = CycleProfiler(
+        ccxt_client,
+        parse_budgets(profile_cfg.budgets_ms),
+        profile_cfg.capture_dir if profile_cfg.capture else None,
+    )
+    result: dict = {}
+    try:
+        result = _run_once(
+            ccxt_client,
+            store,
+            cfg,
+            inferer,
+            notifier,
+            nav,
+            daily_pnl_pct,
+            shadow,
+            online,
+            drift,
+            engine,
+            context,
+            profiler,
+            deadline,
+            log_path,
+        )
+        return result
+    finally:
+        if profile_cfg.enabled:
+            profiler.log(log_path, ts=_utc_now_ms(), symbol=cfg.symbol, status=result.get("status", "error"))
+        if deadline is not None:
+            if deadline.eventful:
+                jlog(log_path, "cycle_deadline", ts=_utc_now_ms(), symbol=cfg.symbol, **deadline.summary())
+            if owns_deadline:
+                deadline.flush(notifier)
+
+
+def _run_once(
+    ccxt_client,
+    store: StateStore,
+    cfg: TradingConfig,
+    inferer: ProbabilisticModel,
+    notifier: TelegramNotifier,
+    nav: Optional[float],
+    daily_pnl_pct: Optional[float],
+    shadow: Optional[ShadowScorer],
+    online: Optional[OnlineLearner],
+    drift: Optional[DriftMonitor],
+    engine: Optional[ExecutionEngine],
+    context: Optional[CycleContext],
+    profiler: CycleProfiler,
+    deadline: Optional[CycleDeadline],
+    log_path: str,
 ) -> dict:
     symbol = cfg.symbol
     timeframe = cfg.timeframe
     now_ms = _utc_now_ms()
+
+    with profiler.stage("ingest"):
+        if context is None:
+            context = _prefetch(ccxt_client, store, cfg, deadline)
+        if context.candles is not None:
+            store_closed_candles(store, symbol, timeframe, context.candles)
+    if deadline is not None:
+        deadline.stale.update(context.stale)
+    if nav is None:
+        nav = _balance_nav(context.balance, symbol)
+        if nav is None:
+            # The cached balance (if any) was already applied by the prefetch.
+            error = f"no balance for NAV: {context.errors.get('balance', 'quote balance missing')}"
+            LOGGER.error(error)
+            _notify(notifier, deadline, error)
+            return {"error": error}
     open_nav = _ensure_daily_nav_snapshot(store, nav, now_ms)
     if daily_pnl_pct is None:
         daily_pnl_pct = _compute_daily_pnl_pct(open_nav, nav)
-
-    try:
-        candles = ingest_cycle(ccxt_client, store, symbol, timeframe)
-    except Exception as exc:  # pragma: no cover - defensive
-        LOGGER.exception("Ingest failed: %s", exc)
-        if _can_notify(notifier):
-            notifier.send_message(f"Ingest failed: {exc}")
-        return {"error": str(exc)}
-
-    history = store.get_last_n_candles(symbol, timeframe, cfg.atr.window * 5)
+    if context.candles is None:
+        error = context.errors.get("ingest", "no candles fetched")
+        LOGGER.error("Ingest failed: %s", error)
+        _notify(notifier, deadline, f"Ingest failed: {error}")
+        return {"error": error}
+
+    with profiler.stage("compute_features"):
+        history = store.get_last_n_candles(symbol, timeframe, cfg.atr.window * 5)
+        features = compute_features(history, atr_window=cfg.atr.window) if history else []
     if not history:
         return {"status": "no_candles"}
-
-    features = compute_features(history, atr_window=cfg.atr.window)
     if not features:
         return {"status": "no_features"}
 
-    last = features[-1]
-    feature_map = {"atr": last.atr or 0.0, "adx": last.adx or 0.0, "ret": last.ret or 0.0, "vol": last.vol or 0.0}
-    predict_fn = getattr(inferer, "predict_proba", None)
-    if callable(predict_fn):
-        try:
-            proba = predict_fn(feature_map)
-        except Exception as exc:  # pragma: no cover - defensive
-            LOGGER.warning("Model inference failed: %s", exc)
+    with profiler.stage("inference"):
+        last = features[-1]
+        feature_map = {
+            "atr": last.atr or 0.0,
+            "adx": last.adx or 0.0,
+            "ret": last.ret or 0.0,
+            "vol": last.vol or 0.0,
+        }
+        reload_fn = getattr(inferer, "reload_if_changed", None)
+        if callable(reload_fn):
+            # Promote a newly activated registry version, warmed up on this row.
+            reload_fn(warmup_rows=[feature_map])
+        if drift is not None:
+            _check_drift(drift, inferer, cfg, last, log_path, now_ms)
+        # Online learning and shadow scoring are optional; they give way to the order path.
+        # Past the decision deadline only the update is skipped; the row is still queued below.
+        if online is not None and _within(deadline, "decision", "online_update"):
+            # Learn from rows whose labels resolved since the last cycle.
+            summary = online.step(
+                getattr(inferer, "model", None), features, model_path=getattr(inferer, "model_path", None)
+            )
+            clear_cache = getattr(inferer, "clear_cache", None)
+            if callable(clear_cache):
+                # Weights may have changed in place under the same version.
+                clear_cache()
+            if summary.get("resolved") or summary.get("tripped"):
+                jlog(
+                    log_path, "online_update", ts=now_ms, symbol=symbol, version=online.base_version, **summary
+                )
+        predict_fn = getattr(inferer, "predict_proba", None)
+        if callable(predict_fn):
+            try:
+                proba = predict_fn(feature_map)
+            except Exception as exc:  # pragma: no cover - defensive
+                LOGGER.warning("Model inference failed: %s", exc)
+                proba = None
+        else:
+            LOGGER.warning("Inferer missing predict_proba; skipping model step")
             proba = None
-    else:
-        LOGGER.warning("Inferer missing predict_proba; skipping model step")
-        proba = None
-    proba_map = proba or {"buy": 0.0, "sell": 0.0}
-    signal = make_signal(proba_map, price=last.close, atr=last.atr or 0.0, cfg=cfg)
+        proba_map = proba or {"buy": 0.0, "sell": 0.0}
+        signal = make_signal(proba_map, price=last.close, atr=last.atr or 0.0, cfg=cfg)
+        decided_at = time.monotonic()
+        if shadow is not None and _within(deadline, "decision", "shadow_submit"):
+            # Challengers are scored in the shadow pool after the live decision.
+            shadow.submit(
+                last.ts_close,
+                symbol,
+                feature_map,
+                live_version=getattr(inferer, "version", None),
+                live_p_buy=proba.get("buy") if proba else None,
+            )
+        if online is not None:
+            online.observe(last.ts_close, feature_map)
+            try:
+                online.save()
+            except OSError as exc:  # pragma: no cover - disk issues
+                LOGGER.warning("Failed to persist online state: %s", exc)
 
     if signal["side"] is None:
         return {"status": "no_signal"}
 
-    log_path = "experiments/live/cycles.jsonl"
-    atr_pct = (last.atr or 0.0) / last.close if last.close else 0.0
-    prev_regime = _load_prev_regime_allowed(store)
-    regime_allowed, regime_reason = allow_trade(
-        adx=last.adx,
-        atr_pct=atr_pct,
-        adx_min=cfg.regime.adx_min,
-        atr_pct_min=cfg.regime.atr_pct_min,
-        atr_pct_max=cfg.regime.atr_pct_max,
-        prev_allowed=prev_regime,
-    )
-    _store_regime_allowed(store, regime_allowed)
+    with profiler.stage("regime"):
+        atr_pct = (last.atr or 0.0) / last.close if last.close else 0.0
+        prev_regime = _load_prev_regime_allowed(store)
+        regime_allowed, regime_reason = allow_trade(
+            adx=last.adx,
+            atr_pct=atr_pct,
+            adx_min=cfg.regime.adx_min,
+            atr_pct_min=cfg.regime.atr_pct_min,
+            atr_pct_max=cfg.regime.atr_pct_max,
+            prev_allowed=prev_regime,
+        )
+        _store_regime_allowed(store, regime_allowed)
     if not regime_allowed:
         jlog(
             log_path,
@@ -181,57 +401,41 @@ def run_once(
         )
         return {"status": "regime_blocked", "reason": regime_reason}
 
-    position = store.get_position(symbol)
-    open_positions = 1 if position else 0
-    engine = ExecutionEngine(ccxt_client, store, cfg, log_path=log_path)
-    ttl_ms = cfg.order.timeout_bars * timeframe_to_seconds(timeframe) * 1000
-    engine.expire_orders(symbol, ttl_ms, now_ms=now_ms)
-
-    guard = RiskGuard(cfg)
-    market = getattr(ccxt_client, "markets", {}).get(symbol, {})
-    constraints = _market_constraints(market)
-    symbol_meta = engine.get_symbol_meta(symbol)
-    funding_annualized = None
-    fetch_funding = getattr(ccxt_client, "fetch_funding_rate", None)
-    if callable(fetch_funding):
-        try:
-            data = fetch_funding(symbol)  # pragma: no cover - network
-            rate = float(data.get("fundingRate", 0.0))
-            funding_annualized = estimate_annualized_funding(rate)
-        except Exception as exc:  # pragma: no cover
-            LOGGER.debug("fetch_funding_rate failed: %s", exc)
-    notify_threshold = getattr(notifier, "max_failures_allowed", 3)
-    available_quote = nav
-    balance_fetch = getattr(ccxt_client, "fetch_balance", None)
-    if callable(balance_fetch):
-        try:
-            balance = balance_fetch()
-            quote_ccy = _quote_currency(symbol)
-            free_balances = balance.get("free", {}) if isinstance(balance, dict) else {}
-            total_balances = balance.get("total", {}) if isinstance(balance, dict) else {}
-            available_quote = (
-                free_balances.get(quote_ccy)
-                or total_balances.get(quote_ccy)
-                or available_quote
-            )
-        except Exception as exc:  # pragma: no cover - balance fetch best effort
-            LOGGER.debug("fetch_balance failed: %s", exc)
-
-    qty, freeze_reason = guard.guard_signal(
-        nav,
-        last.close,
-        signal["stop_px"],
-        constraints,
-        daily_pnl_pct,
-        funding_annualized=funding_annualized,
-        notify_fail_streak=notifier.failure_streak,
-        notify_threshold=notify_threshold,
-        symbol_meta=symbol_meta,
-        side=signal["side"],
-        available_quote=available_quote,
-        leverage=cfg.leverage,
-        open_positions=open_positions,
-    )
+    with profiler.stage("risk"):
+        position = store.get_position(symbol)
+        # A parent still being worked by an algo holds the slot like a position.
+        working = store.list_algo_orders(symbol, status="active")
+        open_positions = 1 if position or working else 0
+        if engine is None:
+            engine = ExecutionEngine(ccxt_client, store, cfg, log_path=log_path)
+        ttl_ms = cfg.order.timeout_bars * timeframe_to_seconds(timeframe) * 1000
+        engine.expire_orders(symbol, ttl_ms, now_ms=now_ms)
+
+        guard = RiskGuard(cfg)
+        market = context.market or getattr(ccxt_client, "markets", {}).get(symbol, {})
+        constraints = _market_constraints(market)
+        symbol_meta = engine.get_symbol_meta(symbol)
+        funding_annualized = context.funding_annualized
+        notify_threshold = getattr(notifier, "max_failures_allowed", 3)
+        available_quote = nav
+        if context.balance is not None:
+            available_quote = _available_quote(context.balance, symbol, available_quote)
+
+        qty, freeze_reason = guard.guard_signal(
+            nav,
+            last.close,
+            signal["stop_px"],
+            constraints,
+            daily_pnl_pct,
+            funding_annualized=funding_annualized,
+            notify_fail_streak=notifier.failure_streak,
+            notify_threshold=notify_threshold,
+            symbol_meta=symbol_meta,
+            side=signal["side"],
+            available_quote=available_quote,
+            leverage=cfg.leverage,
+            open_positions=open_positions,
+        )
     if qty is None:
         jlog(
             log_path,
@@ -244,20 +448,38 @@ def run_once(
             return {"status": "max_position"}
         return {"status": "risk_blocked", "reason": freeze_reason}
 
-    order_ids = engine.submit_ladder(
-        symbol,
-        signal["side"],
-        last.close,
-        qty,
-        stop_px=signal.get("stop_px"),
-        tp_px=signal.get("tp_px"),
-    )
+    if deadline is not None and not deadline.allows():
+        LOGGER.warning("Submitting orders %.0f ms past the cycle budget", -deadline.remaining_ms())
+    with profiler.stage("submission"):
+        if cfg.order.algo and qty * last.close >= cfg.order.algo_min_notional:
+            algo_id = engine.start_algo(
+                symbol,
+                signal["side"],
+                last.close,
+                qty,
+                stop_px=signal.get("stop_px"),
+                tp_px=signal.get("tp_px"),
+            )
+            order_ids = [child.oid for child in store.list_algo_children(algo_id)]
+        else:
+            order_ids = engine.submit_ladder(
+                symbol,
+                signal["side"],
+                last.close,
+                qty,
+                stop_px=signal.get("stop_px"),
+                tp_px=signal.get("tp_px"),
+                decided_at=decided_at,
+            )
+    submitted_ms = _utc_now_ms()
 
-    if _can_notify(notifier):
-        notifier.send_message(
-            f"Signal: {signal['side']} qty={qty:.6f} price={last.close:.2f} orders={len(order_ids)}"
-        )
+    _notify(
+        notifier,
+        deadline,
+        f"Signal: {signal['side']} qty={qty:.6f} price={last.close:.2f} orders={len(order_ids)}",
+    )
 
+    cache = getattr(inferer, "cache", None)
     jlog(
         log_path,
         "cycle",
@@ -273,15 +495,78 @@ def run_once(
         order_ids=order_ids,
         freeze=guard.is_frozen(),
         regime_reason=regime_reason,
+        model_cache=cache.stats() if cache is not None else None,
     )
 
-    return {"status": "ok", "orders": order_ids, "signal": signal}
+    return {"status": "ok", "orders": order_ids, "signal": signal, "submitted_ms": submitted_ms}
 
 
-def main() -> dict:
-    cfg = load_config()
+def _prefetch(
+    client: Any, store: StateStore, cfg: TradingConfig, deadline: Optional[CycleDeadline]
+) -> CycleContext:
+    """Prefetch within *deadline*, falling back to cached inputs when one is set."""
+
+    if deadline is None:
+        return prefetch_cycle(client, store, cfg)
+    return prefetch_cycle(
+        client,
+        store,
+        cfg,
+        deadline=deadline,
+        cache=InputCache.for_store(store),
+        max_stale_s=cfg.deadline.max_stale_s,
+    )
+
+
+def build_client(trading_cfg: TradingConfig):
+    """Instantiate the ccxt client, wrapped by the shared rate limiter if enabled."""
+
+    # Placeholder ccxt client for main entry point.
+    try:
+        import ccxt  # type: ignore
+
+        client = getattr(ccxt, trading_cfg.venue.name)({"enableRateLimit": True})
+    except Exception as exc:  # pragma: no cover - environment dependent
+        LOGGER.error("Unable to instantiate ccxt client: %s", exc)
+        raise
+    rate_cfg = trading_cfg.rate_limit
+    if rate_cfg.enabled:
+        limiter = RateLimiter(
+            rate_cfg.path,
+            name=trading_cfg.venue.name,
+            capacity=rate_cfg.capacity,
+            refill_per_s=rate_cfg.refill_per_s,
+            reserve_pct=rate_cfg.reserve_pct,
+        )
+        client = ScheduledClient(client, limiter)
+    return client
+
+
+@dataclass
+class CycleRuntime:
+    """Long-lived cycle dependencies, built once per process."""
+
+    client: Any
+    inferer: Any
+    notifier: TelegramNotifier
+    shadow: Optional[ShadowScorer] = None
+    online: Optional[OnlineLearner] = None
+    drift: Optional[DriftMonitor] = None
+    engine: Optional[ExecutionEngine] = None
+
+    def close(self) -> None:
+        if self.shadow is not None:
+            self.shadow.close()
+
+
+def build_runtime(cfg: Config) -> CycleRuntime:
     try:
-        model = ModelInferer()
+        model_cfg = cfg.trading.model
+        model = ModelInferer(
+            default_model_path(model_cfg.registry),
+            cache_size=model_cfg.cache_size,
+            cache_ttl_s=model_cfg.cache_ttl_s or None,
+        )
     except Exception as exc:  # pragma: no cover - allows rule-only mode
         LOGGER.warning("Model unavailable, running in rule-only mode: %s", exc)
 
@@ -296,25 +581,80 @@ def main() -> dict:
         chat_id=None,
         max_failures=cfg.monitoring.telegram.fail_freeze_threshold,
     )
-    db_path = Path("data/mini.db")
 
-    # Placeholder ccxt client for main entry point.
+    # Outermost, so the engine's calls are counted by the cycle profiler too.
+    client = counting(build_client(trading_cfg))
+    shadow = None
+    shadow_versions = parse_versions(trading_cfg.model.shadow_versions)
+    if shadow_versions:
+        shadow = ShadowScorer.from_registry(
+            trading_cfg.model.registry, shadow_versions, workers=trading_cfg.model.shadow_workers
+        )
+
+    online = learner_from_config(
+        trading_cfg, getattr(model, "model", None), getattr(model, "model_path", None)
+    )
+    drift = None
+    if trading_cfg.drift.enabled and getattr(model, "model_path", None) is not None:
+        drift = DriftMonitor.for_model(
+            model.model_path, trading_cfg.drift.state_path, window=trading_cfg.drift.window
+        )
+    return CycleRuntime(client, model, notifier, shadow=shadow, online=online, drift=drift)
+
+
+def run_runtime_cycle(runtime: CycleRuntime, store: StateStore, cfg: TradingConfig) -> dict:
+    """One cycle on warm dependencies: ``run_once`` (NAV from its prefetch), shadow flush.
+
+    With more than one symbol in ``trading.symbols`` the portfolio cycle runs
+    instead; it does not feed the shadow, online or drift components, which
+    track a single symbol's stream.
+    """
+
+    from bot.portfolio import parse_symbols, run_portfolio
+
+    client = runtime.client
+    symbols = parse_symbols(cfg)
+    if len(symbols) > 1:
+        # NAV comes from the portfolio cycle's single balance read.
+        return run_portfolio(
+            client, store, cfg, runtime.inferer, runtime.notifier, None, None, symbols, runtime.engine
+        )
+    deadline = CycleDeadline.from_config(cfg.deadline) if cfg.deadline.enabled else None
     try:
-        import ccxt  # type: ignore
+        # NAV comes from the balance fetched in run_once's ingest stage.
+        return run_once(
+            client,
+            store,
+            cfg,
+            runtime.inferer,
+            runtime.notifier,
+            None,
+            shadow=runtime.shadow,
+            online=runtime.online,
+            drift=runtime.drift,
+            engine=runtime.engine,
+            deadline=deadline,
+        )
+    finally:
+        if runtime.shadow is not None:
+            timeout = cfg.model.shadow_timeout_s
+            if deadline is not None:
+                # Unfinished challenger scores are picked up by the next cycle.
+                timeout = min(timeout, deadline.remaining_s())
+            runtime.shadow.collect(store, timeout=timeout)
+        if deadline is not None:
+            deadline.flush(runtime.notifier)
 
-        client = getattr(ccxt, trading_cfg.venue.name)({"enableRateLimit": True})
-    except Exception as exc:  # pragma: no cover - environment dependent
-        LOGGER.error("Unable to instantiate ccxt client: %s", exc)
-        raise
 
+def main() -> dict:
+    cfg = load_config()
+    runtime = build_runtime(cfg)
+    db_path = Path("data/mini.db")
     with StateStore(db_path) as store:
-        quote_ccy = _quote_currency(trading_cfg.symbol)
-        balance = getattr(client, "fetch_balance", lambda: {"total": {quote_ccy: 0}})()
-        nav = balance.get("total", {}).get(quote_ccy, 0.0)
-        now_ms = _utc_now_ms()
-        open_nav = _ensure_daily_nav_snapshot(store, nav, now_ms)
-        daily_pnl_pct = _compute_daily_pnl_pct(open_nav, nav)
-        return run_once(client, store, trading_cfg, model, notifier, nav, daily_pnl_pct)
+        try:
+            return run_runtime_cycle(runtime, store, cfg.trading)
+        finally:
+            runtime.close()
 
 
 if __name__ == "__main__":  # pragma: no cover
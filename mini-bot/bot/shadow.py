@@ -0,0 +1,99 @@
+"""Shadow (champion/challenger) scoring of registry models off the decision path."""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from bot.model_infer import ModelInferer
+from bot.model_registry import ModelRegistry
+from bot.state_store import ShadowScore, StateStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+def parse_versions(spec: str) -> List[str]:
+    return [v.strip() for v in (spec or "").split(",") if v.strip()]
+
+
+class ShadowScorer:
+    """Score challenger models on the live feature row in a worker pool.
+
+    :meth:`submit` only enqueues work, so it adds no model latency to the
+    trading decision; :meth:`collect` writes finished scores (together with
+    the live model's probability) into ``shadow_scores`` from the caller's
+    thread, which owns the SQLite connection.
+    """
+
+    def __init__(self, models: Mapping[str, ModelInferer], workers: int = 2) -> None:
+        self.models = dict(models)
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="shadow")
+        self._pending: List[Tuple[int, str, str, Future]] = []
+        self._ready: List[ShadowScore] = []
+
+    @classmethod
+    def from_registry(
+        cls, root: Path | str, versions: Sequence[str], workers: int = 2
+    ) -> "ShadowScorer":
+        registry = ModelRegistry(root)
+        models: Dict[str, ModelInferer] = {}
+        for version in versions:
+            try:
+                registry.verify(version)
+                models[version] = ModelInferer(registry.path_for(version))
+            except Exception as exc:
+                LOGGER.warning("Skipping shadow model %s: %s", version, exc)
+        return cls(models, workers)
+
+    @staticmethod
+    def _score(model: ModelInferer, row: Mapping[str, float]) -> Optional[float]:
+        proba = model.predict_proba(row)
+        return None if proba is None else float(proba["buy"])
+
+    def submit(
+        self,
+        ts: int,
+        symbol: str,
+        feature_row: Mapping[str, float],
+        live_version: Optional[str] = None,
+        live_p_buy: Optional[float] = None,
+    ) -> int:
+        row = dict(feature_row)
+        if live_version and live_p_buy is not None:
+            self._ready.append(ShadowScore(ts, symbol, live_version, float(live_p_buy), live=True))
+        for version, model in self.models.items():
+            if version == live_version:
+                continue
+            self._pending.append((ts, symbol, version, self._pool.submit(self._score, model, row)))
+        return len(self._pending)
+
+    def collect(self, store: StateStore, timeout: Optional[float] = 0.0) -> int:
+        """Persist finished scores, waiting up to *timeout* seconds for the rest."""
+
+        if self._pending and timeout:
+            wait([item[3] for item in self._pending], timeout=timeout)
+        still_pending = []
+        rows = self._ready
+        self._ready = []
+        for ts, symbol, version, future in self._pending:
+            if not future.done():
+                still_pending.append((ts, symbol, version, future))
+                continue
+            try:
+                p_buy = future.result()
+            except Exception as exc:
+                LOGGER.warning("Shadow model %s failed: %s", version, exc)
+                continue
+            if p_buy is not None:
+                rows.append(ShadowScore(ts, symbol, version, p_buy))
+        self._pending = still_pending
+        if rows:
+            store.record_shadow_scores(rows)
+        return len(rows)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ["ShadowScorer", "parse_versions"]
@@ -4,7 +4,7 @@ from __future__ import annotations
 import sqlite3
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 DB_PRAGMAS = (
     "PRAGMA journal_mode=WAL;",
@@ -12,6 +12,12 @@ DB_PRAGMAS = (
     "PRAGMA busy_timeout=5000;",
 )
 
+# Columns added after a table was first shipped: (table, column, declaration).
+ADDED_COLUMNS = (
+    ("orders", "stop_loss", "REAL"),
+    ("orders", "take_profit", "REAL"),
+)
+
 SCHEMA_STATEMENTS = (
     """
     CREATE TABLE IF NOT EXISTS candles(
@@ -34,7 +40,9 @@ SCHEMA_STATEMENTS = (
       client_order_id TEXT,
       maker INTEGER DEFAULT 1,
       fee REAL DEFAULT 0,
-      reject_reason TEXT
+      reject_reason TEXT,
+      stop_loss REAL,
+      take_profit REAL
     );
     """,
     "CREATE INDEX IF NOT EXISTS idx_orders_coid ON orders(client_order_id);",
@@ -64,6 +72,117 @@ SCHEMA_STATEMENTS = (
     """,
     "CREATE INDEX IF NOT EXISTS idx_ledger_ts ON ledger(ts);",
     """
+    CREATE TABLE IF NOT EXISTS account_settings(
+      symbol TEXT PRIMARY KEY,
+      margin_mode TEXT,
+      leverage REAL,
+      ts_checked INTEGER
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS algo_orders(
+      algo_id TEXT PRIMARY KEY,
+      symbol TEXT,
+      side TEXT CHECK(side IN ('buy','sell')),
+      algo TEXT,
+      total_qty REAL,
+      filled_qty REAL DEFAULT 0,
+      limit_px REAL,
+      stop_px REAL,
+      tp_px REAL,
+      status TEXT,
+      slices_sent INTEGER DEFAULT 0,
+      ts_created INTEGER,
+      ts_next INTEGER,
+      params TEXT
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS algo_children(
+      algo_id TEXT,
+      seq INTEGER,
+      oid TEXT,
+      qty REAL,
+      px REAL,
+      filled REAL DEFAULT 0,
+      status TEXT,
+      ts_created INTEGER,
+      PRIMARY KEY(algo_id, seq)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tca_orders(
+      oid TEXT PRIMARY KEY,
+      symbol TEXT,
+      venue TEXT,
+      side TEXT,
+      level INTEGER,
+      qty REAL,
+      arrival_px REAL,
+      ts_submit INTEGER
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS fills(
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      oid TEXT,
+      ts INTEGER,
+      qty REAL,
+      px REAL,
+      maker INTEGER,
+      fee REAL DEFAULT 0
+    );
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_fills_oid ON fills(oid);",
+    """
+    CREATE TABLE IF NOT EXISTS fill_offsets(
+      oid TEXT PRIMARY KEY,
+      qty REAL,
+      fee REAL
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tca_stats(
+      symbol TEXT,
+      venue TEXT,
+      level INTEGER,
+      n_orders INTEGER DEFAULT 0,
+      qty_submitted REAL DEFAULT 0,
+      n_fills INTEGER DEFAULT 0,
+      qty_filled REAL DEFAULT 0,
+      maker_qty REAL DEFAULT 0,
+      slip_bp_qty REAL DEFAULT 0,
+      ttf_ms_qty REAL DEFAULT 0,
+      fees REAL DEFAULT 0,
+      PRIMARY KEY(symbol, venue, level)
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tca_cursor(
+      name TEXT PRIMARY KEY,
+      last_id INTEGER
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS shadow_scores(
+      ts INTEGER,
+      symbol TEXT,
+      version TEXT,
+      p_buy REAL,
+      live INTEGER DEFAULT 0,
+      PRIMARY KEY(symbol, version, ts)
+    ) WITHOUT ROWID;
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS latency_hist(
+      venue TEXT,
+      endpoint TEXT,
+      bucket INTEGER,
+      count INTEGER,
+      PRIMARY KEY(venue, endpoint, bucket)
+    );
+    """,
+    """
     CREATE TABLE IF NOT EXISTS nav_daily(
       ts INTEGER PRIMARY KEY,
       nav REAL,
@@ -102,6 +221,9 @@ class Order:
     maker: bool = True
     fee: float = 0.0
     reject_reason: str | None = None
+    # Venue-native bracket legs attached to the entry, re-sent when it is repriced.
+    stop_loss: float | None = None
+    take_profit: float | None = None
 
 
 @dataclass
@@ -128,6 +250,63 @@ class LedgerEntry:
     meta: Optional[str] = None
 
 
+@dataclass
+class AccountSettings:
+    symbol: str
+    margin_mode: str
+    leverage: float
+    ts_checked: int
+
+
+@dataclass
+class AlgoOrder:
+    algo_id: str
+    symbol: str
+    side: str
+    algo: str
+    total_qty: float
+    limit_px: float
+    status: str
+    ts_created: int
+    ts_next: int
+    filled_qty: float = 0.0
+    stop_px: float | None = None
+    tp_px: float | None = None
+    slices_sent: int = 0
+    params: str = "{}"
+
+
+@dataclass
+class AlgoChild:
+    algo_id: str
+    seq: int
+    oid: str
+    qty: float
+    px: float
+    status: str
+    ts_created: int
+    filled: float = 0.0
+
+
+@dataclass
+class Fill:
+    oid: str
+    ts: int
+    qty: float
+    px: float
+    maker: bool
+    fee: float = 0.0
+
+
+@dataclass
+class ShadowScore:
+    ts: int
+    symbol: str
+    version: str
+    p_buy: float
+    live: bool = False
+
+
 @dataclass
 class DailyNav:
     ts: int
@@ -155,6 +334,10 @@ class StateStore:
             self._conn.execute(pragma)
         for stmt in SCHEMA_STATEMENTS:
             self._conn.executescript(stmt)
+        for table, column, decl in ADDED_COLUMNS:
+            columns = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
         self._conn.commit()
         return self
 
@@ -196,14 +379,15 @@ class StateStore:
     def upsert_order(self, order: Order) -> None:
         sql = (
             "INSERT INTO orders(oid, symbol, side, qty, px, status, ts_created, ts_updated, post_only, "
-            "client_order_id, maker, fee, reject_reason) "
+            "client_order_id, maker, fee, reject_reason, stop_loss, take_profit) "
             "VALUES (:oid, :symbol, :side, :qty, :px, :status, :ts_created, :ts_updated, :post_only, "
-            ":client_order_id, :maker, :fee, :reject_reason) "
+            ":client_order_id, :maker, :fee, :reject_reason, :stop_loss, :take_profit) "
             "ON CONFLICT(oid) DO UPDATE SET "
             "symbol=excluded.symbol, side=excluded.side, qty=excluded.qty, px=excluded.px, "
             "status=excluded.status, ts_updated=excluded.ts_updated, "
             "post_only=excluded.post_only, client_order_id=excluded.client_order_id, "
-            "maker=excluded.maker, fee=excluded.fee, reject_reason=excluded.reject_reason"
+            "maker=excluded.maker, fee=excluded.fee, reject_reason=excluded.reject_reason, "
+            "stop_loss=excluded.stop_loss, take_profit=excluded.take_profit"
         )
         payload = order.__dict__.copy()
         payload["post_only"] = int(order.post_only)
@@ -295,6 +479,15 @@ class StateStore:
         data["reduce_only"] = bool(data["reduce_only"])
         return Position(**data)
 
+    def list_positions(self) -> List[Position]:
+        cur = self.conn.execute("SELECT * FROM positions ORDER BY symbol")
+        positions = []
+        for row in cur.fetchall():
+            data = dict(row)
+            data["reduce_only"] = bool(data["reduce_only"])
+            positions.append(Position(**data))
+        return positions
+
     def clear_position(self, symbol: str) -> None:
         self.conn.execute("DELETE FROM positions WHERE symbol=?", (symbol,))
         self._commit()
@@ -312,6 +505,280 @@ class StateStore:
             cur = self.conn.execute("SELECT * FROM ledger ORDER BY ts DESC")
         return [LedgerEntry(**dict(row)) for row in cur.fetchall()]
 
+    # Account settings helpers
+    def upsert_account_settings(self, settings: AccountSettings) -> None:
+        sql = (
+            "INSERT INTO account_settings(symbol, margin_mode, leverage, ts_checked) "
+            "VALUES (:symbol, :margin_mode, :leverage, :ts_checked) "
+            "ON CONFLICT(symbol) DO UPDATE SET "
+            "margin_mode=excluded.margin_mode, leverage=excluded.leverage, "
+            "ts_checked=excluded.ts_checked"
+        )
+        self.conn.execute(sql, settings.__dict__)
+        self._commit()
+
+    def get_account_settings(self, symbol: str) -> Optional[AccountSettings]:
+        cur = self.conn.execute("SELECT * FROM account_settings WHERE symbol=?", (symbol,))
+        row = cur.fetchone()
+        return AccountSettings(**dict(row)) if row else None
+
+    # Execution algorithm helpers
+    def upsert_algo_order(self, algo: AlgoOrder) -> None:
+        sql = (
+            "INSERT INTO algo_orders(algo_id, symbol, side, algo, total_qty, filled_qty, limit_px, "
+            "stop_px, tp_px, status, slices_sent, ts_created, ts_next, params) "
+            "VALUES (:algo_id, :symbol, :side, :algo, :total_qty, :filled_qty, :limit_px, "
+            ":stop_px, :tp_px, :status, :slices_sent, :ts_created, :ts_next, :params) "
+            "ON CONFLICT(algo_id) DO UPDATE SET "
+            "filled_qty=excluded.filled_qty, status=excluded.status, "
+            "slices_sent=excluded.slices_sent, ts_next=excluded.ts_next, params=excluded.params"
+        )
+        self.conn.execute(sql, algo.__dict__)
+        self._commit()
+
+    def get_algo_order(self, algo_id: str) -> Optional[AlgoOrder]:
+        cur = self.conn.execute("SELECT * FROM algo_orders WHERE algo_id=?", (algo_id,))
+        row = cur.fetchone()
+        return AlgoOrder(**dict(row)) if row else None
+
+    def list_algo_orders(
+        self, symbol: Optional[str] = None, status: Optional[str] = None
+    ) -> List[AlgoOrder]:
+        query = "SELECT * FROM algo_orders"
+        conditions: list[str] = []
+        params: list[object] = []
+        if symbol:
+            conditions.append("symbol=?")
+            params.append(symbol)
+        if status:
+            conditions.append("status=?")
+            params.append(status)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        cur = self.conn.execute(query + " ORDER BY ts_created", params)
+        return [AlgoOrder(**dict(row)) for row in cur.fetchall()]
+
+    def upsert_algo_child(self, child: AlgoChild) -> None:
+        sql = (
+            "INSERT INTO algo_children(algo_id, seq, oid, qty, px, filled, status, ts_created) "
+            "VALUES (:algo_id, :seq, :oid, :qty, :px, :filled, :status, :ts_created) "
+            "ON CONFLICT(algo_id, seq) DO UPDATE SET "
+            "oid=excluded.oid, qty=excluded.qty, px=excluded.px, filled=excluded.filled, "
+            "status=excluded.status"
+        )
+        self.conn.execute(sql, child.__dict__)
+        self._commit()
+
+    def list_algo_children(self, algo_id: str) -> List[AlgoChild]:
+        cur = self.conn.execute(
+            "SELECT * FROM algo_children WHERE algo_id=? ORDER BY seq", (algo_id,)
+        )
+        return [AlgoChild(**dict(row)) for row in cur.fetchall()]
+
+    # Transaction-cost helpers
+    def record_tca_order(
+        self,
+        oid: str,
+        symbol: str,
+        venue: str,
+        side: str,
+        level: int,
+        qty: float,
+        arrival_px: float,
+        ts_submit: int,
+    ) -> None:
+        self.conn.execute(
+            "INSERT OR IGNORE INTO tca_orders(oid, symbol, venue, side, level, qty, arrival_px, ts_submit) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (oid, symbol, venue, side, level, qty, arrival_px, ts_submit),
+        )
+        self._commit()
+
+    def remap_tca_order(self, old_oid: str, new_oid: str) -> None:
+        """Attribute *old_oid*'s submission and fills to its replacement *new_oid*.
+
+        The moved fills are remembered as an offset for *new_oid*, whose venue
+        fill counter starts again from zero.
+        """
+
+        moved_qty, moved_fee = self.conn.execute(
+            "SELECT COALESCE(SUM(qty), 0), COALESCE(SUM(fee), 0) FROM fills WHERE oid=?", (old_oid,)
+        ).fetchone()
+        self.conn.execute("UPDATE tca_orders SET oid=? WHERE oid=?", (new_oid, old_oid))
+        self.conn.execute("UPDATE fills SET oid=? WHERE oid=?", (new_oid, old_oid))
+        self.conn.execute("DELETE FROM fill_offsets WHERE oid=?", (old_oid,))
+        if moved_qty or moved_fee:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO fill_offsets(oid, qty, fee) VALUES (?, ?, ?)",
+                (new_oid, moved_qty, moved_fee),
+            )
+        self._commit()
+
+    def delete_tca_order(self, oid: str) -> None:
+        """Drop a submission that never reached the venue."""
+
+        self.conn.execute("DELETE FROM tca_orders WHERE oid=?", (oid,))
+        self._commit()
+
+    def get_fill_offset(self, oid: str) -> Tuple[float, float]:
+        """``(qty, fee)`` stored under *oid* that belongs to the orders it replaced."""
+
+        row = self.conn.execute("SELECT qty, fee FROM fill_offsets WHERE oid=?", (oid,)).fetchone()
+        return (float(row["qty"]), float(row["fee"])) if row else (0.0, 0.0)
+
+    def record_fill(self, fill: Fill) -> None:
+        payload = fill.__dict__.copy()
+        payload["maker"] = int(fill.maker)
+        self.conn.execute(
+            "INSERT INTO fills(oid, ts, qty, px, maker, fee) VALUES (:oid, :ts, :qty, :px, :maker, :fee)",
+            payload,
+        )
+        self._commit()
+
+    def list_fills(self, oid: Optional[str] = None) -> List[Fill]:
+        if oid:
+            cur = self.conn.execute("SELECT * FROM fills WHERE oid=? ORDER BY id", (oid,))
+        else:
+            cur = self.conn.execute("SELECT * FROM fills ORDER BY id")
+        rows = []
+        for row in cur.fetchall():
+            data = dict(row)
+            data.pop("id")
+            data["maker"] = bool(data["maker"])
+            rows.append(Fill(**data))
+        return rows
+
+    def refresh_tca_stats(self) -> int:
+        """Fold submissions and fills recorded since the last call into ``tca_stats``.
+
+        Returns the number of new fills aggregated.
+        """
+
+        cursors = {
+            row["name"]: row["last_id"]
+            for row in self.conn.execute("SELECT name, last_id FROM tca_cursor").fetchall()
+        }
+        last_order = cursors.get("orders", 0)
+        last_fill = cursors.get("fills", 0)
+        max_order = self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM tca_orders").fetchone()[0]
+        max_fill = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM fills").fetchone()[0]
+        upsert = (
+            " ON CONFLICT(symbol, venue, level) DO UPDATE SET "
+            "n_orders=n_orders + excluded.n_orders, "
+            "qty_submitted=qty_submitted + excluded.qty_submitted, "
+            "n_fills=n_fills + excluded.n_fills, "
+            "qty_filled=qty_filled + excluded.qty_filled, "
+            "maker_qty=maker_qty + excluded.maker_qty, "
+            "slip_bp_qty=slip_bp_qty + excluded.slip_bp_qty, "
+            "ttf_ms_qty=ttf_ms_qty + excluded.ttf_ms_qty, "
+            "fees=fees + excluded.fees"
+        )
+        self.conn.execute(
+            "INSERT INTO tca_stats(symbol, venue, level, n_orders, qty_submitted) "
+            "SELECT symbol, venue, level, COUNT(*), SUM(qty) FROM tca_orders "
+            "WHERE rowid > ? AND rowid <= ? GROUP BY symbol, venue, level" + upsert,
+            (last_order, max_order),
+        )
+        # Slippage is signed so positive basis points are a cost for either side.
+        self.conn.execute(
+            "INSERT INTO tca_stats(symbol, venue, level, n_fills, qty_filled, maker_qty, "
+            "slip_bp_qty, ttf_ms_qty, fees) "
+            "SELECT o.symbol, o.venue, o.level, COUNT(*), SUM(f.qty), "
+            "SUM(CASE WHEN f.maker THEN f.qty ELSE 0 END), "
+            "SUM(f.qty * (CASE WHEN o.side = 'buy' THEN 1 ELSE -1 END) "
+            "* (f.px - o.arrival_px) / o.arrival_px * 10000.0), "
+            "SUM(f.qty * MAX(f.ts - o.ts_submit, 0)), SUM(f.fee) "
+            "FROM fills f JOIN tca_orders o ON o.oid = f.oid "
+            "WHERE f.id > ? AND f.id <= ? AND o.arrival_px > 0 "
+            "GROUP BY o.symbol, o.venue, o.level" + upsert,
+            (last_fill, max_fill),
+        )
+        self.conn.executemany(
+            "INSERT INTO tca_cursor(name, last_id) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET last_id=excluded.last_id",
+            [("orders", max_order), ("fills", max_fill)],
+        )
+        self._commit()
+        return int(max_fill - last_fill)
+
+    def list_tca_stats(
+        self, symbol: Optional[str] = None, venue: Optional[str] = None
+    ) -> List[Dict[str, object]]:
+        query = "SELECT * FROM tca_stats"
+        clauses: list[str] = []
+        params: list[object] = []
+        if symbol:
+            clauses.append("symbol=?")
+            params.append(symbol)
+        if venue:
+            clauses.append("venue=?")
+            params.append(venue)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY symbol, venue, level"
+        return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+
+    # Shadow scoring helpers
+    def record_shadow_scores(self, rows: Iterable[ShadowScore]) -> None:
+        sql = (
+            "INSERT INTO shadow_scores(ts, symbol, version, p_buy, live) "
+            "VALUES (:ts, :symbol, :version, :p_buy, :live) "
+            "ON CONFLICT(symbol, version, ts) DO UPDATE SET p_buy=excluded.p_buy, live=excluded.live"
+        )
+        payload = []
+        for row in rows:
+            data = row.__dict__.copy()
+            data["live"] = int(row.live)
+            payload.append(data)
+        self.conn.executemany(sql, payload)
+        self._commit()
+
+    def list_shadow_scores(
+        self, symbol: Optional[str] = None, version: Optional[str] = None
+    ) -> List[ShadowScore]:
+        query = "SELECT ts, symbol, version, p_buy, live FROM shadow_scores"
+        clauses: list[str] = []
+        params: list[object] = []
+        if symbol:
+            clauses.append("symbol=?")
+            params.append(symbol)
+        if version:
+            clauses.append("version=?")
+            params.append(version)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY symbol, version, ts"
+        rows = []
+        for row in self.conn.execute(query, params).fetchall():
+            data = dict(row)
+            data["live"] = bool(data["live"])
+            rows.append(ShadowScore(**data))
+        return rows
+
+    # Latency histogram helpers
+    def add_latency_counts(self, venue: str, endpoint: str, counts: Dict[int, int]) -> None:
+        sql = (
+            "INSERT INTO latency_hist(venue, endpoint, bucket, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(venue, endpoint, bucket) DO UPDATE SET count=count + excluded.count"
+        )
+        self.conn.executemany(
+            sql, [(venue, endpoint, int(bucket), int(n)) for bucket, n in counts.items()]
+        )
+        self._commit()
+
+    def get_latency_histograms(
+        self, venue: Optional[str] = None
+    ) -> Dict[Tuple[str, str], Dict[int, int]]:
+        query = "SELECT venue, endpoint, bucket, count FROM latency_hist"
+        params: list[object] = []
+        if venue:
+            query += " WHERE venue=?"
+            params.append(venue)
+        hists: Dict[Tuple[str, str], Dict[int, int]] = {}
+        for row in self.conn.execute(query, params).fetchall():
+            hists.setdefault((row["venue"], row["endpoint"]), {})[row["bucket"]] = row["count"]
+        return hists
+
     # Daily NAV helpers
     def upsert_daily_nav(self, nav: DailyNav) -> None:
         sql = (
@@ -331,10 +798,15 @@ class StateStore:
 
 
 __all__ = [
+    "AccountSettings",
+    "AlgoChild",
+    "AlgoOrder",
     "Candle",
     "DailyNav",
+    "Fill",
     "LedgerEntry",
     "Order",
     "Position",
+    "ShadowScore",
     "StateStore",
 ]
@@ -0,0 +1,400 @@
+"""Offline training: triple-barrier labels, cached design matrices, model fitting."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import time
+from array import array
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from bot.calibration import CalibrationTable, fit_isotonic
+from bot.drift import FeatureProfile, build_profile
+from bot.feature_engine import FeatureRow, compute_features
+from bot.model_infer import LoadedModel
+from bot.model_registry import ModelRegistry
+from bot.state_store import Candle
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FEATURES = ("atr", "adx", "ret", "vol")
+CACHE_FORMAT = 1
+
+
+@dataclass(frozen=True)
+class LabelConfig:
+    horizon_bars: int = 2
+    k_tp: float = 3.5
+    k_sl: float = 2.5
+    use_close: bool = True
+
+
+@dataclass
+class DesignMatrix:
+    """Row-major features with binary labels, ordered by ``ts``."""
+
+    feature_names: List[str]
+    rows: List[List[float]]
+    labels: List[int]
+    ts: List[int]
+    key: str = ""
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def between(self, start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> "DesignMatrix":
+        """Rows with ``start_ts <= ts < end_ts`` (e.g. one WFO fold)."""
+
+        keep = [
+            i
+            for i, t in enumerate(self.ts)
+            if (start_ts is None or t >= start_ts) and (end_ts is None or t < end_ts)
+        ]
+        return DesignMatrix(
+            list(self.feature_names),
+            [self.rows[i] for i in keep],
+            [self.labels[i] for i in keep],
+            [self.ts[i] for i in keep],
+            self.key,
+        )
+
+
+@dataclass
+class TrainResult:
+    model: Any
+    calibration: Optional[CalibrationTable]
+    metrics: Dict[str, float] = field(default_factory=dict)
+    profile: Optional[FeatureProfile] = None
+
+
+# ---------------------------------------------------------------------------
+# Labels and design matrices
+# ---------------------------------------------------------------------------
+def triple_barrier_labels(rows: Sequence[FeatureRow], cfg: LabelConfig) -> List[Optional[int]]:
+    """1 when the take-profit barrier is touched first, 0 for stop-loss.
+
+    Barriers sit ``k_tp``/``k_sl`` ATRs from the entry close. If neither is hit
+    within ``horizon_bars`` the sign of the return at the vertical barrier
+    decides. With ``use_close=False`` intrabar highs/lows are used and a bar
+    touching both barriers counts as a stop. Rows whose horizon extends past
+    the data are ``None``.
+    """
+
+    labels: List[Optional[int]] = []
+    n = len(rows)
+    for i, row in enumerate(rows):
+        if i + cfg.horizon_bars >= n or not row.atr:
+            labels.append(None)
+            continue
+        upper = row.close + cfg.k_tp * row.atr
+        lower = row.close - cfg.k_sl * row.atr
+        label: Optional[int] = None
+        for j in range(i + 1, i + cfg.horizon_bars + 1):
+            hi = rows[j].close if cfg.use_close else rows[j].high
+            lo = rows[j].close if cfg.use_close else rows[j].low
+            if lo <= lower:
+                label = 0
+                break
+            if hi >= upper:
+                label = 1
+                break
+        if label is None:
+            label = 1 if rows[i + cfg.horizon_bars].close > row.close else 0
+        labels.append(label)
+    return labels
+
+
+def design_matrix_key(
+    candles: Sequence[Candle],
+    feature_names: Sequence[str],
+    atr_window: int,
+    label_cfg: LabelConfig,
+) -> str:
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps(
+            {
+                "format": CACHE_FORMAT,
+                "features": list(feature_names),
+                "atr_window": atr_window,
+                "labels": asdict(label_cfg),
+            },
+            sort_keys=True,
+        ).encode("utf8")
+    )
+    pack = struct.Struct("<q5d").pack
+    for c in sorted(candles, key=lambda c: c.ts_close):
+        digest.update(c.symbol.encode("utf8"))
+        digest.update(pack(c.ts_close, c.o, c.h, c.l, c.c, c.v))
+    return digest.hexdigest()
+
+
+def build_design_matrix(
+    candles: Sequence[Candle],
+    feature_names: Sequence[str] = DEFAULT_FEATURES,
+    atr_window: int = 14,
+    label_cfg: LabelConfig = LabelConfig(),
+) -> DesignMatrix:
+    features = compute_features(candles, atr_window=atr_window)
+    labels = triple_barrier_labels(features, label_cfg)
+    names = list(feature_names)
+    matrix = DesignMatrix(names, [], [], [])
+    for row, label in zip(features, labels):
+        if label is None:
+            continue
+        values = [getattr(row, name) for name in names]
+        if any(v is None or not math.isfinite(v) for v in values):
+            continue
+        matrix.rows.append([float(v) for v in values])
+        matrix.labels.append(label)
+        matrix.ts.append(row.ts_close)
+    return matrix
+
+
+def _save_matrix(matrix: DesignMatrix, path: Path) -> None:
+    flat = array("d", (v for row in matrix.rows for v in row))
+    header = {
+        "format": CACHE_FORMAT,
+        "feature_names": matrix.feature_names,
+        "n": len(matrix),
+        "key": matrix.key,
+    }
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("wb") as fh:
+        blob = json.dumps(header).encode("utf8")
+        fh.write(struct.pack("<I", len(blob)))
+        fh.write(blob)
+        fh.write(array("q", matrix.ts).tobytes())
+        fh.write(array("b", matrix.labels).tobytes())
+        fh.write(flat.tobytes())
+    os.replace(tmp, path)
+
+
+def _load_matrix(path: Path) -> DesignMatrix:
+    data = path.read_bytes()
+    (size,) = struct.unpack_from("<I", data)
+    header = json.loads(data[4 : 4 + size])
+    if header.get("format") != CACHE_FORMAT:
+        raise ValueError("stale design matrix cache")
+    n = int(header["n"])
+    width = len(header["feature_names"])
+    offset = 4 + size
+    ts = array("q")
+    ts.frombytes(data[offset : offset + 8 * n])
+    offset += 8 * n
+    labels = array("b")
+    labels.frombytes(data[offset : offset + n])
+    offset += n
+    flat = array("d")
+    flat.frombytes(data[offset : offset + 8 * n * width])
+    values = flat.tolist()
+    rows = [values[i * width : (i + 1) * width] for i in range(n)]
+    return DesignMatrix(list(header["feature_names"]), rows, labels.tolist(), ts.tolist(), header["key"])
+
+
+def load_or_build_design_matrix(
+    candles: Sequence[Candle],
+    cache_dir: Path | str = Path("data/cache/design"),
+    feature_names: Sequence[str] = DEFAULT_FEATURES,
+    atr_window: int = 14,
+    label_cfg: LabelConfig = LabelConfig(),
+) -> DesignMatrix:
+    """Return the design matrix for *candles*, reusing a cached build when the
+    data and configuration hash match."""
+
+    key = design_matrix_key(candles, feature_names, atr_window, label_cfg)
+    path = Path(cache_dir) / f"{key}.dm"
+    if path.exists():
+        try:
+            return _load_matrix(path)
+        except (OSError, ValueError, struct.error) as exc:
+            LOGGER.warning("Rebuilding unreadable design matrix cache %s: %s", path, exc)
+    matrix = build_design_matrix(candles, feature_names, atr_window, label_cfg)
+    matrix.key = key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _save_matrix(matrix, path)
+    return matrix
+
+
+# ---------------------------------------------------------------------------
+# Fitting
+# ---------------------------------------------------------------------------
+def _sigmoid(value: float) -> float:
+    if value > 50:
+        return 1.0
+    if value < -50:
+        return 0.0
+    return 1.0 / (1.0 + math.exp(-value))
+
+
+def _solve(a: List[List[float]], b: List[float]) -> List[float]:
+    """Gaussian elimination with partial pivoting for the small Newton system."""
+
+    n = len(b)
+    m = [row[:] + [b[i]] for i, row in enumerate(a)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        if abs(m[pivot][col]) < 1e-12:
+            raise ValueError("singular Hessian")
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(col + 1, n):
+            f = m[r][col] / m[col][col]
+            if f:
+                for c in range(col, n + 1):
+                    m[r][c] -= f * m[col][c]
+    x = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        x[r] = (m[r][n] - sum(m[r][c] * x[c] for c in range(r + 1, n))) / m[r][r]
+    return x
+
+
+def fit_logistic(
+    matrix: DesignMatrix,
+    l2: float = 1.0,
+    max_iter: int = 25,
+    tol: float = 1e-8,
+    version: str = "logistic",
+) -> LoadedModel:
+    """L2-regularised logistic regression fitted by Newton's method (IRLS).
+
+    Features are standardised internally and the scaling is folded back into
+    the returned weights, so ``LoadedModel`` scores raw feature values.
+    """
+
+    if not matrix.rows:
+        raise ValueError("empty design matrix")
+    d = len(matrix.feature_names)
+    n = len(matrix.rows)
+    columns = list(zip(*matrix.rows))
+    means = [sum(col) / n for col in columns]
+    scales = [
+        math.sqrt(sum((v - mu) ** 2 for v in col) / n) or 1.0 for col, mu in zip(columns, means)
+    ]
+    rows = [[(v - mu) / sd for v, mu, sd in zip(row, means, scales)] + [1.0] for row in matrix.rows]
+    w = [0.0] * (d + 1)
+    for _ in range(max_iter):
+        grad = [l2 * wj for wj in w[:d]] + [0.0]
+        hess = [[0.0] * (d + 1) for _ in range(d + 1)]
+        for j in range(d):
+            hess[j][j] = l2
+        for x, y in zip(rows, matrix.labels):
+            p = _sigmoid(sum(map(float.__mul__, w, x)))
+            r = p - y
+            s = max(p * (1.0 - p), 1e-12)
+            for j in range(d + 1):
+                grad[j] += r * x[j]
+                sx = s * x[j]
+                row_h = hess[j]
+                for k in range(j, d + 1):
+                    row_h[k] += sx * x[k]
+        for j in range(d + 1):
+            for k in range(j):
+                hess[j][k] = hess[k][j]
+        step = _solve(hess, grad)
+        w = [wj - sj for wj, sj in zip(w, step)]
+        if max(abs(s) for s in step) < tol:
+            break
+    weights = {name: w[j] / scales[j] for j, name in enumerate(matrix.feature_names)}
+    bias = w[d] - sum(w[j] * means[j] / scales[j] for j in range(d))
+    return LoadedModel(list(matrix.feature_names), version, weights, bias)
+
+
+def fit_lightgbm(
+    matrix: DesignMatrix, params: Optional[Dict[str, Any]] = None, version: str = "lightgbm"
+):  # pragma: no cover - exercised when lightgbm available
+    """Train a LightGBM booster and compile it for lightgbm-free inference."""
+
+    try:
+        import lightgbm as lgb  # type: ignore
+    except ImportError as exc:
+        raise RuntimeError("lightgbm is not installed") from exc
+    from bot.tree_model import check_parity, compile_booster, probe_rows
+
+    params = {"objective": "binary", "verbosity": -1, "num_leaves": 15, **(params or {})}
+    rounds = int(params.pop("num_boost_round", 200))
+    dataset = lgb.Dataset(matrix.rows, label=matrix.labels, feature_name=list(matrix.feature_names))
+    booster = lgb.train(params, dataset, num_boost_round=rounds)
+    compiled = compile_booster(booster, version=version)
+    if check_parity(booster, compiled, probe_rows(compiled)):
+        raise ValueError("Compiled trees do not reproduce booster margins")
+    return compiled
+
+
+def _log_loss(probs: Sequence[float], labels: Sequence[int]) -> float:
+    eps = 1e-12
+    total = 0.0
+    for p, y in zip(probs, labels):
+        p = min(max(p, eps), 1 - eps)
+        total -= y * math.log(p) + (1 - y) * math.log(1 - p)
+    return total / max(len(labels), 1)
+
+
+def train(
+    matrix: DesignMatrix,
+    model_type: str = "logistic",
+    holdout_pct: float = 0.2,
+    calibrate: bool = True,
+    version: Optional[str] = None,
+    **params: Any,
+) -> TrainResult:
+    """Fit on the earliest rows and calibrate/evaluate on the time-ordered holdout.
+
+    Without a *version* the model is stamped with the training time, the same
+    fallback :meth:`ModelRegistry.publish` uses.
+    """
+
+    version = version or time.strftime("%Y%m%dT%H%M%S")
+    n_hold = int(len(matrix) * holdout_pct)
+    split = len(matrix) - n_hold
+    fit_part = DesignMatrix(matrix.feature_names, matrix.rows[:split], matrix.labels[:split], matrix.ts[:split])
+    if model_type == "logistic":
+        model = fit_logistic(fit_part, version=version, **params)
+    elif model_type == "lightgbm":
+        model = fit_lightgbm(fit_part, params, version=version)
+    else:
+        raise ValueError(f"Unsupported model type: {model_type}")
+    metrics: Dict[str, float] = {"n_train": float(split), "n_holdout": float(n_hold)}
+    calibration = None
+    if n_hold:
+        hold_rows = matrix.rows[split:]
+        hold_labels = matrix.labels[split:]
+        raw = [_sigmoid(m) for m in model.margin_batch(hold_rows)]
+        metrics["holdout_logloss"] = _log_loss(raw, hold_labels)
+        metrics["holdout_base_rate"] = sum(hold_labels) / n_hold
+        if calibrate:
+            calibration = fit_isotonic(raw, hold_labels)
+    profile = build_profile(fit_part.feature_names, fit_part.rows)
+    return TrainResult(model, calibration, metrics, profile)
+
+
+def publish(
+    result: TrainResult,
+    registry_root: Path | str,
+    version: Optional[str] = None,
+    activate: bool = False,
+) -> str:
+    spec = result.calibration.to_spec() if result.calibration else None
+    return ModelRegistry(registry_root).publish(
+        result.model, spec, version=version, activate=activate, profile=result.profile
+    )
+
+
+__all__ = [
+    "DEFAULT_FEATURES",
+    "DesignMatrix",
+    "LabelConfig",
+    "TrainResult",
+    "build_design_matrix",
+    "design_matrix_key",
+    "fit_lightgbm",
+    "fit_logistic",
+    "load_or_build_design_matrix",
+    "publish",
+    "train",
+    "triple_barrier_labels",
+]
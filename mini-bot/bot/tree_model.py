@@ -0,0 +1,185 @@
+"""LightGBM boosters compiled to flat node arrays for dependency-free inference."""
+from __future__ import annotations
+
+import logging
+import math
+import random
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+LOGGER = logging.getLogger(__name__)
+
+# Missing-value handling codes, mirroring LightGBM's MissingType.
+MISSING_NONE = 0
+MISSING_ZERO = 1
+MISSING_NAN = 2
+_MISSING_CODES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+# LightGBM's kZeroThreshold.
+ZERO_THRESHOLD = 1e-35
+
+
+@dataclass
+class CompiledTrees:
+    """Tree ensemble stored as one flat node table.
+
+    Node ``i`` is a leaf when ``feature[i] < 0`` and then contributes
+    ``value[i]``; otherwise rows go to ``left[i]`` when
+    ``x[feature[i]] <= threshold[i]`` and to ``right[i]`` otherwise, with
+    missing values routed by ``missing[i]``/``default_left[i]`` exactly as
+    LightGBM's numerical decision does. The margin is the in-order sum of
+    one leaf per tree starting at ``roots[t]``.
+    """
+
+    feature_names: List[str]
+    version: str
+    feature: array
+    threshold: array
+    left: array
+    right: array
+    value: array
+    missing: array
+    default_left: array
+    roots: array
+    objective: str = "binary"
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _margin_row(self, row: Sequence[float]) -> float:
+        feature = self.feature
+        threshold = self.threshold
+        left = self.left
+        right = self.right
+        missing = self.missing
+        total = 0.0
+        for node in self.roots:
+            f = feature[node]
+            while f >= 0:
+                x = row[f]
+                kind = missing[node]
+                if x != x and kind != MISSING_NAN:
+                    x = 0.0
+                if (kind == MISSING_ZERO and -ZERO_THRESHOLD <= x <= ZERO_THRESHOLD) or (
+                    kind == MISSING_NAN and x != x
+                ):
+                    node = left[node] if self.default_left[node] else right[node]
+                else:
+                    node = left[node] if x <= threshold[node] else right[node]
+                f = feature[node]
+            total += self.value[node]
+        return total
+
+    def margin(self, features: Mapping[str, float]) -> float:
+        return self._margin_row([float(features.get(name, math.nan)) for name in self.feature_names])
+
+    def margin_batch(self, rows: Sequence[Sequence[float]]) -> List[float]:
+        """Margins for rows already ordered like ``feature_names``."""
+
+        margin_row = self._margin_row
+        return [margin_row(row) for row in rows]
+
+
+def _flatten(node: Mapping[str, Any], out: Dict[str, array]) -> int:
+    idx = len(out["feature"])
+    if "leaf_value" in node or "split_feature" not in node:
+        out["feature"].append(-1)
+        out["threshold"].append(0.0)
+        out["left"].append(-1)
+        out["right"].append(-1)
+        out["value"].append(float(node.get("leaf_value", 0.0)))
+        out["missing"].append(MISSING_NONE)
+        out["default_left"].append(0)
+        return idx
+    decision = node.get("decision_type", "<=")
+    if decision != "<=":
+        raise ValueError(f"Unsupported decision type {decision!r} (categorical splits)")
+    out["feature"].append(int(node["split_feature"]))
+    out["threshold"].append(float(node["threshold"]))
+    out["left"].append(-1)
+    out["right"].append(-1)
+    out["value"].append(0.0)
+    out["missing"].append(_MISSING_CODES.get(str(node.get("missing_type", "None")), MISSING_NONE))
+    out["default_left"].append(1 if node.get("default_left", True) else 0)
+    out["left"][idx] = _flatten(node["left_child"], out)
+    out["right"][idx] = _flatten(node["right_child"], out)
+    return idx
+
+
+def compile_dump(dump: Mapping[str, Any], version: Optional[str] = None) -> CompiledTrees:
+    """Compile the dict returned by ``Booster.dump_model()``."""
+
+    objective = str(dump.get("objective", "binary")).split()[0]
+    if objective not in {"binary", "regression", "cross_entropy"}:
+        raise ValueError(f"Unsupported objective for compiled inference: {objective!r}")
+    if int(dump.get("num_tree_per_iteration", 1)) != 1:
+        raise ValueError("Multiclass boosters are not supported")
+    out: Dict[str, array] = {
+        "feature": array("i"),
+        "threshold": array("d"),
+        "left": array("i"),
+        "right": array("i"),
+        "value": array("d"),
+        "missing": array("b"),
+        "default_left": array("b"),
+    }
+    roots = array("i")
+    for tree in dump.get("tree_info", []):
+        roots.append(_flatten(tree["tree_structure"], out))
+    return CompiledTrees(
+        feature_names=list(dump.get("feature_names", [])),
+        version=str(version or "lightgbm"),
+        roots=roots,
+        objective=objective,
+        **out,
+    )
+
+
+def probe_rows(compiled: CompiledTrees, n: int = 256, seed: int = 0) -> List[List[float]]:
+    """Rows that sit on, just beside, or missing at the ensemble's split thresholds."""
+
+    rng = random.Random(seed)
+    width = len(compiled.feature_names) or (max(compiled.feature, default=-1) + 1)
+    cuts: List[List[float]] = [[0.0] for _ in range(width)]
+    for f, t in zip(compiled.feature, compiled.threshold):
+        if f >= 0:
+            cuts[f].extend((t, math.nextafter(t, math.inf), math.nextafter(t, -math.inf)))
+    rows = []
+    for _ in range(n):
+        rows.append([math.nan if rng.random() < 0.05 else rng.choice(c) for c in cuts])
+    return rows
+
+
+def check_parity(booster: Any, compiled: CompiledTrees, rows: Sequence[Sequence[float]]) -> int:
+    """Return how many *rows* score differently from ``booster`` (exact compare)."""
+
+    expected = [float(m) for m in booster.predict([list(r) for r in rows], raw_score=True)]
+    actual = compiled.margin_batch(rows)
+    mismatches = sum(1 for a, b in zip(actual, expected) if a != b and not (a != a and b != b))
+    if mismatches:
+        worst = max(abs(a - b) for a, b in zip(actual, expected))
+        LOGGER.warning("Compiled trees differ on %s/%s rows (max %.3g)", mismatches, len(rows), worst)
+    return mismatches
+
+
+def compile_booster(
+    booster: Any,
+    check_rows: Optional[Sequence[Sequence[float]]] = None,
+    version: Optional[str] = None,
+) -> CompiledTrees:
+    """Compile a LightGBM booster, refusing the result if margins are not identical."""
+
+    compiled = compile_dump(booster.dump_model(), version=version)
+    if check_rows and check_parity(booster, compiled, check_rows):
+        raise ValueError("Compiled trees do not reproduce booster margins")
+    return compiled
+
+
+__all__ = [
+    "CompiledTrees",
+    "check_parity",
+    "compile_booster",
+    "compile_dump",
+    "probe_rows",
+]
@@ -3,6 +3,14 @@ from __future__ import annotations
 
 from typing import Dict, Optional
 
+# Venues whose ccxt adapters accept unified ``stopLoss``/``takeProfit`` params
+# on the entry order (Bybit TP/SL on create, OKX attachAlgoOrds).
+BRACKET_VENUES = frozenset({"bybit", "bybitlinear", "okx"})
+
+
+def supports_bracket(venue: str) -> bool:
+    return (venue or "").lower() in BRACKET_VENUES
+
 
 def order_params(
     venue: str,
@@ -11,6 +19,8 @@ def order_params(
     reduce_only: bool = False,
     trigger: str = "mark",
     market_type: Optional[str] = None,
+    stop_loss: Optional[float] = None,
+    take_profit: Optional[float] = None,
 ) -> Dict[str, object]:
     venue_norm = (venue or "").lower()
     trigger_norm = (trigger or "mark").lower()
@@ -64,7 +74,23 @@ def order_params(
             params["postOnly"] = True
         if reduce_only:
             params["reduceOnly"] = True
+
+    if supports_bracket(venue_norm) and not reduce_only:
+        legs = (("stopLoss", "sl", stop_loss), ("takeProfit", "tp", take_profit))
+        for key, prefix, leg_px in legs:
+            if not leg_px:
+                continue
+            leg: Dict[str, object] = {"triggerPrice": float(leg_px), "type": "market"}
+            if venue_norm == "okx":
+                leg["triggerPriceType"] = (
+                    trigger_norm if trigger_norm in {"mark", "last", "index"} else "mark"
+                )
+            else:
+                params[f"{prefix}TriggerBy"] = {"index": "IndexPrice", "last": "LastPrice"}.get(
+                    trigger_norm, "MarkPrice"
+                )
+            params[key] = leg
     return params
 
 
-__all__ = ["order_params"]
+__all__ = ["BRACKET_VENUES", "order_params", "supports_bracket"]
@@ -0,0 +1,48 @@
+"""Execution latency report built from persisted histograms."""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bot.latency import percentile
+from bot.state_store import StateStore
+
+
+def latency_report(db_path: str | Path, venue: Optional[str] = None) -> List[Dict[str, object]]:
+    with StateStore(db_path) as store:
+        hists = store.get_latency_histograms(venue)
+    rows: List[Dict[str, object]] = []
+    for (hist_venue, endpoint), hist in sorted(hists.items()):
+        rows.append(
+            {
+                "venue": hist_venue,
+                "endpoint": endpoint,
+                "count": sum(hist.values()),
+                "p50_ms": percentile(hist, 0.50),
+                "p95_ms": percentile(hist, 0.95),
+                "p99_ms": percentile(hist, 0.99),
+            }
+        )
+    return rows
+
+
+def format_report(rows: List[Dict[str, object]]) -> str:
+    lines = [f"{'venue':<14}{'endpoint':<22}{'count':>8}{'p50_ms':>10}{'p95_ms':>10}{'p99_ms':>10}"]
+    for row in rows:
+        lines.append(
+            f"{row['venue']:<14}{row['endpoint']:<22}{row['count']:>8}"
+            f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="data/mini.db")
+    parser.add_argument("--venue", default=None)
+    args = parser.parse_args()
+    print(format_report(latency_report(args.db, args.venue)))
+
+
+__all__ = ["format_report", "latency_report"]
@@ -0,0 +1,67 @@
+"""Live out-of-sample calibration of live and shadow models."""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+from bot.data_ingest import timeframe_to_seconds
+from bot.state_store import StateStore
+from reporting.calibration import brier_score, reliability_table
+
+
+def shadow_outcomes(
+    store: StateStore, symbol: str, timeframe: str, horizon_bars: int = 1
+) -> Dict[str, List[tuple[float, int]]]:
+    """Pair each stored probability with whether close rose *horizon_bars* later."""
+
+    step_ms = timeframe_to_seconds(timeframe) * 1000 * horizon_bars
+    rows = store.conn.execute(
+        "SELECT s.version, s.p_buy, c1.c > c0.c AS up FROM shadow_scores s "
+        "JOIN candles c0 ON c0.symbol = s.symbol AND c0.tf = ? AND c0.ts_close = s.ts "
+        "JOIN candles c1 ON c1.symbol = s.symbol AND c1.tf = ? AND c1.ts_close = s.ts + ? "
+        "WHERE s.symbol = ? ORDER BY s.version, s.ts",
+        (timeframe, timeframe, step_ms, symbol),
+    ).fetchall()
+    out: Dict[str, List[tuple[float, int]]] = {}
+    for version, p_buy, up in rows:
+        out.setdefault(version, []).append((float(p_buy), int(up)))
+    return out
+
+
+def shadow_report(
+    db_path: str | Path,
+    symbol: str,
+    timeframe: str,
+    horizon_bars: int = 1,
+    n_bins: int = 10,
+) -> List[Dict[str, object]]:
+    with StateStore(db_path) as store:
+        outcomes = shadow_outcomes(store, symbol, timeframe, horizon_bars)
+    report = []
+    for version, pairs in sorted(outcomes.items()):
+        probs = [p for p, _ in pairs]
+        labels = [y for _, y in pairs]
+        report.append(
+            {
+                "version": version,
+                "n": len(pairs),
+                "brier": brier_score(probs, labels),
+                "reliability": reliability_table(probs, labels, n_bins),
+            }
+        )
+    return report
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="data/mini.db")
+    parser.add_argument("--symbol", required=True)
+    parser.add_argument("--timeframe", default="4h")
+    parser.add_argument("--horizon", type=int, default=1)
+    args = parser.parse_args()
+    for row in shadow_report(args.db, args.symbol, args.timeframe, args.horizon):
+        print(f"{row['version']:<24}{row['n']:>8}{row['brier']:>10.4f}")
+
+
+__all__ = ["shadow_outcomes", "shadow_report"]
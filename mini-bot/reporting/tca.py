@@ -0,0 +1,105 @@
+"""Transaction-cost analytics aggregated from recorded submissions and fills."""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from bot.state_store import StateStore
+
+
+def _derive(row: Dict[str, object]) -> Dict[str, object]:
+    submitted = float(row.get("qty_submitted") or 0.0)
+    filled = float(row.get("qty_filled") or 0.0)
+    maker = float(row.get("maker_qty") or 0.0)
+    return {
+        **row,
+        "fill_ratio": filled / submitted if submitted > 0 else None,
+        "maker_ratio": maker / filled if filled > 0 else None,
+        "slippage_bp": float(row.get("slip_bp_qty") or 0.0) / filled if filled > 0 else None,
+        "time_to_fill_s": float(row.get("ttf_ms_qty") or 0.0) / filled / 1000.0 if filled > 0 else None,
+    }
+
+
+def tca_rows(
+    store: StateStore, symbol: Optional[str] = None, venue: Optional[str] = None
+) -> List[Dict[str, object]]:
+    """Refresh the rollup and return per symbol/venue/level statistics."""
+
+    store.refresh_tca_stats()
+    return [_derive(row) for row in store.list_tca_stats(symbol, venue)]
+
+
+def summarize(rows: Iterable[Dict[str, object]]) -> Dict[str, object]:
+    totals: Dict[str, object] = {
+        "n_orders": 0,
+        "qty_submitted": 0.0,
+        "n_fills": 0,
+        "qty_filled": 0.0,
+        "maker_qty": 0.0,
+        "slip_bp_qty": 0.0,
+        "ttf_ms_qty": 0.0,
+        "fees": 0.0,
+    }
+    for row in rows:
+        for key in totals:
+            totals[key] += row.get(key) or 0
+    return _derive(totals)
+
+
+def dod_inputs(
+    store: StateStore, symbol: Optional[str] = None, venue: Optional[str] = None
+) -> Dict[str, float]:
+    """Measured ``FillRatio``/``maker_ratio`` for :func:`reporting.validate_dod.check_dod`.
+
+    Keys are omitted while there is nothing to measure so callers can merge
+    the result over their defaults.
+    """
+
+    total = summarize(tca_rows(store, symbol, venue))
+    metrics: Dict[str, float] = {}
+    if total["fill_ratio"] is not None:
+        metrics["FillRatio"] = float(total["fill_ratio"])
+    if total["maker_ratio"] is not None:
+        metrics["maker_ratio"] = float(total["maker_ratio"])
+        metrics["slippage_bp"] = float(total["slippage_bp"])
+    return metrics
+
+
+def tca_report(
+    db_path: str | Path, symbol: Optional[str] = None, venue: Optional[str] = None
+) -> List[Dict[str, object]]:
+    with StateStore(db_path) as store:
+        return tca_rows(store, symbol, venue)
+
+
+def _fmt(value: object, spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def format_report(rows: List[Dict[str, object]]) -> str:
+    lines = [
+        f"{'symbol':<14}{'venue':<12}{'level':>6}{'orders':>8}{'fill%':>8}"
+        f"{'maker%':>8}{'slip_bp':>9}{'ttf_s':>9}"
+    ]
+    for row in rows + [{"symbol": "TOTAL", "venue": "", "level": "", **summarize(rows)}]:
+        fill = row["fill_ratio"] * 100 if row["fill_ratio"] is not None else None
+        maker = row["maker_ratio"] * 100 if row["maker_ratio"] is not None else None
+        lines.append(
+            f"{row['symbol']:<14}{row['venue']:<12}{row['level']:>6}{row['n_orders']:>8}"
+            f"{_fmt(fill, '.1f'):>8}{_fmt(maker, '.1f'):>8}"
+            f"{_fmt(row['slippage_bp'], '.2f'):>9}{_fmt(row['time_to_fill_s'], '.1f'):>9}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="data/mini.db")
+    parser.add_argument("--symbol", default=None)
+    parser.add_argument("--venue", default=None)
+    args = parser.parse_args()
+    print(format_report(tca_report(args.db, args.symbol, args.venue)))
+
+
+__all__ = ["dod_inputs", "format_report", "summarize", "tca_report", "tca_rows"]
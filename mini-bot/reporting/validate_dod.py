@@ -15,6 +15,9 @@ def check_dod(metrics: Dict[str, float]) -> bool:
         return False
     if metrics.get("FillRatio", 0.0) < 0.55:
         return False
+    # Only enforced when measured (see reporting.tca.dod_inputs).
+    if metrics.get("maker_ratio", 1.0) < 0.55:
+        return False
     if metrics.get("BTC_Sharpe", 0.0) <= 0:
         return False
     if metrics.get("ETH_Sharpe", 0.0) <= 0:
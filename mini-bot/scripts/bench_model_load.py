@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark: pickle load vs mapped artifact, each in a fresh interpreter."""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+_SNIPPET = (
+    "from bot.model_infer import ModelInferer; "
+    "m = ModelInferer({path!r}); "
+    "m.predict_proba(dict.fromkeys(m.feature_names, 0.0))"
+)
+
+
+def cold_start_ms(model_path: Path, runs: int = 5) -> List[float]:
+    """Wall time of interpreter start + import + load + first prediction."""
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", _SNIPPET.format(path=str(model_path))],
+            check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+def compare(pickle_path: Path, artifact_path: Path, runs: int = 5) -> Dict[str, float]:
+    results = {}
+    for label, path in (("pickle", pickle_path), ("artifact", artifact_path)):
+        results[f"{label}_median_ms"] = statistics.median(cold_start_ms(path, runs))
+    return results
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pickle", type=Path, default=Path("models/model.pkl"))
+    parser.add_argument("--artifact", type=Path, default=Path("models/model"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    for key, value in compare(args.pickle, args.artifact, args.runs).items():
+        print(f"{key:<22}{value:>10.1f}")
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""Compile a pickled LightGBM booster into a lightgbm-free CompiledTrees pickle."""
+from __future__ import annotations
+
+import argparse
+import pickle
+from pathlib import Path
+
+from bot.tree_model import check_parity, compile_booster, probe_rows
+
+
+def main(src: Path, dest: Path, probes: int = 2048, version: str | None = None) -> int:
+    with src.open("rb") as fh:
+        obj = pickle.load(fh)
+    booster = obj.get("model") if isinstance(obj, dict) else obj
+    compiled = compile_booster(booster, version=version or src.stem)
+    mismatches = check_parity(booster, compiled, probe_rows(compiled, probes))
+    if mismatches:
+        print(f"Refusing to write {dest}: {mismatches}/{probes} probe rows differ")
+        return 1
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    with dest.open("wb") as fh:
+        pickle.dump(compiled, fh)
+    print(f"Wrote {compiled.n_trees} trees ({len(compiled.feature)} nodes) to {dest}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--src", type=Path, default=Path("models/model.pkl"))
+    parser.add_argument("--out", type=Path, default=Path("models/model_compiled.pkl"))
+    parser.add_argument("--probes", type=int, default=2048)
+    parser.add_argument("--version", default=None)
+    args = parser.parse_args()
+    raise SystemExit(main(args.src, args.out, args.probes, args.version))
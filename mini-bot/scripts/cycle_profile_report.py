@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Summarize ``cycle_profile`` events: p50/p95 wall and CPU time per stage."""
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+from bot.profiler import STAGES, load_profiles, summarize
+
+
+def _day_ms(day: str) -> int:
+    return int(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def main(
+    log_path: Path, since: Optional[str] = None, until: Optional[str] = None
+) -> Dict[str, Dict[str, float]]:
+    since_ms = _day_ms(since) if since else None
+    # --until is inclusive of the whole day.
+    until_ms = _day_ms(until) + int(timedelta(days=1).total_seconds() * 1000) if until else None
+    summary = summarize(load_profiles(log_path, since_ms, until_ms))
+    order = [s for s in (*STAGES, "total") if s in summary] + sorted(set(summary) - {*STAGES, "total"})
+    print(f"{'stage':<18}{'n':>6}{'wall p50':>11}{'wall p95':>11}{'cpu p50':>10}{'cpu p95':>10}{'calls':>8}")
+    for stage in order:
+        row = summary[stage]
+        print(
+            f"{stage:<18}{int(row['n']):>6}{row['wall_p50']:>11.1f}{row['wall_p95']:>11.1f}"
+            f"{row.get('cpu_p50', 0.0):>10.1f}{row.get('cpu_p95', 0.0):>10.1f}{row.get('calls_mean', 0.0):>8.1f}"
+        )
+    return summary
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--log", type=Path, default=Path("experiments/live/cycles.jsonl"))
+    parser.add_argument("--since", default=None, help="first UTC day, YYYY-MM-DD")
+    parser.add_argument("--until", default=None, help="last UTC day, YYYY-MM-DD (inclusive)")
+    args = parser.parse_args()
+    main(args.log, args.since, args.until)
@@ -3,14 +3,17 @@ from __future__ import annotations
 import argparse
 import json
 from pathlib import Path
+from typing import Dict, Optional
 
 from bot.exp_registry import new_registry
+from bot.state_store import StateStore
 from reporting.aggregate import aggregate_metrics
 from reporting.recommend import recommend_params
+from reporting.tca import dod_inputs
 from reporting.validate_dod import check_dod
 
 
-def run_fold(path: Path) -> None:
+def run_fold(path: Path, execution_metrics: Optional[Dict[str, float]] = None) -> None:
     path.mkdir(parents=True, exist_ok=True)
     (path / "trades.csv").write_text("trade_id,fold\n")
     (path / "cycles.jsonl").write_text("")
@@ -22,13 +25,14 @@ def run_fold(path: Path) -> None:
         "BTC_Sharpe": 1.1,
         "ETH_Sharpe": 1.05,
     }
+    metrics.update(execution_metrics or {})
     (path / "metrics.json").write_text(json.dumps(metrics))
     (path / "calib.csv").write_text("prob,emp\n")
     (path / "exec_summary.csv").write_text("order_id,filled_qty\n")
     (path / "funding_pnl.csv").write_text("position_id,rate\n")
 
 
-def main(cfg_path: str, comment: str = "") -> str:
+def main(cfg_path: str, comment: str = "", tca_db: Optional[str] = None) -> str:
     registry = new_registry(comment=comment)
     config_path = Path(cfg_path)
     config_text = config_path.read_text() if config_path.exists() else ""
@@ -37,7 +41,11 @@ def main(cfg_path: str, comment: str = "") -> str:
 
     fold_path = registry.fold_dir(0)
     folds_root = fold_path.parent
-    run_fold(fold_path)
+    execution_metrics: Dict[str, float] = {}
+    if tca_db and Path(tca_db).exists():
+        with StateStore(tca_db) as store:
+            execution_metrics = dod_inputs(store)
+    run_fold(fold_path, execution_metrics)
     aggregate = aggregate_metrics(folds_root)
     agg_path = registry.exp_path / "aggregate" / "metrics_oos.json"
     agg_path.parent.mkdir(parents=True, exist_ok=True)
@@ -52,5 +60,6 @@ if __name__ == "__main__":  # pragma: no cover - CLI
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", required=True)
     parser.add_argument("--comment", default="")
+    parser.add_argument("--tca-db", default=None, help="state DB with live fills for FillRatio/maker_ratio")
     args = parser.parse_args()
-    main(args.config, args.comment)
+    main(args.config, args.comment, args.tca_db)
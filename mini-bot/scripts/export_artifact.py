@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Convert a pickled model (and sibling isotonic.pkl) into a mapped artifact directory."""
+from __future__ import annotations
+
+import argparse
+import pickle
+from pathlib import Path
+from typing import Optional
+
+from bot.artifact import save_artifact
+from bot.calibration import export_calibrator
+from bot.model_infer import LoadedModel
+from bot.tree_model import CompiledTrees, check_parity, compile_booster, probe_rows
+
+
+def main(src: Path, dest: Path, version: Optional[str] = None) -> Path:
+    with src.open("rb") as fh:
+        obj = pickle.load(fh)
+    if not isinstance(obj, (LoadedModel, CompiledTrees)):
+        booster = obj.get("model") if isinstance(obj, dict) else obj
+        obj = compile_booster(booster, version=version or src.stem)
+        if check_parity(booster, obj, probe_rows(obj)):
+            raise ValueError("Compiled trees do not reproduce booster margins")
+    if version:
+        obj.version = version
+    calibration = None
+    calib_path = src.with_name("isotonic.pkl")
+    if calib_path.exists():
+        with calib_path.open("rb") as fh:
+            exported = export_calibrator(pickle.load(fh))
+        calibration = exported.to_spec() if exported else None
+    return save_artifact(obj, dest, calibration)
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--src", type=Path, default=Path("models/model.pkl"))
+    parser.add_argument("--out", type=Path, default=Path("models/model"))
+    parser.add_argument("--version", default=None)
+    args = parser.parse_args()
+    print(f"Wrote artifact to {main(args.src, args.out, args.version)}")
@@ -9,8 +9,11 @@ sudo rsync -a --exclude '.git' --exclude 'data/mini.db' ./ "$PROJECT_DIR"/
 
 sudo cp deploy/minibot.service "$SYSTEMD_DIR/"
 sudo cp deploy/minibot.timer "$SYSTEMD_DIR/"
+sudo cp deploy/minibot-reprice.service "$SYSTEMD_DIR/"
+sudo cp deploy/minibot-reprice.timer "$SYSTEMD_DIR/"
 
 sudo systemctl daemon-reload
 sudo systemctl enable --now minibot.timer
+sudo systemctl enable --now minibot-reprice.timer
 
 echo "MiniBot timer installed. Check status with: systemctl status minibot.timer"
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Train a model from stored candles and publish it to the model registry."""
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Optional
+
+from bot.state_store import StateStore
+from bot.training import LabelConfig, load_or_build_design_matrix, publish, train
+
+
+def main(
+    db_path: Path,
+    symbol: str,
+    timeframe: str,
+    registry: Path,
+    model_type: str = "logistic",
+    label_cfg: LabelConfig = LabelConfig(),
+    version: Optional[str] = None,
+    activate: bool = False,
+    cache_dir: Path = Path("data/cache/design"),
+) -> str:
+    with StateStore(db_path) as store:
+        candles = store.get_last_n_candles(symbol, timeframe, 1_000_000)
+    matrix = load_or_build_design_matrix(candles, cache_dir, label_cfg=label_cfg)
+    result = train(matrix, model_type=model_type, version=version)
+    published = publish(result, registry, version=version, activate=activate)
+    print(json.dumps({"version": published, "rows": len(matrix), **result.metrics}))
+    return published
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", type=Path, default=Path("data/mini.db"))
+    parser.add_argument("--symbol", default="BTC/USDT:USDT")
+    parser.add_argument("--timeframe", default="4h")
+    parser.add_argument("--registry", type=Path, default=Path("models/registry"))
+    parser.add_argument("--model", choices=["logistic", "lightgbm"], default="logistic")
+    parser.add_argument("--horizon", type=int, default=2)
+    parser.add_argument("--k-tp", type=float, default=3.5)
+    parser.add_argument("--k-sl", type=float, default=2.5)
+    parser.add_argument("--version", default=None)
+    parser.add_argument("--activate", action="store_true")
+    args = parser.parse_args()
+    main(
+        args.db,
+        args.symbol,
+        args.timeframe,
+        args.registry,
+        args.model,
+        LabelConfig(horizon_bars=args.horizon, k_tp=args.k_tp, k_sl=args.k_sl),
+        args.version,
+        args.activate,
+    )
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from bot.artifact import ArtifactError, load_artifact, read_manifest, save_artifact
+from bot.model_infer import LoadedModel, ModelInferer
+from bot.tree_model import compile_dump
+
+DUMP = json.loads((Path(__file__).parent / "fixtures" / "lgbm_dump.json").read_text())
+
+
+def test_tree_artifact_roundtrip_is_exact(tmp_path: Path) -> None:
+    trees = compile_dump(DUMP, version="t1")
+    path = save_artifact(trees, tmp_path / "model", {"type": "platt", "a": 1.5, "b": -0.1})
+    artifact = load_artifact(path, verify=True)
+    assert artifact.version == "t1"
+    assert artifact.calibration == {"type": "platt", "a": 1.5, "b": -0.1}
+    rows = [[5.0, 30.0, 0.1], [0.0, 10.0, float("nan")], [1.0, 25.000000000000004, 2.0]]
+    assert artifact.model.margin_batch(rows) == trees.margin_batch(rows)
+    assert isinstance(artifact.model.threshold, memoryview)
+
+
+def test_inferer_uses_artifact_and_calibration(tmp_path: Path) -> None:
+    model = LoadedModel(["a", "b"], "lr-1", {"a": 0.5, "b": -1.0}, 0.2)
+    spec = {"type": "isotonic", "x": [0.0, 0.5, 1.0], "y": [0.1, 0.4, 0.9]}
+    path = save_artifact(model, tmp_path / "lr", spec)
+    inferer = ModelInferer(path / "manifest.json")
+    proba = inferer.predict_proba({"a": 0.0, "b": 0.2})
+    assert proba["debug_raw_margin"] == pytest.approx(0.0)
+    assert proba["buy"] == pytest.approx(0.4)
+
+
+def test_corrupted_or_unknown_artifacts_rejected(tmp_path: Path) -> None:
+    path = save_artifact(compile_dump(DUMP), tmp_path / "model")
+    data = bytearray((path / "arrays.bin").read_bytes())
+    data[-1] ^= 0xFF
+    (path / "arrays.bin").write_bytes(bytes(data))
+    with pytest.raises(ArtifactError):
+        load_artifact(path, verify=True)
+    manifest = read_manifest(path)
+    manifest["format_version"] = 99
+    (path / "manifest.json").write_text(json.dumps(manifest))
+    with pytest.raises(ArtifactError):
+        load_artifact(path)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import math
+import pickle
+import random
+import shutil
+from pathlib import Path
+
+import pytest
+
+from bot.calibration import export_calibrator, fit_isotonic, from_spec, platt_table, table
+from bot.model_infer import ModelInferer
+
+
+def test_pav_pools_violators() -> None:
+    probs = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6]
+    labels = [0, 1, 0, 0, 1, 1]
+    fitted = fit_isotonic(probs, labels)
+    assert fitted.x == (0.1, 0.2, 0.4, 0.5, 0.6)
+    assert fitted.y == pytest.approx((0.0, 1 / 3, 1 / 3, 1.0, 1.0))
+    assert fitted(0.3) == pytest.approx(1 / 3)
+    assert fitted(0.05) == 0.0 and fitted(0.95) == 1.0
+    assert fitted(0.45) == pytest.approx((1 / 3 + 1.0) / 2)
+
+
+def test_pav_is_monotone_and_matches_block_means() -> None:
+    rng = random.Random(7)
+    probs = [rng.random() for _ in range(2000)]
+    labels = [1 if rng.random() < p else 0 for p in probs]
+    fitted = fit_isotonic(probs, labels)
+    assert all(b >= a for a, b in zip(fitted.y, fitted.y[1:]))
+    # PAV preserves the weighted mean of the labels.
+    assert sum(fitted.apply_batch(probs)) == pytest.approx(sum(labels))
+
+
+def test_platt_table_tracks_exact_sigmoid() -> None:
+    calib = platt_table(1.3, -0.2)
+    for margin in (-6.0, -1.0, 0.0, 0.7, 4.0):
+        raw = 1 / (1 + math.exp(-margin))
+        assert calib(raw) == pytest.approx(1 / (1 + math.exp(-(1.3 * margin - 0.2))), abs=2e-4)
+    assert from_spec(calib.to_spec()) == calib
+
+
+def test_legacy_predictor_sampled_once() -> None:
+    class Predictor:
+        calls = 0
+
+        def predict(self, values):
+            Predictor.calls += 1
+            return [min(1.0, v * 1.1) for v in values]
+
+    calib = export_calibrator(Predictor())
+    assert Predictor.calls == 1
+    assert calib(0.5) == pytest.approx(0.55)
+    assert calib.apply_batch([0.2, 0.95]) == pytest.approx([0.22, 1.0], abs=1e-3)
+    with pytest.raises(ValueError):
+        table([0.2, 0.1], [0.0, 1.0])
+
+
+def test_inferer_tabulates_pickled_platt(tmp_path: Path) -> None:
+    model_src = Path(__file__).resolve().parent.parent / "models" / "model.pkl"
+    shutil.copy(model_src, tmp_path / "model.pkl")
+    (tmp_path / "isotonic.pkl").write_bytes(pickle.dumps({"a": 2.0, "b": 0.0}))
+    inferer = ModelInferer(tmp_path / "model.pkl")
+    proba = inferer.predict_proba({"atr": 1.0, "adx": 1.0, "ret": 0.0, "vol": 0.0})
+    expected = 1 / (1 + math.exp(-2.0 * proba["debug_raw_margin"]))
+    assert proba["buy"] == pytest.approx(expected, abs=2e-4)
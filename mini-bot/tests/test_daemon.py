@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from pathlib import Path
+
+import pytest
+
+from bot.config import TradingConfig
+from bot.daemon import CycleDaemon, next_wake_ms
+
+H4_MS = 4 * 3600 * 1000
+
+
+class FakeStop(threading.Event):
+    """Event whose wait advances a fake clock instead of blocking."""
+
+    def __init__(self, now: list) -> None:
+        super().__init__()
+        self.now = now
+
+    def wait(self, timeout=None) -> bool:
+        if not self.is_set() and timeout:
+            self.now[0] += timeout
+        return self.is_set()
+
+
+def test_next_wake_ms_is_boundary_plus_settle() -> None:
+    assert next_wake_ms(0, "4h", 1000) == 1000
+    assert next_wake_ms(1000, "4h", 1000) == H4_MS + 1000
+    assert next_wake_ms(H4_MS - 1, "4h", 1000) == H4_MS + 1000
+    assert next_wake_ms(500, "4h", 1000) == 1000
+
+
+def test_daemon_runs_each_bar_and_logs_latency(tmp_path: Path, caplog) -> None:
+    now = [5 * 3600.0]
+    calls = []
+
+    def cycle(runtime, store, cfg):
+        calls.append(now[0])
+        now[0] += 0.15
+        if len(calls) == 1:
+            raise RuntimeError("exchange down")
+        return {"status": "ok", "submitted_ms": int(now[0] * 1000)}
+
+    log_path = tmp_path / "cycles.jsonl"
+    cfg = TradingConfig()
+    cfg.daemon.latency_budget_ms = 300
+    daemon = CycleDaemon(
+        None,  # type: ignore[arg-type]
+        None,  # type: ignore[arg-type]
+        cfg,
+        log_path=str(log_path),
+        clock=lambda: now[0],
+        stop=FakeStop(now),
+        cycle_fn=cycle,
+    )
+    with caplog.at_level(logging.WARNING, logger="bot.daemon"):
+        assert daemon.run(max_cycles=2) == 2
+    assert calls == pytest.approx([8 * 3600 + 0.2, 12 * 3600 + 0.2])
+    events = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [e["status"] for e in events] == ["error", "ok"]
+    assert events[1]["bar_close"] == 3 * H4_MS
+    assert events[1]["close_to_order_ms"] == 350
+    assert events[1]["wake_to_order_ms"] == 150
+    # Only 150 ms after wake, but the settle delay pushes it past the 300 ms budget.
+    assert "350 ms after bar close" in caplog.text
+
+
+def test_daemon_stops_after_in_flight_cycle(tmp_path: Path) -> None:
+    now = [0.0]
+    stop = FakeStop(now)
+
+    def cycle(runtime, store, cfg):
+        daemon.request_stop()
+        return {"status": "no_signal"}
+
+    daemon = CycleDaemon(
+        None,  # type: ignore[arg-type]
+        None,  # type: ignore[arg-type]
+        TradingConfig(),
+        log_path=str(tmp_path / "cycles.jsonl"),
+        clock=lambda: now[0],
+        stop=stop,
+        cycle_fn=cycle,
+    )
+    assert daemon.run() == 1
+    assert stop.is_set()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+
+from bot.config import DeadlineConfig
+from bot.deadline import CycleDeadline
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingNotifier:
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    def send_message(self, text: str) -> bool:
+        self.sent.append(text)
+        return True
+
+
+def test_stage_deadlines_are_offsets_from_start() -> None:
+    clock = FakeClock()
+    cfg = DeadlineConfig(budget_ms=1000, prefetch_ms=400, decision_ms=700)
+    deadline = CycleDeadline.from_config(cfg, clock=clock)
+    clock.now += 0.3
+    assert deadline.remaining_ms("prefetch") == pytest.approx(100)
+    assert deadline.remaining_s("decision") == pytest.approx(0.4)
+    assert deadline.allows("decision") and deadline.allows()
+    clock.now += 0.5
+    assert not deadline.allows("decision")
+    assert deadline.remaining_s("prefetch") == 0.0
+    assert deadline.remaining_ms() == pytest.approx(200)
+    assert not deadline.eventful
+    clock.now += 0.3
+    assert deadline.eventful  # over the whole budget
+
+
+def test_notifications_defer_when_budget_is_short() -> None:
+    clock = FakeClock()
+    notifier = RecordingNotifier()
+    deadline = CycleDeadline(1000, notify_min_ms=300, clock=clock)
+    deadline.notify(notifier, "early")
+    clock.now += 0.8
+    deadline.notify(notifier, "late")
+    deadline.skip("shadow_submit")
+    assert notifier.sent == ["early"]
+    summary = deadline.summary()
+    assert summary["deferred"] == 1 and summary["skipped"] == ["shadow_submit"]
+    assert deadline.flush(notifier) == 1
+    assert notifier.sent == ["early", "late"] and not deadline.deferred
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import math
+import random
+from pathlib import Path
+
+from bot.drift import DriftMonitor, build_profile, ks, load_profile, profile_path, psi, save_profile
+
+
+def _profile(seed: int = 0):
+    rng = random.Random(seed)
+    rows = [[rng.gauss(0, 1), rng.uniform(0, 10)] for _ in range(2000)]
+    return build_profile(["x", "y"], rows, bins=10)
+
+
+def test_profile_bins_are_quantiles() -> None:
+    profile = _profile()
+    assert len(profile.edges["x"]) == 9
+    assert all(abs(p - 0.1) < 0.01 for p in profile.expected["x"][:-1])
+    assert profile.expected["x"][-1] == 0.0
+    assert psi(profile.expected["x"], profile.expected["x"]) == 0.0
+    assert ks([0.5, 0.5, 0.0], [0.0, 1.0, 0.0]) == 0.5
+
+
+def test_monitor_flags_shift_and_missing_only() -> None:
+    profile = _profile()
+    monitor = DriftMonitor(profile, window=200)
+    rng = random.Random(1)
+    for _ in range(200):
+        monitor.observe({"x": rng.gauss(0, 1), "y": rng.uniform(0, 10)})
+    assert monitor.alerts(min_samples=50) == {}
+    for i in range(200):
+        monitor.observe({"x": rng.gauss(2, 1), "y": math.nan if i % 5 == 0 else rng.uniform(0, 10)})
+    alerts = monitor.alerts(min_samples=50)
+    assert set(alerts) == {"x", "y"}
+    assert alerts["x"]["psi"] > 0.25
+    assert 0.15 < alerts["y"]["missing"] < 0.25
+    # Counts track the window exactly.
+    assert all(sum(c) == 200 for c in monitor.counts.values())
+
+
+def test_state_and_profile_roundtrip(tmp_path: Path) -> None:
+    model_dir = tmp_path / "v1"
+    model_dir.mkdir()
+    save_profile(_profile(), profile_path(model_dir))
+    assert load_profile(model_dir / "profile.json").edges == _profile().edges
+    state = tmp_path / "drift.state"
+
+    monitor = DriftMonitor.for_model(model_dir, state, window=50)
+    for v in range(60):
+        monitor.observe({"x": v / 30.0, "y": None})
+    monitor.save(state)
+    restored = DriftMonitor.for_model(model_dir, state, window=50)
+    assert restored.counts == monitor.counts and restored.n == 50
+
+    (tmp_path / "v2").mkdir()
+    save_profile(build_profile(["x", "y"], [[0.0, 0.0], [1.0, 1.0]], bins=2), profile_path(tmp_path / "v2"))
+    assert restored.sync_profile(tmp_path / "v2")
+    assert sum(restored.counts["x"]) == 50
+    assert DriftMonitor.for_model(tmp_path / "missing", state) is None
+
+
+def test_monitor_counts_each_bar_once(tmp_path: Path) -> None:
+    state = tmp_path / "drift.state"
+    monitor = DriftMonitor(_profile(), window=50)
+    assert monitor.observe({"x": 0.0, "y": 1.0}, ts=1000)
+    assert not monitor.observe({"x": 0.0, "y": 1.0}, ts=1000)
+    assert not monitor.observe({"x": 0.0, "y": 1.0}, ts=900)
+    assert monitor.n == 1
+    monitor.save(state)
+    restored = DriftMonitor.load(state, _profile(), window=50)
+    assert not restored.observe({"x": 0.0, "y": 1.0}, ts=1000)
+    assert restored.observe({"x": 0.0, "y": 1.0}, ts=2000) and restored.n == 2
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from bot.config import TradingConfig
+from bot.exec_algos import IcebergAlgo, TwapAlgo, get_algo
+from bot.execution import ExecutionEngine
+from bot.state_store import AlgoChild, AlgoOrder, StateStore
+
+
+class RequestTimeout(Exception):
+    pass
+
+
+def _parent(algo: str, params: dict, **kwargs) -> AlgoOrder:
+    return AlgoOrder(
+        algo_id="a1",
+        symbol="BTC/USDT",
+        side="buy",
+        algo=algo,
+        total_qty=1.0,
+        limit_px=20100.0,
+        status="active",
+        ts_created=0,
+        ts_next=0,
+        params=json.dumps(params),
+        **kwargs,
+    )
+
+
+def test_twap_slices_remaining_evenly() -> None:
+    parent = _parent("twap", {"slices": 4, "duration_ms": 4000}, filled_qty=0.25, slices_sent=1)
+    qty, wake = TwapAlgo().next_child(parent, [], 1000, random.Random(0))
+    assert qty == pytest.approx(0.25)
+    assert wake == 2000
+    parent.slices_sent = 4
+    assert TwapAlgo().exhausted(parent)
+
+
+def test_iceberg_waits_for_open_child_and_randomizes_size() -> None:
+    parent = _parent("iceberg", {"display_qty": 0.2, "jitter": 0.5, "interval_ms": 500})
+    open_child = AlgoChild("a1", 0, "c0", 0.2, 20000.0, "open", 0)
+    assert IcebergAlgo().next_child(parent, [open_child], 0, random.Random(0))[0] == 0.0
+    sizes = {IcebergAlgo().next_child(parent, [], 0, random.Random(seed))[0] for seed in range(5)}
+    assert len(sizes) > 1
+    assert all(0.1 <= size <= 0.3 for size in sizes)
+
+
+def test_unknown_algo_rejected() -> None:
+    with pytest.raises(ValueError):
+        get_algo("vwap")
+
+
+def _client(min_cost: float = 5) -> MagicMock:
+    client = MagicMock()
+    client.id = "binance"
+    client.market.return_value = {
+        "precision": {"price": 2, "amount": 3},
+        "limits": {"amount": {"min": 0.001}, "cost": {"min": min_cost}},
+    }
+    client.fetch_order_book.return_value = {"bids": [[20000.0, 1]], "asks": [[20000.1, 1]]}
+    return client
+
+
+def _events(path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_twap_engine_persists_children_and_protects_fills(temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.twap_slices = 2
+    cfg.order.twap_duration_s = 60
+    client = _client()
+    client.create_order.side_effect = [
+        {"id": "child-0", "status": "open"},
+        {"id": "sl", "status": "open"},
+        {"id": "tp", "status": "open"},
+        {"id": "child-1", "status": "open"},
+    ]
+    client.fetch_order.return_value = {"status": "closed", "filled": 0.01, "average": 20000.0}
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(client, store, cfg)
+        algo_id = engine.start_algo(
+            "BTC/USDT", "buy", 20000.0, 0.02, algo="twap", stop_px=19500, tp_px=21000, now_ms=1_000
+        )
+        (child,) = store.list_algo_children(algo_id)
+        assert child.oid == "child-0"
+        assert child.qty == pytest.approx(0.01)
+        assert engine.step_algos(now_ms=2_000) == 0
+        assert engine.step_algos(now_ms=31_000) == 1
+        parent = store.get_algo_order(algo_id)
+        assert parent.filled_qty == pytest.approx(0.01)
+        assert parent.slices_sent == 2
+        position = store.get_position("BTC/USDT")
+        assert position.qty == pytest.approx(0.01)
+        assert position.sl_order_id == "sl"
+        engine.step_algos(now_ms=61_000)
+        assert store.get_algo_order(algo_id).status == "done"
+        assert store.get_position("BTC/USDT").qty == pytest.approx(0.02)
+
+
+def test_iceberg_finishes_when_remainder_is_below_min_notional(temp_db, tmp_path) -> None:
+    cfg = TradingConfig()
+    cfg.order.iceberg_display_pct = 0.25
+    cfg.order.iceberg_jitter = 0.0
+    client = _client(min_cost=100)  # 0.005 BTC at 20k
+    client.create_order.side_effect = [
+        {"id": "child-0", "status": "open"},
+        {"id": "sl", "status": "open"},
+        {"id": "tp", "status": "open"},
+    ]
+    client.fetch_order.return_value = {"status": "closed", "filled": 0.005, "average": 20000.0}
+    log_path = tmp_path / "events.jsonl"
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(client, store, cfg, log_path=log_path)
+        algo_id = engine.start_algo(
+            "BTC/USDT", "buy", 20000.0, 0.008, algo="iceberg", stop_px=19500, tp_px=21000, now_ms=1_000
+        )
+        (child,) = store.list_algo_children(algo_id)
+        assert child.qty == pytest.approx(0.005)  # 0.002 slice bumped to the minimum
+        assert engine.step_algos(now_ms=61_000) == 0
+        parent = store.get_algo_order(algo_id)
+        assert parent.status == "done"
+        assert parent.filled_qty == pytest.approx(0.005)
+    assert client.create_order.call_count == 3
+    done = [e for e in _events(log_path) if e["evt"] == "algo_done"]
+    assert done[0]["reason"] == "remainder_below_min"
+    assert not [e for e in _events(log_path) if e["evt"] == "order_reject"]
+
+
+def test_algo_expiry_cancels_the_open_child(temp_db, tmp_path) -> None:
+    cfg = TradingConfig()
+    cfg.order.algo_max_duration_s = 120
+    client = _client()
+    client.create_order.return_value = {"id": "child-0", "status": "open"}
+    client.fetch_order.return_value = {"status": "open", "filled": 0.0}
+    log_path = tmp_path / "events.jsonl"
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(client, store, cfg, log_path=log_path)
+        algo_id = engine.start_algo("BTC/USDT", "buy", 20000.0, 0.05, algo="iceberg", now_ms=1_000)
+        engine.step_algos(now_ms=61_000)
+        assert store.get_algo_order(algo_id).status == "active"
+        client.cancel_order.assert_not_called()
+        engine.step_algos(now_ms=121_000)
+        assert store.get_algo_order(algo_id).status == "done"
+        (child,) = store.list_algo_children(algo_id)
+        assert child.status == "canceled"
+    client.cancel_order.assert_called_once_with("child-0", symbol="BTC/USDT")
+    done = [e for e in _events(log_path) if e["evt"] == "algo_done"]
+    assert done[0]["reason"] == "expired"
+
+
+def test_unconfirmed_child_is_tracked_and_adopted(temp_db) -> None:
+    cfg = TradingConfig()
+    client = _client()
+    client.create_order.side_effect = RequestTimeout("timeout")
+    client.fetch_order.side_effect = RequestTimeout("timeout")
+    client.fetch_open_orders.return_value = []
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(client, store, cfg)
+        algo_id = engine.start_algo("BTC/USDT", "buy", 20000.0, 0.05, algo="iceberg", now_ms=1_000)
+        (child,) = store.list_algo_children(algo_id)
+        assert child.status == "unknown"
+        (order,) = store.list_orders("BTC/USDT")
+        assert order.status == "unknown"
+        assert order.oid == order.client_order_id == child.oid
+        submits = client.create_order.call_count
+
+        client.fetch_order.side_effect = None
+        client.fetch_order.return_value = {"id": "venue-1", "status": "open", "filled": 0.0}
+        engine.step_algos(now_ms=61_000)
+        (child,) = store.list_algo_children(algo_id)
+        assert (child.oid, child.status) == ("venue-1", "open")
+        (order,) = store.list_orders("BTC/USDT")
+        assert (order.oid, order.status) == ("venue-1", "open")
+        # The adopted child is still resting, so no second slice goes out.
+        assert client.create_order.call_count == submits
+
+
+def test_unconfirmed_child_missing_on_venue_is_cancelled(temp_db) -> None:
+    cfg = TradingConfig()
+    client = _client()
+    client.create_order.side_effect = RequestTimeout("timeout")
+    client.fetch_order.side_effect = RequestTimeout("timeout")
+    client.fetch_open_orders.return_value = []
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(client, store, cfg)
+        algo_id = engine.start_algo("BTC/USDT", "buy", 20000.0, 0.05, algo="iceberg", now_ms=1_000)
+
+        class OrderNotFound(Exception):
+            pass
+
+        client.fetch_order.side_effect = OrderNotFound("unknown order")
+        client.create_order.side_effect = None
+        client.create_order.return_value = {"id": "child-1", "status": "open"}
+        assert engine.step_algos(now_ms=61_000) == 1
+        first, second = store.list_algo_children(algo_id)
+        assert first.status == "canceled"
+        assert (second.oid, second.status) == ("child-1", "open")
+        assert [o.oid for o in store.list_orders("BTC/USDT")] == ["child-1"]
@@ -81,6 +81,7 @@ def test_partial_fill_sets_protection(mock_client, temp_db) -> None:
 def test_protective_orders_reconciled_on_additional_fill(mock_client, temp_db) -> None:
     cfg = TradingConfig()
     cfg.order.ladder_levels = 1
+    mock_client.has = {"editOrder": False}
     mock_client.create_order.side_effect = [
         {"id": "limit1", "status": "closed", "filled": 0.01},
         {"id": "stop-new", "status": "open", "clientOrderId": "sl-new"},
@@ -178,3 +179,512 @@ def test_expire_orders_marks_stale(mock_client, temp_db) -> None:
         )
         engine.expire_orders("BTC/USDT", ttl_ms=1, now_ms=2000)
         assert store.list_orders("BTC/USDT") == []
+
+
+def test_account_settings_persisted_across_engines(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    mock_client.fetch_positions_risk.return_value = []
+    with StateStore(temp_db) as store:
+        ExecutionEngine(mock_client, store, cfg)._ensure_leverage("BTC/USDT")
+        ExecutionEngine(mock_client, store, cfg)._ensure_leverage("BTC/USDT")
+        cached = store.get_account_settings("BTC/USDT")
+    assert mock_client.set_margin_mode.call_count == 1
+    assert mock_client.set_leverage.call_count == 1
+    assert cached is not None
+    assert cached.margin_mode == "isolated"
+    assert cached.leverage == cfg.leverage
+
+
+def test_account_settings_only_push_differences(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    mock_client.fetch_positions_risk.return_value = [
+        {"symbol": "BTC/USDT", "marginMode": "isolated", "leverage": 5}
+    ]
+    with StateStore(temp_db) as store:
+        ExecutionEngine(mock_client, store, cfg)._ensure_leverage("BTC/USDT")
+    mock_client.set_margin_mode.assert_not_called()
+    mock_client.set_leverage.assert_called_once_with(cfg.leverage, "BTC/USDT")
+
+
+def test_account_settings_rechecked_after_ttl(monkeypatch, mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.venue.account_settings_ttl_s = 60
+    mock_client.fetch_positions_risk.return_value = [
+        {"symbol": "BTC/USDT", "marginMode": "isolated", "leverage": cfg.leverage}
+    ]
+    with StateStore(temp_db) as store:
+        monkeypatch.setattr("bot.execution.time.time", lambda: 1000.0)
+        ExecutionEngine(mock_client, store, cfg)._ensure_leverage("BTC/USDT")
+        monkeypatch.setattr("bot.execution.time.time", lambda: 1100.0)
+        ExecutionEngine(mock_client, store, cfg)._ensure_leverage("BTC/USDT")
+    assert mock_client.fetch_positions_risk.call_count == 2
+    mock_client.set_margin_mode.assert_not_called()
+    mock_client.set_leverage.assert_not_called()
+
+
+class RequestTimeout(Exception):
+    pass
+
+
+class OrderNotFound(Exception):
+    pass
+
+
+class InvalidOrder(Exception):
+    pass
+
+
+def test_ambiguous_submit_recovers_live_order(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    mock_client.create_order.side_effect = RequestTimeout("timeout")
+    mock_client.fetch_order.return_value = {"id": "venue-1", "status": "open", "filled": 0}
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        order_ids = engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01)
+        assert order_ids == ["venue-1"]
+        assert store.get_order("venue-1").status == "open"
+    assert mock_client.create_order.call_count == 1
+
+
+def test_ambiguous_submit_retries_when_confirmed_missing(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    mock_client.create_order.side_effect = [
+        RequestTimeout("timeout"),
+        {"id": "venue-2", "status": "open", "filled": 0},
+    ]
+    mock_client.fetch_order.side_effect = [OrderNotFound("missing"), {"status": "open", "filled": 0}]
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        assert engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01) == ["venue-2"]
+    assert mock_client.create_order.call_count == 2
+
+
+def test_unconfirmed_submit_recorded_as_unknown(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    mock_client.create_order.side_effect = RequestTimeout("timeout")
+    mock_client.fetch_order.side_effect = RequestTimeout("timeout")
+    mock_client.fetch_open_orders.return_value = []
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        assert engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01) == []
+        (order,) = store.list_orders("BTC/USDT")
+        assert order.status == "unknown"
+        assert order.reject_reason == "submit_unconfirmed"
+    assert mock_client.create_order.call_count == 1
+
+
+def _unknown_order(coid: str) -> Order:
+    return Order(
+        oid=coid,
+        symbol="BTC/USDT",
+        side="buy",
+        qty=0.01,
+        px=20000,
+        status="unknown",
+        ts_created=0,
+        ts_updated=0,
+        post_only=True,
+        client_order_id=coid,
+        maker=True,
+        fee=0.0,
+        reject_reason="submit_unconfirmed",
+    )
+
+
+def test_expire_orders_resolves_unknown_rows(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    found = {"coid-live": {"id": "venue-9", "status": "open", "filled": 0.004, "average": 19990}}
+
+    def fetch_order(oid, symbol=None, params=None):
+        if oid in found:
+            return found[oid]
+        raise OrderNotFound(oid)
+
+    mock_client.fetch_order.side_effect = fetch_order
+    mock_client.cancel_order.return_value = {"filled": 0.004, "average": 19990}
+    with StateStore(temp_db) as store:
+        store.upsert_order(_unknown_order("coid-live"))
+        store.upsert_order(_unknown_order("coid-gone"))
+        engine = ExecutionEngine(mock_client, store, cfg)
+        assert engine.expire_orders("BTC/USDT", ttl_ms=1, now_ms=2000) == 1
+        assert store.list_orders("BTC/USDT") == []
+        assert sum(f.qty for f in store.list_fills("venue-9")) == pytest.approx(0.004)
+    # Only the adopted venue id is cancelled, never a client id.
+    mock_client.cancel_order.assert_called_once_with("venue-9", symbol="BTC/USDT")
+
+
+def test_expire_orders_keeps_unresolved_unknown(mock_client, temp_db) -> None:
+    mock_client.fetch_order.side_effect = RequestTimeout("timeout")
+    mock_client.fetch_open_orders.return_value = []
+    with StateStore(temp_db) as store:
+        store.upsert_order(_unknown_order("coid-x"))
+        engine = ExecutionEngine(mock_client, store, TradingConfig())
+        assert engine.expire_orders("BTC/USDT", ttl_ms=1, now_ms=2000) == 0
+        (order,) = store.list_orders("BTC/USDT")
+        assert order.status == "unknown"
+    mock_client.cancel_order.assert_not_called()
+
+
+def test_definitive_submit_error_skips_lookup(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    mock_client.create_order.side_effect = InvalidOrder("post only would cross")
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01)
+        (order,) = store.list_orders("BTC/USDT")
+        assert order.status == "rejected"
+        assert order.reject_reason == "submit_error"
+    mock_client.fetch_order.assert_not_called()
+
+
+def _seed_protected_position(store: StateStore, cfg: TradingConfig) -> None:
+    for oid, px in (("sl-old", 19500), ("tp-old", 21000)):
+        store.upsert_order(
+            Order(
+                oid=oid,
+                symbol="BTC/USDT",
+                side="sell",
+                qty=0.01,
+                px=px,
+                status="open",
+                ts_created=0,
+                ts_updated=0,
+                post_only=False,
+                client_order_id=oid,
+                maker=False,
+            )
+        )
+    store.set_position(
+        Position(
+            symbol="BTC/USDT",
+            side="buy",
+            qty=0.01,
+            entry_px=20000,
+            sl_px=19500,
+            tp_px=21000,
+            leverage=cfg.leverage,
+            ts_open=0,
+            tp_order_id="tp-old",
+            sl_order_id="sl-old",
+        )
+    )
+
+
+def test_protective_orders_amended_in_place(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    mock_client.has = {"editOrder": True}
+    mock_client.create_order.side_effect = [{"id": "limit1", "status": "closed", "filled": 0.01}]
+    mock_client.edit_order.side_effect = [
+        {"id": "sl-old", "status": "open"},
+        {"id": "tp-old", "status": "open"},
+    ]
+    with StateStore(temp_db) as store:
+        _seed_protected_position(store, cfg)
+        engine = ExecutionEngine(mock_client, store, cfg)
+        engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01, stop_px=19500, tp_px=21000)
+        pos = store.get_position("BTC/USDT")
+        assert pos.sl_order_id == "sl-old"
+        assert pos.tp_order_id == "tp-old"
+        assert store.get_order("sl-old").qty == pytest.approx(0.02)
+    assert mock_client.edit_order.call_count == 2
+    assert mock_client.create_order.call_count == 1
+    mock_client.cancel_order.assert_not_called()
+
+
+def test_protective_replace_places_before_cancel(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    mock_client.has = {"editOrder": True}
+    mock_client.edit_order.side_effect = RuntimeError("not supported for conditional orders")
+    calls: list[str] = []
+    responses = iter(
+        [
+            {"id": "limit1", "status": "closed", "filled": 0.01},
+            {"id": "stop-new", "status": "open"},
+            {"id": "tp-new", "status": "open"},
+        ]
+    )
+
+    def create_order(**kwargs):
+        calls.append(f"create:{kwargs['type']}")
+        return next(responses)
+
+    mock_client.create_order.side_effect = create_order
+    mock_client.cancel_order.side_effect = lambda oid, symbol=None: calls.append(f"cancel:{oid}")
+    with StateStore(temp_db) as store:
+        _seed_protected_position(store, cfg)
+        engine = ExecutionEngine(mock_client, store, cfg)
+        engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01, stop_px=19500, tp_px=21000)
+        pos = store.get_position("BTC/USDT")
+        assert pos.sl_order_id == "stop-new"
+        assert pos.tp_order_id == "tp-new"
+    assert calls == [
+        "create:limit",
+        "create:stop_market",
+        "cancel:sl-old",
+        "create:limit",
+        "cancel:tp-old",
+    ]
+
+
+
+def test_protective_leg_without_target_cancels_old_order(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    mock_client.has = {"editOrder": False}
+    mock_client.create_order.side_effect = [
+        {"id": "limit1", "status": "closed", "filled": 0.01},
+        {"id": "stop-new", "status": "open"},
+    ]
+    with StateStore(temp_db) as store:
+        _seed_protected_position(store, cfg)
+        pos = store.get_position("BTC/USDT")
+        pos.tp_px = 0.0
+        store.set_position(pos)
+        engine = ExecutionEngine(mock_client, store, cfg)
+        engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01, stop_px=19500, tp_px=None)
+        pos = store.get_position("BTC/USDT")
+        assert pos.sl_order_id == "stop-new"
+        assert pos.tp_order_id is None
+        assert store.get_order("tp-old") is None
+    cancelled = [c.args[0] for c in mock_client.cancel_order.call_args_list]
+    assert cancelled == ["sl-old", "tp-old"]
+
+def test_native_brackets_skip_separate_protection(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    cfg.order.native_brackets = True
+    mock_client.id = "bybit"
+    mock_client.create_order.return_value = {"id": "entry1", "status": "closed", "filled": 0.01}
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01, stop_px=19500, tp_px=21000)
+        position = store.get_position("BTC/USDT")
+        assert position is not None
+        assert position.sl_order_id is None
+        assert position.tp_order_id is None
+    assert mock_client.create_order.call_count == 1
+    params = mock_client.create_order.call_args.kwargs["params"]
+    assert params["stopLoss"]["triggerPrice"] == 19500.0
+    assert params["takeProfit"]["triggerPrice"] == 21000.0
+
+
+def _resting(store: StateStore, oid: str, side: str, px: float) -> None:
+    store.upsert_order(
+        Order(
+            oid=oid,
+            symbol="BTC/USDT",
+            side=side,
+            qty=0.01,
+            px=px,
+            status="open",
+            ts_created=500,
+            ts_updated=500,
+            post_only=True,
+            client_order_id=f"c-{oid}",
+        )
+    )
+
+
+@pytest.mark.parametrize("levels,depth", [(3, 5), (6, 10), (8, 10), (20, 20), (30, 50), (2000, 1000)])
+def test_order_book_depth_snaps_to_supported_limit(mock_client, temp_db, levels, depth) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = levels
+    mock_client.fetch_order_book.return_value = {"bids": [[1.0, 1]], "asks": [[1.1, 1]]}
+    with StateStore(temp_db) as store:
+        ExecutionEngine(mock_client, store, cfg)._order_book("BTC/USDT")
+    mock_client.fetch_order_book.assert_called_once_with("BTC/USDT", limit=depth)
+
+
+def test_reprice_amends_only_drifted_levels(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    mock_client.has = {"editOrder": True}
+    mock_client.fetch_order_book.return_value = {"bids": [[20200.0, 1]], "asks": [[20201.0, 1]]}
+    mock_client.edit_order.return_value = {"id": "b2", "status": "open"}
+    with StateStore(temp_db) as store:
+        _resting(store, "b1", "buy", 20200.0)
+        _resting(store, "b2", "buy", 19990.0)
+        engine = ExecutionEngine(mock_client, store, cfg)
+        assert engine.reprice_ladder("BTC/USDT", drift_bp=5) == 1
+        moved = store.get_order("b2")
+        assert moved.px == pytest.approx(20189.9)
+        assert moved.ts_created == 500
+        assert store.get_order("b1").px == 20200.0
+    mock_client.edit_order.assert_called_once()
+
+
+def test_reprice_respects_request_budget(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    mock_client.has = {"editOrder": False}
+    mock_client.fetch_order_book.return_value = {"bids": [[21000.0, 1]], "asks": [[21001.0, 1]]}
+    mock_client.cancel_order.return_value = {"id": "b1", "status": "canceled", "filled": 0}
+    mock_client.create_order.return_value = {"id": "new", "status": "open"}
+    with StateStore(temp_db) as store:
+        _resting(store, "b1", "buy", 20000.0)
+        _resting(store, "b2", "buy", 19990.0)
+        engine = ExecutionEngine(mock_client, store, cfg)
+        assert engine.reprice_ladder("BTC/USDT", max_requests=3) == 1
+        assert store.get_order("b1") is None
+        assert store.get_order("new").px == 21000.0
+    mock_client.cancel_order.assert_called_once_with("b1", symbol="BTC/USDT")
+
+
+def test_reprice_replace_resends_only_unfilled_qty(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    mock_client.has = {"editOrder": False}
+    mock_client.fetch_order_book.return_value = {"bids": [[21000.0, 1]], "asks": [[21001.0, 1]]}
+    mock_client.cancel_order.return_value = {"id": "b1", "status": "canceled", "filled": None}
+    mock_client.fetch_order.side_effect = [
+        {"id": "b1", "status": "canceled", "filled": 0.004, "average": 20000.0},
+        {"id": "b2", "status": "canceled", "filled": 0.0095, "average": 19990.0},
+    ]
+    mock_client.create_order.return_value = {"id": "new", "status": "open"}
+    with StateStore(temp_db) as store:
+        _resting(store, "b1", "buy", 20000.0)
+        _resting(store, "b2", "buy", 19990.0)
+        engine = ExecutionEngine(mock_client, store, cfg)
+        assert engine.reprice_ladder("BTC/USDT", max_requests=10) == 1
+        assert store.get_order("new").qty == pytest.approx(0.006)
+        # b2's 0.0005 remainder is below min_qty: dropped, not re-posted.
+        assert store.get_order("b2") is None
+        assert sum(f.qty for f in store.list_fills("new")) == pytest.approx(0.004)
+        assert sum(f.qty for f in store.list_fills("b2")) == pytest.approx(0.0095)
+    assert mock_client.create_order.call_args.kwargs["amount"] == pytest.approx(0.006)
+
+
+def test_submit_ladder_records_latency_spans(mock_client, temp_db) -> None:
+    import time
+
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    mock_client.create_order.side_effect = [
+        {"id": "entry", "status": "closed", "filled": 0.01},
+        {"id": "sl", "status": "open"},
+        {"id": "tp", "status": "open"},
+    ]
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        engine.submit_ladder(
+            "BTC/USDT",
+            "buy",
+            price=20000,
+            qty=0.01,
+            stop_px=19500,
+            tp_px=21000,
+            decided_at=time.monotonic(),
+        )
+        hists = store.get_latency_histograms("binance")
+    endpoints = {endpoint for _, endpoint in hists}
+    assert {"signal_to_submit", "create_order", "fill_to_protection"} <= endpoints
+    assert sum(hists[("binance", "create_order")].values()) == 3
+
+
+def test_book_ladder_improves_wide_spread_and_stays_post_only(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    mock_client.fetch_order_book.return_value = {
+        "bids": [[20000.0, 1.0], [19999.0, 2.0], [19980.0, 3.0]],
+        "asks": [[20000.5, 1.0], [20001.0, 2.0]],
+    }
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        buys = engine._book_ladder_prices("BTC/USDT", "buy")
+        sells = engine._book_ladder_prices("BTC/USDT", "sell")
+    assert buys[0] == pytest.approx(20000.01)
+    assert all(px < 20000.5 for px in buys)
+    assert buys[1] <= 19999.0 and buys[2] <= 19980.0
+    assert sells[0] == pytest.approx(20000.49)
+    assert all(px > 20000.0 for px in sells)
+    assert sells == sorted(sells)
+
+
+def test_submit_ladder_uses_cached_book(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    mock_client.fetch_order_book.return_value = {
+        "bids": [[20100.0, 1.0]],
+        "asks": [[20100.1, 1.0]],
+    }
+    mock_client.create_order.return_value = {"id": "o", "status": "open", "filled": 0}
+    mock_client.fetch_order.return_value = {"status": "open", "filled": 0}
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.03)
+        engine._top_of_book("BTC/USDT")
+    prices = [c.kwargs["price"] for c in mock_client.create_order.call_args_list]
+    assert prices[0] == pytest.approx(20100.0)
+    assert all(px < 20100.1 for px in prices)
+    assert mock_client.fetch_order_book.call_count == 1
+
+
+def test_expire_orders_settles_level_that_filled_before_cancel(mock_client, temp_db) -> None:
+    mock_client.cancel_order.side_effect = OrderNotFound("unknown order")
+    mock_client.fetch_order.side_effect = lambda oid, symbol=None: {
+        "filled": {"done": None, "busy": 0.004}[oid],
+        "status": {"done": "closed", "busy": "open"}[oid],
+        "average": 19990,
+    }
+    with StateStore(temp_db) as store:
+        _resting(store, "done", "buy", 19990)
+        _resting(store, "busy", "buy", 19980)
+        engine = ExecutionEngine(mock_client, store, TradingConfig())
+        assert engine.expire_orders("BTC/USDT", ttl_ms=1, now_ms=2000) == 1
+        # A closed order without a reported fill counts as fully filled.
+        assert sum(f.qty for f in store.list_fills("done")) == pytest.approx(0.01)
+        # Still open on the venue: kept for the next cycle, nothing recorded yet.
+        assert [o.oid for o in store.list_orders("BTC/USDT")] == ["busy"]
+        assert store.list_fills("busy") == []
+
+
+@pytest.mark.parametrize("can_amend", [True, False])
+def test_reprice_keeps_native_bracket_legs(mock_client, temp_db, can_amend) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    cfg.order.native_brackets = True
+    cfg.order.book_aware = False
+    mock_client.id = "bybit"
+    mock_client.has = {"editOrder": can_amend}
+    mock_client.create_order.return_value = {"id": "entry1", "status": "open", "filled": 0}
+    mock_client.edit_order.return_value = {"id": "entry1", "status": "open"}
+    mock_client.fetch_order.return_value = {"id": "entry1", "status": "open", "filled": 0}
+    mock_client.cancel_order.return_value = {"id": "entry1", "status": "canceled", "filled": 0}
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01, stop_px=19500, tp_px=21000)
+        mock_client.create_order.return_value = {"id": "entry2", "status": "open", "filled": 0}
+        mock_client.fetch_order_book.return_value = {"bids": [[20500.0, 1]], "asks": [[20501.0, 1]]}
+        assert engine.reprice_ladder("BTC/USDT", drift_bp=5) == 1
+        (order,) = store.list_orders("BTC/USDT")
+        assert (order.stop_loss, order.take_profit) == (19500.0, 21000.0)
+    if can_amend:
+        params = mock_client.edit_order.call_args.args[6]
+    else:
+        params = mock_client.create_order.call_args.kwargs["params"]
+    assert params["stopLoss"]["triggerPrice"] == 19500.0
+    assert params["takeProfit"]["triggerPrice"] == 21000.0
+
+
+def test_adopted_unknown_order_joins_tca(mock_client, temp_db) -> None:
+    cfg = TradingConfig()
+    cfg.order.ladder_levels = 1
+    cfg.order.book_aware = False
+    mock_client.create_order.side_effect = RequestTimeout("timeout")
+    mock_client.fetch_order.side_effect = RequestTimeout("timeout")
+    mock_client.fetch_open_orders.return_value = []
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(mock_client, store, cfg)
+        engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.01)
+        (order,) = store.list_orders("BTC/USDT")
+        assert order.status == "unknown"
+        mock_client.fetch_order.side_effect = None
+        mock_client.fetch_order.return_value = {
+            "id": "venue-9", "status": "closed", "filled": 0.01, "average": 19990
+        }
+        engine.expire_orders("BTC/USDT", ttl_ms=1)
+        store.refresh_tca_stats()
+        (stats,) = store.list_tca_stats()
+    assert stats["n_orders"] == 1
+    assert stats["qty_filled"] == pytest.approx(0.01)
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from bot.latency import LatencyRecorder, TimedClient, bucket_for, bucket_upper_ms, percentile
+from bot.state_store import StateStore
+from reporting.latency import latency_report
+
+
+def test_bucket_edges_cover_sample() -> None:
+    for ms in (0.05, 1.0, 37.5, 950.0, 12_000.0):
+        bucket = bucket_for(ms)
+        assert bucket_upper_ms(bucket) >= ms or bucket == 0
+        if bucket > 0:
+            assert bucket_upper_ms(bucket - 1) < ms
+
+
+def test_percentile_from_histogram() -> None:
+    hist = {bucket_for(10.0): 90, bucket_for(500.0): 10}
+    assert percentile(hist, 0.5) == pytest.approx(bucket_upper_ms(bucket_for(10.0)))
+    assert percentile(hist, 0.99) == pytest.approx(bucket_upper_ms(bucket_for(500.0)))
+    assert percentile({}, 0.5) is None
+
+
+def test_timed_client_persists_histograms(temp_db: Path) -> None:
+    client = MagicMock()
+    client.id = "binanceusdm"
+    with StateStore(temp_db) as store:
+        recorder = LatencyRecorder(store, "binanceusdm")
+        timed = TimedClient(client, recorder)
+        timed.create_order(symbol="BTC/USDT")
+        timed.create_order(symbol="BTC/USDT")
+        timed.fetch_ohlcv("BTC/USDT")
+        recorder.record("fill_to_protection", 42.0)
+        recorder.flush()
+        recorder.record("fill_to_protection", 42.0)
+        recorder.flush()
+    rows = {row["endpoint"]: row for row in latency_report(temp_db)}
+    assert rows["create_order"]["count"] == 2
+    assert rows["fill_to_protection"]["count"] == 2
+    assert rows["fill_to_protection"]["p50_ms"] >= 42.0
+    assert "fetch_ohlcv" not in rows
@@ -6,7 +6,7 @@ import pytest
 
 from math import inf, nan
 
-from bot.model_infer import ModelInferer
+from bot.model_infer import InferenceCache, ModelInferer
 
 
 def _model_path() -> Path:
@@ -37,3 +37,66 @@ def test_model_infer_rejects_non_finite_values(bad_value: object) -> None:
     features = {"atr": 1.0, "adx": 1.0, "ret": 0.0, "vol": 0.0}
     features["ret"] = bad_value  # type: ignore[index]
     assert inferer.predict_proba(features) is None
+
+
+def test_predict_proba_batch_matches_single_row() -> None:
+    inferer = ModelInferer(model_path=_model_path())
+    rows = [
+        {"atr": 500.0, "adx": 40.0, "ret": 0.01, "vol": 0.002},
+        {"atr": 120.0, "adx": 12.0, "ret": -0.02, "vol": 0.01},
+    ]
+    names = inferer.feature_names
+    batch = inferer.predict_proba_batch([[row[n] for n in names] for row in rows])
+    assert len(batch) == 2 and not batch.errors
+    for i, row in enumerate(rows):
+        single = inferer.predict_proba(row)
+        assert batch.buy[i] == pytest.approx(single["buy"], rel=1e-12)
+        assert batch.raw_margin[i] == pytest.approx(single["debug_raw_margin"], rel=1e-12)
+
+
+def test_predict_proba_batch_reorders_columns_and_flags_bad_rows() -> None:
+    inferer = ModelInferer(model_path=_model_path())
+    columns = list(reversed(inferer.feature_names)) + ["extra"]
+    good = {"atr": 1.0, "adx": 2.0, "ret": 0.0, "vol": 0.1, "extra": 9.0}
+    matrix = [
+        [good[c] for c in columns],
+        [nan if c == "ret" else good[c] for c in columns],
+        [1.0],
+    ]
+    batch = inferer.predict_proba_batch(matrix, columns=columns)
+    assert batch.buy[0] == pytest.approx(inferer.predict_proba(good)["buy"])
+    assert set(batch.errors) == {1, 2}
+    assert batch.buy[1] != batch.buy[1]
+    with pytest.raises(ValueError):
+        inferer.predict_proba_batch([[1.0]], columns=["atr"])
+
+
+def test_predict_proba_memoizes_by_version_and_features() -> None:
+    inferer = ModelInferer(model_path=_model_path())
+    row = {name: 0.5 for name in inferer.feature_names}
+    first = inferer.predict_proba(row)
+    first["buy"] = -1.0  # callers cannot corrupt the cached entry
+    again = inferer.predict_proba(dict(reversed(list(row.items()))))
+    assert again is not None and 0.0 <= again["buy"] <= 1.0
+    assert inferer.cache.hits == 1 and inferer.cache.misses == 1
+    zero = {name: 0.0 for name in inferer.feature_names}
+    inferer.predict_proba(zero)
+    inferer.predict_proba({name: -0.0 for name in inferer.feature_names})
+    assert inferer.cache.stats()["hit_rate"] == pytest.approx(0.5)
+
+    inferer.model.bias += 1.0
+    inferer.clear_cache()
+    assert inferer.predict_proba(row)["buy"] > again["buy"]
+
+
+def test_inference_cache_lru_and_ttl() -> None:
+    now = [0.0]
+    cache = InferenceCache(maxsize=2, ttl_s=10.0, clock=lambda: now[0])
+    cache.put(("v", b"a"), {"buy": 0.1})
+    cache.put(("v", b"b"), {"buy": 0.2})
+    assert cache.get(("v", b"a")) == {"buy": 0.1}
+    cache.put(("v", b"c"), {"buy": 0.3})
+    assert cache.get(("v", b"b")) is None and cache.evictions == 1
+    now[0] = 11.0
+    assert cache.get(("v", b"a")) is None and cache.expirations == 1
+    assert len(cache) == 1
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from bot.artifact import ArtifactError
+from bot.model_infer import LoadedModel, ModelInferer
+from bot.model_registry import ModelRegistry
+
+ROW = {"a": 1.0, "b": 2.0}
+
+
+def _model(weight: float) -> LoadedModel:
+    return LoadedModel(["a", "b"], "unused", {"a": weight, "b": 0.0}, 0.0)
+
+
+def _bump(path: Path) -> None:
+    # Guarantee a visible mtime change even on coarse-grained filesystems.
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_publish_activate_and_list(tmp_path: Path) -> None:
+    registry = ModelRegistry(tmp_path)
+    registry.publish(_model(0.5), version="v1", activate=True)
+    registry.publish(_model(1.0), version="v2")
+    assert registry.versions() == ["v1", "v2"]
+    assert registry.active_version() == "v1"
+    with pytest.raises(FileExistsError):
+        registry.publish(_model(1.0), version="v2")
+    with pytest.raises(ValueError):
+        registry.path_for("../escape")
+
+
+def test_inferer_swaps_when_pointer_moves(tmp_path: Path) -> None:
+    registry = ModelRegistry(tmp_path)
+    registry.publish(_model(0.5), version="v1", activate=True)
+    inferer = ModelInferer(tmp_path)
+    assert inferer.version == "v1"
+    before = inferer.predict_proba(ROW)["debug_raw_margin"]
+    assert inferer.reload_if_changed() is False
+
+    registry.publish(_model(2.0), version="v2", activate=True)
+    _bump(registry.active_file)
+    assert inferer.reload_if_changed(warmup_rows=[ROW]) is True
+    assert inferer.version == "v2"
+    assert inferer.predict_proba(ROW)["debug_raw_margin"] == pytest.approx(4 * before)
+
+
+def test_corrupt_or_unscorable_version_is_not_promoted(tmp_path: Path) -> None:
+    registry = ModelRegistry(tmp_path)
+    registry.publish(_model(0.5), version="v1", activate=True)
+    inferer = ModelInferer(tmp_path)
+
+    registry.publish(LoadedModel(["a", "c"], "x", {"a": 1.0}, 0.0), version="v2", activate=True)
+    _bump(registry.active_file)
+    assert inferer.reload_if_changed(warmup_rows=[ROW]) is False
+    assert inferer.version == "v1"
+
+    registry.publish(_model(3.0), version="v3", activate=True)
+    (tmp_path / "v3" / "arrays.bin").write_bytes(b"\0" * 16)
+    _bump(registry.active_file)
+    assert inferer.reload_if_changed(warmup_rows=[ROW]) is False
+    assert inferer.version == "v1"
+    with pytest.raises(ArtifactError):
+        registry.activate("v3")
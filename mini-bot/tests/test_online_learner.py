@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import math
+import random
+from pathlib import Path
+
+import pytest
+
+from bot.drift import build_profile
+from bot.feature_engine import FeatureRow
+from bot.model_infer import LoadedModel
+from bot.online_learner import OnlineLearner, OnlineParams
+from bot.training import LabelConfig
+
+
+def _base(version: str = "v1", weights: dict | None = None) -> LoadedModel:
+    return LoadedModel(["a", "b"], version, weights or {"a": 0.0, "b": 0.0}, 0.0)
+
+
+def _stream(n: int, seed: int = 5):
+    rng = random.Random(seed)
+    for _ in range(n):
+        a, b = rng.gauss(0, 100), rng.gauss(0, 1)
+        yield [a, b], 1 if rng.random() < 1 / (1 + math.exp(-a / 50)) else 0
+
+
+def _row(ts: int, close: float) -> FeatureRow:
+    return FeatureRow(ts, close, close, close, close, 1.0, 1.0, 20.0, 0.0, 0.01)
+
+
+def test_warm_start_reproduces_base_weights() -> None:
+    base = _base(weights={"a": 0.02, "b": -0.7})
+    base.bias = 0.3
+    learner = OnlineLearner(base, OnlineParams(l1=0.01))
+    learner.scale = [50.0, 2.0]
+    learner._reset_accumulators()
+    weights, bias = learner.weights()
+    assert weights["a"] == pytest.approx(0.02)
+    assert weights["b"] == pytest.approx(-0.7)
+    assert bias == pytest.approx(0.3)
+
+
+def test_scale_comes_from_training_profile_not_first_row() -> None:
+    rows = [row for row, _ in _stream(500)]
+    profile = build_profile(["a", "b"], rows)
+    learner = OnlineLearner(_base(), profile=profile)
+    assert learner.scale == [pytest.approx(profile.spread("a")), pytest.approx(profile.spread("b"))]
+    assert 150 < learner.scale[0] < 350 and 1.5 < learner.scale[1] < 3.5
+    learner.update([1e-9, 1e6], 1)
+    assert learner.scale == [pytest.approx(profile.spread("a")), pytest.approx(profile.spread("b"))]
+    # Without a profile a tiny first row no longer blows up the step size.
+    bare = OnlineLearner(_base())
+    bare.update([1e-9, 1e-9], 1)
+    assert bare.scale == [1.0, 1.0]
+
+
+def test_updates_learn_signal_and_beat_base() -> None:
+    learner = OnlineLearner(_base(), OnlineParams(alpha=0.1, window=500, max_prob_shift=1.0))
+    for row, label in _stream(1500):
+        learner.update(row, label)
+    weights, _ = learner.weights()
+    assert weights["a"] > 0.005
+    metrics = learner.metrics()
+    assert metrics["logloss_online"] < metrics["logloss_base"]
+    assert learner.guard() is None
+
+
+def test_guard_restores_base_weights_and_freezes() -> None:
+    learner = OnlineLearner(_base(), OnlineParams(alpha=0.1, min_samples=20, max_prob_shift=0.01))
+    for row, label in _stream(50):
+        learner.update(row, label)
+    model = _base()
+    summary = learner.step(model, [])
+    assert summary["tripped"] == "calibration_drift"
+    assert model.weights == {"a": 0.0, "b": 0.0} and model.bias == 0.0
+    updates = learner.updates
+    learner.observe(1, {"a": 1.0, "b": 1.0})
+    learner.resolve([_row(1, 100.0), _row(2, 90.0), _row(3, 80.0)])
+    assert learner.updates == updates
+    # Publishing a new version clears the freeze.
+    learner.step(_base("v2"), [])
+    assert learner.frozen is None and learner.base_version == "v2"
+
+
+def test_resolve_waits_for_horizon() -> None:
+    learner = OnlineLearner(_base(), label_cfg=LabelConfig(horizon_bars=2, k_tp=1.0, k_sl=1.0))
+    learner.observe(1, {"a": 5.0, "b": 1.0})
+    history = [_row(1, 100.0), _row(2, 100.5)]
+    assert learner.resolve(history) == 0 and len(learner.pending) == 1
+    history.append(_row(3, 102.0))
+    assert learner.resolve(history) == 1 and not learner.pending
+    assert learner.window[-1][2] == 1
+
+
+def test_state_roundtrip_and_version_reset(tmp_path: Path) -> None:
+    path = tmp_path / "online.state"
+    learner = OnlineLearner.load(path, _base())
+    for row, label in _stream(40):
+        learner.update(row, label)
+    learner.observe(7, {"a": 1.0, "b": 2.0})
+    learner.save()
+    assert not path.with_name("online.state.tmp").exists()
+
+    restored = OnlineLearner.load(path, _base())
+    assert restored.weights() == learner.weights()
+    assert restored.updates == 40 and list(restored.pending) == [(7, [1.0, 2.0])]
+    assert OnlineLearner.load(path, _base("v2")).updates == 0
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import csv
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from bot.config import TradingConfig
+from bot.data_ingest import timeframe_to_seconds
+from bot.execution import ExecutionEngine
+from bot.model_infer import BatchPrediction
+from bot.notifier import TelegramNotifier
+from bot.portfolio import parse_symbols, run_portfolio
+from bot.run_cycle import CycleRuntime, _current_utc_day_start, run_runtime_cycle
+from bot.state_store import AlgoOrder, Position, StateStore
+
+FIXTURE_PATH = Path(__file__).parent / "fixtures" / "candles_sample.csv"
+SYMBOLS = ["BTC/USDT:USDT", "ETH/USDT:USDT", "SOL/USDT:USDT"]
+
+
+class PortfolioClient:
+    def __init__(self) -> None:
+        limits = {"limits": {"amount": {"min": 0.001}, "cost": {"min": 10}}}
+        self.markets = {symbol: limits for symbol in SYMBOLS}
+        self.calls: dict[str, int] = {}
+        self.ohlcv_threads: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def market(self, symbol):
+        return self.markets.get(symbol, {})
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=None, since=None):
+        self._count("fetch_ohlcv")
+        self.ohlcv_threads.add(threading.current_thread().name)
+        tf_ms = timeframe_to_seconds(timeframe) * 1000
+        with FIXTURE_PATH.open() as f:
+            return [
+                [int(r["ts_close"]) - tf_ms] + [float(r[k]) for k in ("open", "high", "low", "close", "volume")]
+                for r in csv.DictReader(f)
+            ]
+
+    def fetch_balance(self):
+        self._count("fetch_balance")
+        return {"free": {"USDT": 1000.0}, "total": {"USDT": 1000.0}}
+
+    def fetch_funding_rates(self, symbols):
+        self._count("fetch_funding_rates")
+        return {symbol: {"fundingRate": 0.0} for symbol in symbols}
+
+    def fetch_funding_rate(self, symbol):
+        self._count("fetch_funding_rate")
+        return {"fundingRate": 0.0}
+
+    def create_order(self, **kwargs):
+        price = kwargs.get("price") or kwargs.get("params", {}).get("stopPrice", 0.0)
+        return {"id": f"{kwargs.get('symbol')}-{float(price):.2f}", "status": "open", "filled": 0}
+
+    def cancel_order(self, oid, symbol=None):
+        pass
+
+    def set_margin_mode(self, mode, symbol):
+        pass
+
+    def set_leverage(self, leverage, symbol):
+        pass
+
+
+class RankedInferer:
+    """Batch scorer giving each row (symbol) its own conviction."""
+
+    def __init__(self, buys) -> None:
+        self.buys = buys
+        self.batches = 0
+
+    def predict_proba_batch(self, matrix, columns=None):
+        self.batches += 1
+        buy = array("d", self.buys[: len(matrix)])
+        sell = array("d", [1.0 - b for b in buy])
+        return BatchPrediction(buy, sell, buy, array("d", [0.0]) * len(matrix))
+
+
+def _cfg(max_positions: int) -> TradingConfig:
+    cfg = TradingConfig()
+    cfg.symbols = ",".join(SYMBOLS)
+    cfg.max_positions = max_positions
+    cfg.regime.adx_min = 0
+    cfg.regime.atr_pct_min = 0
+    cfg.regime.atr_pct_max = 10
+    return cfg
+
+
+def _notifier(tmp_path: Path) -> TelegramNotifier:
+    return TelegramNotifier(None, None, freeze_path=tmp_path / "notify.freeze", max_failures=3)
+
+
+def test_parse_symbols_falls_back_to_symbol() -> None:
+    cfg = TradingConfig()
+    assert parse_symbols(cfg) == [cfg.symbol]
+    cfg.symbols = "A/USDT, B/USDT,A/USDT"
+    assert parse_symbols(cfg) == ["A/USDT", "B/USDT"]
+
+
+def test_portfolio_shares_calls_and_fills_slots_by_conviction(tmp_path: Path) -> None:
+    client = PortfolioClient()
+    inferer = RankedInferer([0.7, 0.9, 0.8])
+    with StateStore(tmp_path / "test.db") as store:
+        result = run_portfolio(client, store, _cfg(2), inferer, _notifier(tmp_path), nav=1000.0)
+    statuses = {s: r["status"] for s, r in result["symbols"].items()}
+    assert statuses == {SYMBOLS[0]: "max_position", SYMBOLS[1]: "ok", SYMBOLS[2]: "ok"}
+    assert client.calls["fetch_ohlcv"] == 3
+    assert client.calls["fetch_balance"] == 1
+    assert client.calls["fetch_funding_rates"] == 1
+    assert "fetch_funding_rate" not in client.calls
+    assert inferer.batches == 1
+    assert all(name.startswith("portfolio") for name in client.ohlcv_threads)
+
+
+def test_portfolio_counts_existing_positions(tmp_path: Path) -> None:
+    client = PortfolioClient()
+    with StateStore(tmp_path / "test.db") as store:
+        store.set_position(Position(SYMBOLS[2], "buy", 0.01, 20000, 19000, 21000, 3, 0))
+        result = run_portfolio(
+            client, store, _cfg(2), RankedInferer([0.9, 0.8, 0.95]), _notifier(tmp_path), nav=1000.0
+        )
+    statuses = {s: r["status"] for s, r in result["symbols"].items()}
+    assert statuses == {SYMBOLS[0]: "ok", SYMBOLS[1]: "max_position", SYMBOLS[2]: "max_position"}
+    assert len(result["orders"]) == 3
+
+
+def test_portfolio_counts_working_algo_parents(tmp_path: Path) -> None:
+    client = PortfolioClient()
+    with StateStore(tmp_path / "test.db") as store:
+        store.upsert_algo_order(
+            AlgoOrder("a1", SYMBOLS[2], "buy", "iceberg", 0.05, 20100.0, "active", 0, 0)
+        )
+        result = run_portfolio(
+            client, store, _cfg(2), RankedInferer([0.9, 0.8, 0.95]), _notifier(tmp_path), nav=1000.0
+        )
+    statuses = {s: r["status"] for s, r in result["symbols"].items()}
+    assert statuses == {SYMBOLS[0]: "ok", SYMBOLS[1]: "max_position", SYMBOLS[2]: "max_position"}
+
+
+def test_portfolio_stamps_decisions_before_submitting(tmp_path: Path) -> None:
+    client = PortfolioClient()
+    calls = []
+    with StateStore(tmp_path / "test.db") as store:
+        engine = ExecutionEngine(client, store, _cfg(3))
+        submit = engine.submit_ladder
+
+        def spy(*args, decided_at=None, **kwargs):
+            calls.append((decided_at, time.monotonic()))
+            return submit(*args, decided_at=decided_at, **kwargs)
+
+        engine.submit_ladder = spy  # type: ignore[method-assign]
+        run_portfolio(
+            client, store, _cfg(3), RankedInferer([0.9, 0.8, 0.95]), _notifier(tmp_path), nav=1000.0, engine=engine
+        )
+    assert len(calls) == 3
+    first_submit = min(submitted for _, submitted in calls)
+    # Every signal was stamped when it was made, before the first order went out.
+    assert all(decided is not None and decided <= first_submit for decided, _ in calls)
+
+
+def test_runtime_portfolio_reads_balance_once_for_nav(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    client = PortfolioClient()
+    runtime = CycleRuntime(client, RankedInferer([0.9, 0.8, 0.95]), _notifier(tmp_path))
+    with StateStore(tmp_path / "test.db") as store:
+        run_runtime_cycle(runtime, store, _cfg(3))
+        snapshot = store.get_daily_nav(_current_utc_day_start(int(time.time() * 1000)))
+    assert client.calls["fetch_balance"] == 1
+    assert snapshot.nav == 1000.0
+
+
+def test_portfolio_without_balance_keeps_daily_nav_unset(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    client = PortfolioClient()
+    client.fetch_balance = lambda: {"total": {}}  # type: ignore[method-assign]
+    with StateStore(tmp_path / "test.db") as store:
+        result = run_portfolio(client, store, _cfg(3), RankedInferer([0.9, 0.8, 0.95]), _notifier(tmp_path))
+        snapshot = store.get_daily_nav(_current_utc_day_start(int(time.time() * 1000)))
+    assert "no balance" in result["error"]
+    assert result["orders"] == []
+    assert snapshot is None
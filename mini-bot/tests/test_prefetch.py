@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from bot.config import PrefetchConfig, TradingConfig
+from bot.data_ingest import timeframe_to_seconds
+from bot.deadline import CycleDeadline
+from bot.prefetch import InputCache, prefetch_cycle
+from bot.state_store import StateStore
+
+SYMBOL = "BTC/USDT:USDT"
+
+
+class SlowClient:
+    def __init__(self, delay: float = 0.2, hang: float = 0.0) -> None:
+        self.delay = delay
+        self.hang = hang
+        self.markets: dict = {}
+        self.threads: set[str] = set()
+
+    def _wait(self, seconds: float) -> None:
+        self.threads.add(threading.current_thread().name)
+        time.sleep(seconds)
+
+    def load_markets(self):
+        self._wait(self.delay)
+        self.markets = {SYMBOL: {"limits": {"amount": {"min": 0.001}}}}
+        return self.markets
+
+    def fetch_ohlcv(self, symbol, timeframe, limit=None, since=None):
+        self._wait(self.delay)
+        step = timeframe_to_seconds(timeframe) * 1000
+        start = (int(time.time() * 1000) // step - 3) * step
+        return [[start + i * step, 100.0, 101.0, 99.0, 100.5, 1.0] for i in range(3)]
+
+    def fetch_funding_rate(self, symbol):
+        self._wait(self.delay)
+        return {"fundingRate": 0.0001}
+
+    def fetch_balance(self):
+        self._wait(self.hang or self.delay)
+        return {"free": {"USDT": 500.0}}
+
+
+def test_prefetch_runs_calls_concurrently(tmp_path) -> None:
+    client = SlowClient(delay=0.2)
+    with StateStore(tmp_path / "db.sqlite") as store:
+        started = time.perf_counter()
+        context = prefetch_cycle(client, store, TradingConfig(symbol=SYMBOL, timeframe="1m"))
+        elapsed = time.perf_counter() - started
+    assert elapsed < 0.6
+    assert len(client.threads) == 4
+    assert not context.errors
+    assert len(context.candles) == 3
+    assert context.balance == {"free": {"USDT": 500.0}}
+    assert context.market["limits"]["amount"]["min"] == 0.001
+    assert context.funding_annualized is not None and context.funding_annualized > 0
+    assert set(context.elapsed_ms) == {"ingest", "funding_rate", "balance", "market"}
+
+
+def test_prefetch_timeout_and_failure_are_recorded(tmp_path) -> None:
+    client = SlowClient(delay=0.01, hang=1.0)
+
+    def broken(symbol):
+        raise RuntimeError("funding down")
+
+    client.fetch_funding_rate = broken
+    cfg = TradingConfig(symbol=SYMBOL, timeframe="1m", prefetch=PrefetchConfig(balance_timeout_s=0.1))
+    with StateStore(tmp_path / "db.sqlite") as store:
+        started = time.perf_counter()
+        context = prefetch_cycle(client, store, cfg)
+        elapsed = time.perf_counter() - started
+    assert elapsed < 0.5
+    assert context.errors == {"balance": "timeout", "funding_rate": "funding down"}
+    assert context.balance is None and context.funding_annualized is None
+    assert context.candles
+
+
+def test_missed_reads_fall_back_to_cached_values(tmp_path) -> None:
+    cfg = TradingConfig(symbol=SYMBOL, timeframe="1m")
+    with StateStore(tmp_path / "db.sqlite") as store:
+        cache = InputCache.for_store(store)
+        fresh = prefetch_cycle(SlowClient(delay=0.01), store, cfg, cache=cache)
+        assert not fresh.stale
+
+        deadline = CycleDeadline(5000, {"prefetch": 150})
+        context = prefetch_cycle(
+            SlowClient(delay=0.01, hang=1.0), store, cfg, deadline=deadline, cache=InputCache.for_store(store)
+        )
+    assert context.errors == {"balance": "timeout"}
+    assert context.balance == {"free": {"USDT": 500.0}}
+    assert set(context.stale) == {"balance"} and context.stale["balance"] >= 0
+    assert context.funding_rate == 0.0001 and "funding_rate" not in context.stale
+
+    with StateStore(tmp_path / "db.sqlite") as store:
+        expired = prefetch_cycle(
+            SlowClient(delay=0.01, hang=1.0),
+            store,
+            cfg,
+            deadline=CycleDeadline(5000, {"prefetch": 150}),
+            cache=InputCache.for_store(store),
+            max_stale_s=-1,
+        )
+    assert expired.balance is None and not expired.stale
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from bot.profiler import (
+    CountingClient,
+    CycleProfiler,
+    StageStats,
+    load_profiles,
+    parse_budgets,
+    summarize,
+)
+
+
+class Venue:
+    markets = {"BTC/USDT:USDT": {}}
+
+    def fetch_ticker(self, symbol):
+        return {"last": 1.0}
+
+    def amount_to_precision(self, symbol, amount):
+        return str(amount)
+
+
+def test_stage_records_wall_cpu_and_exchange_calls() -> None:
+    client = CountingClient(Venue())
+    profiler = CycleProfiler(client)
+    with profiler.stage("ingest"):
+        client.fetch_ticker("BTC/USDT:USDT")
+        client.fetch_ticker("BTC/USDT:USDT")
+        client.amount_to_precision("BTC/USDT:USDT", 1.0)
+        time.sleep(0.02)
+    with profiler.stage("risk"):
+        sum(i * i for i in range(20000))
+    assert client.markets == Venue.markets
+    ingest, risk = profiler.stages["ingest"], profiler.stages["risk"]
+    assert ingest.calls == 2 and risk.calls == 0
+    assert ingest.wall_ms >= 20
+    assert risk.cpu_ms > 0
+    assert not profiler.over_budget
+
+
+def test_over_budget_stage_dumps_cprofile(tmp_path: Path) -> None:
+    profiler = CycleProfiler(budgets=parse_budgets("inference=0, risk=1e9,bogus"), capture_dir=tmp_path)
+    with profiler.stage("inference"):
+        time.sleep(0.005)
+    with profiler.stage("risk"):
+        pass
+    payload = profiler.payload()
+    assert payload["over_budget"] == ["inference"]
+    assert len(payload["captures"]) == 1
+    assert payload["captures"][0].endswith("-inference.prof")
+    assert Path(payload["captures"][0]).exists()
+
+
+def test_report_aggregates_percentiles_in_range(tmp_path: Path) -> None:
+    log = tmp_path / "cycles.jsonl"
+    for i in range(1, 21):
+        profiler = CycleProfiler()
+        profiler.stages["ingest"] = StageStats(wall_ms=float(i), cpu_ms=float(i) / 10, calls=2)
+        profiler.log(log, ts=i * 1000, symbol="BTC/USDT:USDT", status="ok")
+    records = load_profiles(log, since_ms=1000, until_ms=11000)
+    assert len(records) == 10
+    summary = summarize(records)
+    assert summary["ingest"]["wall_p50"] == 5.0
+    assert summary["ingest"]["wall_p95"] == 10.0
+    assert summary["ingest"]["calls_mean"] == 2.0
+    assert summary["total"]["n"] == 10
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from bot.rate_limiter import RateLimiter, ScheduledClient
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _limiter(path: Path, clock: FakeClock, **kwargs) -> RateLimiter:
+    return RateLimiter(
+        path,
+        capacity=10,
+        refill_per_s=1,
+        reserve_pct=0.5,
+        weights={"fetch_ohlcv": 5, "create_order": 1},
+        clock=clock,
+        sleep=clock.sleep,
+        **kwargs,
+    )
+
+
+def test_bucket_shared_between_limiters(tmp_path: Path) -> None:
+    clock = FakeClock()
+    first = _limiter(tmp_path / "rl.db", clock)
+    second = _limiter(tmp_path / "rl.db", clock)
+    assert first.acquire("fetch_ohlcv") == 0.0
+    assert second.tokens() == pytest.approx(5.0)
+    waited = second.acquire("fetch_ohlcv")
+    assert waited == pytest.approx(5.0)
+    assert clock.sleeps == [pytest.approx(5.0)]
+
+
+def test_critical_calls_use_reserved_headroom(tmp_path: Path) -> None:
+    clock = FakeClock()
+    limiter = _limiter(tmp_path / "rl.db", clock)
+    limiter.acquire("fetch_ohlcv")
+    assert limiter.acquire("create_order") == 0.0
+    assert limiter.acquire("create_order") == 0.0
+    assert clock.sleeps == []
+
+
+def test_acquire_timeout(tmp_path: Path) -> None:
+    clock = FakeClock()
+    limiter = _limiter(tmp_path / "rl.db", clock)
+    limiter.acquire("fetch_ohlcv")
+    with pytest.raises(TimeoutError):
+        limiter.acquire("fetch_ohlcv", timeout=1.0)
+
+
+def test_scheduled_client_penalizes_on_rate_limit(tmp_path: Path) -> None:
+    class RateLimitExceeded(Exception):
+        pass
+
+    class Client:
+        id = "binanceusdm"
+
+        def fetch_ohlcv(self, symbol, **kwargs):
+            raise RateLimitExceeded("429")
+
+    clock = FakeClock()
+    limiter = _limiter(tmp_path / "rl.db", clock)
+    client = ScheduledClient(Client(), limiter)
+    assert client.id == "binanceusdm"
+    with pytest.raises(RateLimitExceeded):
+        client.fetch_ohlcv("BTC/USDT")
+    assert limiter.tokens() == 0.0
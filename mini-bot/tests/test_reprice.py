@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from bot.reprice import next_bar_close_ms, reprice_until
+
+
+class FakeEngine:
+    def __init__(self) -> None:
+        self.passes: list[int] = []
+        self.steps: list[int] = []
+
+    def reprice_ladder(self, symbol, now_ms=None):
+        self.passes.append(now_ms)
+        return 1
+
+    def step_algos(self, symbol=None, now_ms=None):
+        self.steps.append(now_ms)
+        return 0
+
+
+def test_next_bar_close_ms() -> None:
+    four_h = 4 * 3600 * 1000
+    assert next_bar_close_ms(0, "4h") == four_h
+    assert next_bar_close_ms(four_h + 1, "4h") == 2 * four_h
+
+
+def test_reprice_until_runs_on_interval() -> None:
+    now = [0.0]
+
+    def sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    engine = FakeEngine()
+    total = reprice_until(
+        engine,  # type: ignore[arg-type]
+        "BTC/USDT",
+        interval_s=60,
+        deadline_ms=200_000,
+        clock=lambda: now[0],
+        sleep=sleep,
+    )
+    assert engine.passes == [0, 60_000, 120_000, 180_000]
+    assert total == 4
+
+
+def test_reprice_until_steps_algos_between_reprices() -> None:
+    now = [0.0]
+
+    def sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    engine = FakeEngine()
+    reprice_until(
+        engine,  # type: ignore[arg-type]
+        "BTC/USDT",
+        interval_s=60,
+        reprice_interval_s=120,
+        deadline_ms=200_000,
+        clock=lambda: now[0],
+        sleep=sleep,
+    )
+    assert engine.steps == [0, 60_000, 120_000, 180_000]
+    assert engine.passes == [0, 120_000]
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import csv
+import json
+import time
 from pathlib import Path
 
 import csv
 from pathlib import Path
 
 from bot.config import TradingConfig
+from bot.deadline import CycleDeadline
 from bot.data_ingest import timeframe_to_seconds
 from bot.notifier import TelegramNotifier
-from bot.run_cycle import run_once
-from bot.state_store import Position, StateStore
+from bot.profiler import STAGES, load_profiles
+from bot.run_cycle import CycleRuntime, _current_utc_day_start, run_once, run_runtime_cycle
+from bot.state_store import AlgoOrder, Position, StateStore
 
 FIXTURE_PATH = Path(__file__).parent / "fixtures" / "candles_sample.csv"
 
@@ -108,6 +112,62 @@ def test_run_once_places_orders(tmp_path: Path) -> None:
     assert client.leverage_calls
 
 
+def test_run_once_logs_cycle_profile(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    cfg = TradingConfig()
+    cfg.regime.adx_min = 0
+    cfg.regime.atr_pct_min = 0
+    cfg.regime.atr_pct_max = 10
+    notifier = TelegramNotifier(None, None, freeze_path=tmp_path / "notify.freeze", max_failures=3)
+    with StateStore(tmp_path / "test.db") as store:
+        result = run_once(DummyClient(), store, cfg, DummyInferer(), notifier, nav=1000.0)  # type: ignore[arg-type]
+    assert result["status"] == "ok"
+    records = load_profiles(tmp_path / "experiments" / "live" / "cycles.jsonl")
+    assert len(records) == 1
+    profile = records[0]
+    assert profile["status"] == "ok"
+    assert set(profile["stages"]) == set(STAGES)
+    assert profile["stages"]["ingest"]["calls"] >= 2  # candles + funding
+    assert profile["stages"]["submission"]["calls"] >= cfg.order.ladder_levels
+    assert profile["stages"]["compute_features"]["calls"] == 0
+
+
+def test_runtime_cycle_prefetches_balance_inside_ingest_stage(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    cfg = TradingConfig()
+    cfg.regime.adx_min = 0
+    cfg.regime.atr_pct_min = 0
+    cfg.regime.atr_pct_max = 10
+    client = DummyClient()
+    client.fetch_balance = lambda: {"free": {"USDT": 800.0}, "total": {"USDT": 1200.0}}  # type: ignore[attr-defined]
+    notifier = TelegramNotifier(None, None, freeze_path=tmp_path / "notify.freeze", max_failures=3)
+    runtime = CycleRuntime(client, DummyInferer(), notifier)
+    with StateStore(tmp_path / "test.db") as store:
+        result = run_runtime_cycle(runtime, store, cfg)
+        snapshot = store.get_daily_nav(_current_utc_day_start(result["submitted_ms"]))
+    assert result["status"] == "ok"
+    assert snapshot.nav == 1200.0
+    (profile,) = load_profiles(tmp_path / "experiments" / "live" / "cycles.jsonl")
+    assert profile["stages"]["ingest"]["calls"] >= 3  # candles + funding + balance
+    assert profile["total_ms"] >= profile["stages"]["ingest"]["wall_ms"]
+
+
+def test_runtime_cycle_without_balance_keeps_daily_nav_unset(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    client = DummyClient()
+
+    def fetch_balance():
+        raise RuntimeError("exchange down")
+
+    client.fetch_balance = fetch_balance  # type: ignore[attr-defined]
+    notifier = TelegramNotifier(None, None, freeze_path=tmp_path / "notify.freeze", max_failures=3)
+    with StateStore(tmp_path / "test.db") as store:
+        result = run_runtime_cycle(CycleRuntime(client, DummyInferer(), notifier), store, TradingConfig())
+        snapshot = store.get_daily_nav(_current_utc_day_start(int(time.time() * 1000)))
+    assert "exchange down" in result["error"]
+    assert snapshot is None
+
+
 def test_run_once_respects_max_position(tmp_path: Path) -> None:
     cfg = TradingConfig()
     cfg.regime.adx_min = 0
@@ -143,3 +203,89 @@ def test_run_once_respects_max_position(tmp_path: Path) -> None:
             nav=1000.0,
         )
     assert result["status"] == "max_position"
+
+
+def test_run_once_treats_working_algo_as_position(tmp_path: Path) -> None:
+    cfg = TradingConfig()
+    cfg.regime.adx_min = 0
+    cfg.regime.atr_pct_min = 0
+    cfg.regime.atr_pct_max = 10
+    notifier = TelegramNotifier(None, None, freeze_path=tmp_path / "notify.freeze", max_failures=3)
+    with StateStore(tmp_path / "test.db") as store:
+        store.upsert_algo_order(
+            AlgoOrder("a1", cfg.symbol, "buy", "iceberg", 0.05, 20100.0, "active", 0, 0)
+        )
+        result = run_once(
+            DummyClient(),
+            store,
+            cfg,
+            DummyInferer(),  # type: ignore[arg-type]
+            notifier,
+            nav=1000.0,
+        )
+    assert result["status"] == "max_position"
+
+
+def test_run_once_skips_optional_work_past_deadline(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    cfg = TradingConfig()
+    cfg.regime.adx_min = 0
+    cfg.regime.atr_pct_min = 0
+    cfg.regime.atr_pct_max = 10
+
+    class Shadow:
+        submitted = 0
+
+        def submit(self, *args, **kwargs):
+            self.submitted += 1
+
+    class Notifier(TelegramNotifier):
+        sent: list = []
+
+        def send_message(self, text: str) -> bool:
+            self.sent.append(text)
+            return True
+
+    class Online:
+        base_version = "v1"
+        steps = 0
+        observed: list = []
+
+        def step(self, model, features, model_path=None):
+            self.steps += 1
+            return {}
+
+        def observe(self, ts_close, row):
+            self.observed.append(ts_close)
+
+        def save(self):
+            pass
+
+    notifier = Notifier("token", 1, freeze_path=tmp_path / "notify.freeze", max_failures=3)
+    shadow = Shadow()
+    online = Online()
+    # A deadline that is already spent: the order still goes out, the extras do not.
+    deadline = CycleDeadline(1000, {"prefetch": 1000, "decision": 0}, notify_min_ms=5000)
+    with StateStore(tmp_path / "test.db") as store:
+        result = run_once(
+            DummyClient(),
+            store,
+            cfg,
+            DummyInferer(),  # type: ignore[arg-type]
+            notifier,
+            nav=1000.0,
+            shadow=shadow,  # type: ignore[arg-type]
+            online=online,  # type: ignore[arg-type]
+            deadline=deadline,
+        )
+    assert result["status"] == "ok"
+    assert shadow.submitted == 0
+    # The update is skipped but the row still joins the label queue.
+    assert online.steps == 0 and len(online.observed) == 1
+    assert deadline.skipped == ["online_update", "shadow_submit"]
+    assert notifier.sent == [] and len(deadline.deferred) == 1
+    events = [json.loads(line) for line in (tmp_path / "experiments/live/cycles.jsonl").read_text().splitlines()]
+    logged = [e for e in events if e["evt"] == "cycle_deadline"]
+    assert logged and logged[0]["skipped"] == ["online_update", "shadow_submit"] and logged[0]["deferred"] == 1
+    deadline.flush(notifier)
+    assert notifier.sent[0].startswith("Signal:")
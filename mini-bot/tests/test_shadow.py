@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import pytest
+
+from bot.model_infer import LoadedModel
+from bot.model_registry import ModelRegistry
+from bot.shadow import ShadowScorer, parse_versions
+from bot.state_store import Candle, ShadowScore, StateStore
+from reporting.shadow import shadow_outcomes
+
+ROW = {"a": 1.0, "b": -1.0}
+H4_MS = 4 * 3600 * 1000
+
+
+def _registry(root: Path) -> ModelRegistry:
+    registry = ModelRegistry(root)
+    registry.publish(LoadedModel(["a", "b"], "x", {"a": 1.0}, 0.0), version="champ", activate=True)
+    registry.publish(LoadedModel(["a", "b"], "x", {"b": 2.0}, 0.0), version="chal")
+    return registry
+
+
+def test_parse_versions() -> None:
+    assert parse_versions(" chal, ,v2 ") == ["chal", "v2"]
+    assert parse_versions("") == []
+
+
+def test_shadow_scores_recorded_with_live_model(tmp_path: Path, temp_db: Path) -> None:
+    _registry(tmp_path / "reg")
+    scorer = ShadowScorer.from_registry(tmp_path / "reg", ["champ", "chal", "missing"])
+    assert set(scorer.models) == {"champ", "chal"}
+    try:
+        scorer.submit(H4_MS, "BTC/USDT", ROW, live_version="champ", live_p_buy=0.73)
+        with StateStore(temp_db) as store:
+            assert scorer.collect(store, timeout=5.0) == 2
+            rows = {r.version: r for r in store.list_shadow_scores("BTC/USDT")}
+    finally:
+        scorer.close()
+    assert rows["champ"].live and rows["champ"].p_buy == 0.73
+    assert not rows["chal"].live
+    assert rows["chal"].p_buy == pytest.approx(1 / (1 + math.exp(2.0)))
+
+
+def test_shadow_outcomes_join_future_close(temp_db: Path) -> None:
+    with StateStore(temp_db) as store:
+        store.upsert_candles(
+            [Candle("BTC/USDT", "4h", H4_MS * i, 1, 1, 1, 100 + i, 1) for i in range(1, 4)]
+        )
+        store.record_shadow_scores(
+            [ShadowScore(H4_MS, "BTC/USDT", "chal", 0.6), ShadowScore(H4_MS * 3, "BTC/USDT", "chal", 0.4)]
+        )
+        outcomes = shadow_outcomes(store, "BTC/USDT", "4h")
+    # The last score has no future bar yet and is excluded.
+    assert outcomes == {"chal": [(0.6, 1)]}
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from bot.state_store import Candle, LedgerEntry, Order, Position, StateStore
+from bot.state_store import AccountSettings, Candle, LedgerEntry, Order, Position, StateStore
 
 
 def test_upsert_and_get_candles(temp_db: Path) -> None:
@@ -67,8 +67,38 @@ def test_ledger_insert_and_list(temp_db: Path) -> None:
     assert entries == [entry]
 
 
+def test_account_settings_roundtrip(temp_db: Path) -> None:
+    settings = AccountSettings(symbol="BTC/USDT", margin_mode="isolated", leverage=3.0, ts_checked=100)
+    with StateStore(temp_db) as store:
+        assert store.get_account_settings("BTC/USDT") is None
+        store.upsert_account_settings(settings)
+        assert store.get_account_settings("BTC/USDT") == settings
+        settings.leverage = 5.0
+        store.upsert_account_settings(settings)
+        assert store.get_account_settings("BTC/USDT").leverage == 5.0
+
+
 def test_pragmas_applied(temp_db: Path) -> None:
     with StateStore(temp_db) as store:
         cur = store.conn.execute("PRAGMA journal_mode;")
         mode = cur.fetchone()[0]
     assert mode.lower() == "wal"
+
+
+def test_orders_gain_bracket_columns_on_open(tmp_path: Path) -> None:
+    import sqlite3
+
+    db_path = tmp_path / "old.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE orders(oid TEXT PRIMARY KEY, symbol TEXT, side TEXT, qty REAL, px REAL, status TEXT, "
+        "ts_created INTEGER, ts_updated INTEGER, post_only INTEGER, client_order_id TEXT, "
+        "maker INTEGER DEFAULT 1, fee REAL DEFAULT 0, reject_reason TEXT)"
+    )
+    conn.commit()
+    conn.close()
+    order = Order("o1", "BTC/USDT", "buy", 0.01, 20000.0, "open", 1, 1, True, stop_loss=19500.0)
+    with StateStore(db_path) as store:
+        store.upsert_order(order)
+    with StateStore(db_path) as store:
+        assert store.get_order("o1") == order
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from bot.config import TradingConfig
+from bot.execution import ExecutionEngine
+from bot.state_store import Fill, StateStore
+from reporting.tca import dod_inputs, summarize, tca_rows
+from reporting.validate_dod import check_dod
+
+
+def _seed(store: StateStore) -> None:
+    store.record_tca_order("a", "BTC/USDT", "binance", "buy", 0, 1.0, 100.0, 1_000)
+    store.record_tca_order("b", "BTC/USDT", "binance", "buy", 1, 1.0, 100.0, 1_000)
+    store.record_tca_order("c", "BTC/USDT", "binance", "sell", 0, 2.0, 100.0, 1_000)
+    store.record_fill(Fill(oid="a", ts=3_000, qty=1.0, px=100.1, maker=True))
+    store.record_fill(Fill(oid="c", ts=11_000, qty=1.0, px=99.9, maker=False, fee=0.05))
+
+
+def test_rollup_by_level_and_incremental(temp_db) -> None:
+    with StateStore(temp_db) as store:
+        _seed(store)
+        rows = {row["level"]: row for row in tca_rows(store)}
+        assert rows[0]["n_orders"] == 2
+        assert rows[0]["fill_ratio"] == pytest.approx(2.0 / 3.0)
+        assert rows[0]["maker_ratio"] == pytest.approx(0.5)
+        # Buy filled above and sell filled below arrival: both cost 10bp.
+        assert rows[0]["slippage_bp"] == pytest.approx(10.0)
+        assert rows[0]["time_to_fill_s"] == pytest.approx(6.0)
+        assert rows[1]["fill_ratio"] == 0.0 and rows[1]["maker_ratio"] is None
+
+        store.record_fill(Fill(oid="b", ts=2_000, qty=1.0, px=99.95, maker=True))
+        assert store.refresh_tca_stats() == 1
+        assert store.refresh_tca_stats() == 0
+        total = summarize(store.list_tca_stats())
+        assert total["qty_filled"] == pytest.approx(3.0)
+        assert total["fill_ratio"] == pytest.approx(0.75)
+        assert total["fees"] == pytest.approx(0.05)
+
+
+def test_reprice_keeps_fills_attributed(temp_db) -> None:
+    with StateStore(temp_db) as store:
+        _seed(store)
+        store.remap_tca_order("b", "b2")
+        store.record_fill(Fill(oid="b2", ts=2_000, qty=0.5, px=100.0, maker=True))
+        rows = {row["level"]: row for row in tca_rows(store, venue="binance")}
+        assert rows[1]["fill_ratio"] == pytest.approx(0.5)
+
+
+def test_dod_inputs_feed_check_dod(temp_db) -> None:
+    base = {"Sharpe": 1.2, "MAR": 0.7, "MaxDD": 0.1, "BTC_Sharpe": 1.0, "ETH_Sharpe": 1.0}
+    with StateStore(temp_db) as store:
+        assert dod_inputs(store) == {}
+        _seed(store)
+        measured = dod_inputs(store)
+    assert measured["FillRatio"] == pytest.approx(0.5)
+    assert measured["maker_ratio"] == pytest.approx(0.5)
+    assert not check_dod({**base, **measured})
+    assert check_dod({**base, "FillRatio": 0.6, "maker_ratio": 0.8})
+
+
+def test_submit_ladder_records_submissions_and_fills(temp_db) -> None:
+    client = MagicMock()
+    client.id = "binance"
+    client.market.return_value = {
+        "precision": {"price": 2, "amount": 3},
+        "limits": {"amount": {"min": 0.001}, "cost": {"min": 5}},
+    }
+    client.fetch_order_book.return_value = {
+        "bids": [[19990.0, 1.0]],
+        "asks": [[20010.0, 1.0]],
+    }
+    client.create_order.side_effect = [
+        {"id": "l0", "status": "closed", "filled": 0.01, "average": 19995.0},
+        {"id": "l1", "status": "open", "filled": 0},
+        {"id": "l2", "status": "open", "filled": 0},
+        {"id": "sl", "status": "open"},
+        {"id": "tp", "status": "open"},
+    ]
+    client.fetch_order.return_value = {"status": "open", "filled": 0}
+    with StateStore(temp_db) as store:
+        engine = ExecutionEngine(client, store, TradingConfig())
+        engine.submit_ladder("BTC/USDT", "buy", price=20000, qty=0.03, stop_px=19000, tp_px=21000)
+        fills = store.list_fills()
+        assert [(f.oid, f.qty) for f in fills] == [("l0", pytest.approx(0.01))]
+        rows = tca_rows(store, symbol="BTC/USDT")
+    assert [row["level"] for row in rows] == [0, 1, 2]
+    assert rows[0]["slippage_bp"] == pytest.approx(-2.5)
+    assert rows[1]["fill_ratio"] == 0.0
+
+
+def test_replacement_fills_count_from_zero_after_remap(temp_db) -> None:
+    with StateStore(temp_db) as store:
+        _seed(store)
+        engine = ExecutionEngine(MagicMock(), store, TradingConfig())
+        engine._record_fill("b", 0.3, 100.0)
+        store.remap_tca_order("b", "b2")
+        # The venue reports the replacement's own cumulative fill.
+        engine._record_fill("b2", 0.7, 100.0)
+        engine._record_fill("b2", 0.7, 100.0)
+        assert sum(f.qty for f in store.list_fills("b2")) == pytest.approx(1.0)
+        rows = {row["level"]: row for row in tca_rows(store, venue="binance")}
+        assert rows[1]["fill_ratio"] == pytest.approx(1.0)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from bot import training
+from bot.feature_engine import FeatureRow
+from bot.model_infer import ModelInferer
+from bot.state_store import Candle
+from bot.training import (
+    DesignMatrix,
+    LabelConfig,
+    fit_logistic,
+    load_or_build_design_matrix,
+    publish,
+    train,
+    triple_barrier_labels,
+)
+
+H4_MS = 4 * 3600 * 1000
+
+
+def _candles(n: int = 300, seed: int = 3) -> list[Candle]:
+    rng = random.Random(seed)
+    price = 30000.0
+    out = []
+    for i in range(n):
+        close = price * math.exp(rng.gauss(0, 0.01))
+        out.append(Candle("BTC/USDT", "4h", H4_MS * (i + 1), price, max(price, close) * 1.002, min(price, close) * 0.998, close, 100.0))
+        price = close
+    return out
+
+
+def _row(close: float, atr: float = 1.0, high: float | None = None, low: float | None = None) -> FeatureRow:
+    return FeatureRow(0, close, high or close, low or close, close, 1.0, atr, 20.0, 0.0, 0.01)
+
+
+def test_triple_barrier_first_touch_and_vertical() -> None:
+    cfg = LabelConfig(horizon_bars=2, k_tp=2.0, k_sl=1.0)
+    rows = [_row(c) for c in (100.0, 100.5, 99.8, 98.5, 101.0, 101.2)]
+    # Row 0 ends below entry at the vertical barrier, row 1 touches its
+    # 99.5 stop, row 3 reaches its 100.5 target; the tail lacks a horizon.
+    assert triple_barrier_labels(rows, cfg) == [0, 0, 0, 1, None, None]
+    intrabar = LabelConfig(horizon_bars=1, k_tp=1.0, k_sl=1.0, use_close=False)
+    assert triple_barrier_labels([_row(100), _row(100, high=101, low=99)], intrabar)[0] == 0
+
+
+def test_design_matrix_cached_by_data_and_config(tmp_path: Path, monkeypatch) -> None:
+    candles = _candles()
+    first = load_or_build_design_matrix(candles, tmp_path)
+    assert len(first) > 200 and first.ts == sorted(first.ts)
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(training, "build_design_matrix", fail)
+    cached = load_or_build_design_matrix(list(reversed(candles)), tmp_path)
+    assert cached.rows == first.rows and cached.labels == first.labels and cached.key == first.key
+    with pytest.raises(AssertionError):
+        load_or_build_design_matrix(candles, tmp_path, label_cfg=LabelConfig(horizon_bars=3))
+    fold = first.between(first.ts[10], first.ts[20])
+    assert len(fold) == 10
+
+
+def test_fit_logistic_recovers_signal() -> None:
+    rng = random.Random(1)
+    rows, labels = [], []
+    for _ in range(2000):
+        a, b = rng.gauss(5, 2), rng.gauss(0, 1)
+        p = 1 / (1 + math.exp(-(1.5 * (a - 5) / 2 - 0.5 * b)))
+        rows.append([a, b])
+        labels.append(1 if rng.random() < p else 0)
+    model = fit_logistic(DesignMatrix(["a", "b"], rows, labels, list(range(2000))), l2=1e-6)
+    assert model.weights["a"] == pytest.approx(0.75, abs=0.12)
+    assert model.weights["b"] == pytest.approx(-0.5, abs=0.12)
+    assert model.bias == pytest.approx(-3.75, abs=0.6)
+
+
+def test_train_publishes_registry_artifact(tmp_path: Path) -> None:
+    matrix = load_or_build_design_matrix(_candles(), tmp_path / "cache")
+    result = train(matrix, holdout_pct=0.25, version="t1")
+    assert result.calibration is not None
+    assert 0 < result.metrics["holdout_logloss"] < 2
+    version = publish(result, tmp_path / "reg", version="t1", activate=True)
+    inferer = ModelInferer(tmp_path / "reg")
+    assert inferer.version == version == "t1"
+    assert (tmp_path / "reg" / "t1" / "profile.json").exists()
+    proba = inferer.predict_proba(dict(zip(matrix.feature_names, matrix.rows[-1])))
+    assert 0.0 <= proba["buy"] <= 1.0
+
+
+def test_unversioned_trainings_publish_side_by_side(tmp_path: Path, monkeypatch) -> None:
+    stamps = iter(["20240101T000000", "20240101T040000"])
+    monkeypatch.setattr(time, "strftime", lambda fmt, *args: next(stamps))
+    matrix = load_or_build_design_matrix(_candles(), tmp_path / "cache")
+    first = publish(train(matrix, holdout_pct=0.25), tmp_path / "reg")
+    second = publish(train(matrix, holdout_pct=0.25), tmp_path / "reg")
+    assert (first, second) == ("20240101T000000", "20240101T040000")
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+import math
+import pickle
+from pathlib import Path
+
+import pytest
+
+from bot.model_infer import ModelInferer
+from bot.tree_model import check_parity, compile_booster, compile_dump, probe_rows
+
+
+DUMP = json.loads((Path(__file__).parent / "fixtures" / "lgbm_dump.json").read_text())
+
+
+def _reference(node: dict, row: list) -> float:
+    while "split_feature" in node:
+        x = row[node["split_feature"]]
+        kind = node["missing_type"]
+        if math.isnan(x) and kind != "NaN":
+            x = 0.0
+        if (kind == "Zero" and abs(x) <= 1e-35) or (kind == "NaN" and math.isnan(x)):
+            go_left = node["default_left"]
+        else:
+            go_left = x <= node["threshold"]
+        node = node["left_child"] if go_left else node["right_child"]
+    return node["leaf_value"]
+
+
+class FakeBooster:
+    def __init__(self, dump: dict) -> None:
+        self.dump = dump
+
+    def dump_model(self) -> dict:
+        return self.dump
+
+    def predict(self, rows, raw_score=False):
+        assert raw_score
+        out = []
+        for row in rows:
+            total = 0.0
+            for tree in self.dump["tree_info"]:
+                total += _reference(tree["tree_structure"], row)
+            out.append(total)
+        return out
+
+
+def test_compiled_trees_route_missing_like_lightgbm() -> None:
+    trees = compile_dump(DUMP)
+    assert trees.n_trees == 3
+    assert trees.margin({"atr": 5.0, "adx": 30.0, "ret": 0.1}) == 0.4 - 0.07 + 0.0125
+    # NaN with missing_type NaN follows default_left=False; zero-missing goes left.
+    assert trees.margin({"atr": 0.0, "adx": 10.0, "ret": math.nan}) == 0.1 + 0.05 + 0.0125
+    # NaN with missing_type None is treated as zero.
+    assert trees.margin({"atr": 5.0, "adx": math.nan, "ret": 1.0}) == 0.1 - 0.07 + 0.0125
+
+
+def test_compile_booster_has_exact_parity_on_probes() -> None:
+    booster = FakeBooster(DUMP)
+    trees = compile_booster(booster, check_rows=probe_rows(compile_dump(DUMP), 500))
+    assert check_parity(booster, trees, probe_rows(trees, 500, seed=1)) == 0
+
+
+def test_compile_rejects_categorical_and_mismatch() -> None:
+    bad = {**DUMP, "tree_info": [{"tree_structure": {**DUMP["tree_info"][0]["tree_structure"], "decision_type": "=="}}]}
+    with pytest.raises(ValueError):
+        compile_dump(bad)
+
+    class Drifting(FakeBooster):
+        def predict(self, rows, raw_score=False):
+            return [m + 1e-12 for m in super().predict(rows, raw_score)]
+
+    with pytest.raises(ValueError):
+        compile_booster(Drifting(DUMP), check_rows=[[1.0, 1.0, 1.0]])
+
+
+def test_model_inferer_loads_compiled_trees(tmp_path: Path) -> None:
+    path = tmp_path / "model.pkl"
+    trees = compile_dump(DUMP, version="t1")
+    path.write_bytes(pickle.dumps(trees))
+    inferer = ModelInferer(model_path=path)
+    row = {"atr": 5.0, "adx": 30.0, "ret": 0.1}
+    proba = inferer.predict_proba(row)
+    assert proba["debug_raw_margin"] == trees.margin(row)
+    batch = inferer.predict_proba_batch([[5.0, 30.0, 0.1]])
+    assert batch.raw_margin[0] == proba["debug_raw_margin"]
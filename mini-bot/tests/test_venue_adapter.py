@@ -32,3 +32,22 @@ def test_fallback_sets_generic_flags():
     params = order_params("unknown", post_only=True, reduce_only=True)
     assert params["postOnly"] is True
     assert params["reduceOnly"] is True
+
+
+def test_bybit_attaches_bracket_legs():
+    params = order_params("bybit", stop_loss=19500, take_profit=21000)
+    assert params["stopLoss"] == {"triggerPrice": 19500.0, "type": "market"}
+    assert params["takeProfit"]["triggerPrice"] == 21000.0
+    assert params["slTriggerBy"] == "MarkPrice"
+    assert params["tpTriggerBy"] == "MarkPrice"
+
+
+def test_okx_bracket_uses_trigger_price_type():
+    params = order_params("okx", stop_loss=19500, trigger="last")
+    assert params["stopLoss"]["triggerPriceType"] == "last"
+    assert "takeProfit" not in params
+
+
+def test_bracket_ignored_for_unsupported_or_reduce_only():
+    assert "stopLoss" not in order_params("binanceusdm", stop_loss=19500)
+    assert "stopLoss" not in order_params("bybit", reduce_only=True, stop_loss=19500)